@@ -1,29 +1,31 @@
+from typing import AsyncIterator
+
 from dependency_injector import containers, providers
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
+from documcp.shared_kernel.infra.database.sqla.engine import create_engine
 from documcp.shared_kernel.infra.database.sqla.settings import DatabaseSettings
 
 
+async def engine_resource(settings: DatabaseSettings) -> AsyncIterator[AsyncEngine]:
+    """Create the shared async engine and dispose of its connection pool on shutdown."""
+    engine = create_engine(settings)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
 class SqlaContainer(containers.DeclarativeContainer):
     """SQLAlchemy dependency injection container."""
-    
+
     settings = providers.Dependency(instance_of=DatabaseSettings)
-    
-    engine = providers.Singleton(
-        create_async_engine,
-        url=settings.provided.url,
-        echo=settings.provided.echo,
-        pool_size=settings.provided.pool_size,
-        max_overflow=settings.provided.max_overflow,
-        pool_recycle=settings.provided.pool_recycle,
-        pool_timeout=settings.provided.pool_timeout,
-        pool_pre_ping=settings.provided.pool_pre_ping,
-    )
-    
+
+    engine = providers.Resource(engine_resource, settings=settings)
+
     session_factory = providers.Singleton(
-        sessionmaker,
-        bind=engine.provided,
+        async_sessionmaker,
+        bind=engine,
         class_=AsyncSession,
         expire_on_commit=False,
     )
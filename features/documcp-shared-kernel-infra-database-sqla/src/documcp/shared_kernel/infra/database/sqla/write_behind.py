@@ -0,0 +1,124 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Generic, List, Optional, TypeVar
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class WriteBehindBuffer(Generic[T]):
+    """Collect items on the request path and write them in batches from a background task.
+
+    ``offer`` never waits: items are queued in memory and ``write`` receives up to
+    ``batch_size`` of them at a time, as soon as a batch is full or ``flush_interval``
+    seconds after the first pending item. Failed batches are put back and retried on the
+    next flush. Beyond ``max_pending`` items the oldest are dropped, so a slow or
+    unavailable database degrades to losing records rather than memory or latency.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[T]], Awaitable[Any]],
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_pending: int = 10_000,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self._write = write
+        self._pending: Deque[T] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # Flush started by the background writer, left to finish when the writer is stopped
+        self._flushing: Optional[asyncio.Future] = None
+
+    def offer(self, item: T) -> None:
+        """Queue an item for the next batch."""
+        if len(self._pending) >= self.max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+        self._pending.append(item)
+        if len(self._pending) >= self.batch_size or len(self._pending) == 1:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Start the background writer; does nothing if already started."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background writer and write what is still pending.
+
+        A batch being written when the writer stops is awaited rather than cancelled, so it is
+        either written or put back for the final flushes.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._flushing is not None:
+            await asyncio.gather(self._flushing, return_exceptions=True)
+            self._flushing = None
+        while self._pending and await self.flush():
+            pass
+
+    async def flush(self) -> bool:
+        """Write one batch of pending items and tell whether it succeeded."""
+        batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        if not batch:
+            return True
+
+        try:
+            await self._write(batch)
+        except Exception as e:
+            self.failed_flushes += 1
+            # Keep the batch for the next attempt, ahead of anything queued meanwhile
+            self._pending.extendleft(reversed(batch))
+            while len(self._pending) > self.max_pending:
+                self._pending.pop()
+                self.dropped += 1
+            logger.warning("Write-behind flush failed", pending=len(self._pending), error=str(e))
+            return False
+
+        self.written += len(batch)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer counters."""
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if len(self._pending) < self.batch_size:
+                # Give a partial batch time to fill up; ``offer`` wakes us early once it is full
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+            while self._pending:
+                self._flushing = asyncio.ensure_future(self.flush())
+                if not await asyncio.shield(self._flushing):
+                    await asyncio.sleep(self.flush_interval)
+                    self._wakeup.set()
+                    break
+                if len(self._pending) < self.batch_size:
+                    # Leave a partial remainder for the next interval
+                    if self._pending:
+                        self._wakeup.set()
+                    break
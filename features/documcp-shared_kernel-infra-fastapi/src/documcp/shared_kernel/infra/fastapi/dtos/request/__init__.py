@@ -1,3 +1,4 @@
+from .cursor_pageable import CursorPageable
 from .pageable import Pageable
 
-__all__ = ["Pageable"]
+__all__ = ["CursorPageable", "Pageable"]
@@ -0,0 +1,80 @@
+import base64
+import binascii
+import json
+from typing import Any, Callable, Mapping, Sequence, Tuple, TypeVar
+
+from documcp.shared_kernel.infra.camel_model import Field
+
+from .pageable import Pageable
+
+T = TypeVar("T")
+
+
+class CursorPageable(Pageable):
+    """Keyset pagination request DTO.
+
+    Pages continue after the sort key of the previous page's last row (``cursor``)
+    instead of skipping ``offset`` rows, so a deep page costs one index seek like the
+    first. ``page`` is ignored.
+    """
+
+    cursor: str | None = Field(None, description="next_cursor of the previous page; omit for the first page")
+
+    def sort_key(self, default: str) -> Tuple[str, bool]:
+        """Return the requested (or ``default``) sort field and whether it is descending."""
+        field, direction = (self.sort or default).split(":")
+        return field, direction == "desc"
+
+    def decode_cursor(self, field: str) -> list[Any] | None:
+        """Return the ``[value, tiebreaker]`` key the page starts after, or ``None`` for the first page."""
+        if self.cursor is None:
+            return None
+        try:
+            sort, *key = json.loads(base64.urlsafe_b64decode(self.cursor + "=" * (-len(self.cursor) % 4)))
+        except (binascii.Error, TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+        if sort != field or len(key) != 2:
+            raise ValueError("Invalid cursor for this sort order")
+        return key
+
+    @staticmethod
+    def encode_cursor(field: str, key: Sequence[Any]) -> str:
+        """Encode the sort key of the last row of a page as an opaque cursor."""
+        payload = json.dumps([field, *key], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+    def seek(self, query: Any, columns: Mapping[str, Any], tiebreaker: Any, default_sort: str) -> Any:
+        """Order a SQLAlchemy ``query`` by the sort column and ``tiebreaker`` and seek past the cursor.
+
+        ``columns`` maps sortable field names to columns, so no raw SQL is built from the
+        request; ``tiebreaker`` must be unique, usually the primary key. One row more than
+        ``size`` is fetched so ``collect`` can tell whether another page follows.
+        """
+        from sqlalchemy import tuple_
+
+        field, descending = self.sort_key(default_sort)
+        if field not in columns:
+            raise ValueError(f"Cannot sort by {field}, expected one of: {', '.join(columns)}")
+        column = columns[field]
+
+        key = self.decode_cursor(field)
+        if key is not None:
+            row, after = tuple_(column, tiebreaker), tuple_(*key)
+            query = query.where(row < after if descending else row > after)
+
+        if descending:
+            return query.order_by(column.desc(), tiebreaker.desc()).limit(self.size + 1)
+        return query.order_by(column.asc(), tiebreaker.asc()).limit(self.size + 1)
+
+    def collect(
+        self, rows: Sequence[T], key: Callable[[T], Sequence[Any]], default_sort: str
+    ) -> Tuple[list[T], str | None]:
+        """Drop the look-ahead row and return the page with the cursor of the next one.
+
+        ``key`` returns a row's ``(sort value, tiebreaker)``.
+        """
+        items = list(rows[: self.size])
+        if len(rows) <= self.size:
+            return items, None
+        field, _ = self.sort_key(default_sort)
+        return items, self.encode_cursor(field, key(items[-1]))
@@ -1,3 +1,4 @@
 from .base import ResponseDto
+from .cursor_page import CursorPage
 
-__all__ = ["ResponseDto"]
+__all__ = ["CursorPage", "ResponseDto"]
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class CursorPage[ItemT](BaseModel):
+    """Keyset-paginated response DTO."""
+
+    items: list[ItemT]
+    next_cursor: str | None = None
@@ -13,4 +13,5 @@ async def custom_exception_handler(request: Request, exc: BaseMsgException) -> J
             "message": exc.message,
             "error": exc.error,
         },
+        headers=getattr(exc, "headers", None),
     )
@@ -1,4 +1,11 @@
-from .correlation_id import CorrelationIdMiddleware
+from .compression import CompressionMiddleware
+from .correlation_id import CorrelationIdMiddleware, correlation_id_ctx, get_correlation_id
 from .session import SessionMiddleware
 
-__all__ = ["CorrelationIdMiddleware", "SessionMiddleware"]
+__all__ = [
+    "CompressionMiddleware",
+    "CorrelationIdMiddleware",
+    "SessionMiddleware",
+    "correlation_id_ctx",
+    "get_correlation_id",
+]
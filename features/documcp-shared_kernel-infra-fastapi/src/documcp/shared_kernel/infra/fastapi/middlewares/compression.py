@@ -0,0 +1,294 @@
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Protocol, Tuple
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Content types that are already compressed and would only grow
+EXCLUDED_CONTENT_TYPES = (
+    "application/gzip",
+    "application/x-gzip",
+    "application/zip",
+    "application/zstd",
+    "audio/",
+    "font/woff",
+    "image/",
+    "video/",
+)
+
+# Whole bodies at least this large are compressed in a worker thread instead of on the event loop
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far while keeping the stream open."""
+
+    def finish(self) -> bytes: ...
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        # Brotli qualities run from 0 to 11; the gzip scale maps onto the lower part
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        # Zstandard levels run from 1 to 22; the gzip scale maps onto the fast half
+        self._compressor = zstandard.ZstdCompressor(level=max(level, 1)).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encodings() -> Dict[str, Callable[[int], Compressor]]:
+    """Supported content codings in order of preference; zstd and brotli need their optional packages."""
+    encodings: Dict[str, Callable[[int], Compressor]] = {}
+    if zstandard is not None:
+        encodings["zstd"] = _ZstdCompressor
+    if brotli is not None:
+        encodings["br"] = _BrotliCompressor
+    encodings["gzip"] = _GzipCompressor
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, encodings: Dict[str, Callable[[int], Compressor]]) -> Optional[str]:
+    """Pick the encoding with the highest q-value in ``Accept-Encoding``, breaking ties by our preference."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = None, 0.0
+    for name in encodings:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+class PrecompressedCache:
+    """LRU of compressed bodies keyed by a digest of the uncompressed body and the encoding, bounded by total size.
+
+    Keying on the body itself rather than the ``ETag`` keeps responses that share a tag on different
+    paths or queries apart; one ``max_bytes`` budget covers every encoding.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Tuple[bytes, str], bytes] = OrderedDict()
+
+    def get(self, digest: bytes, encoding: str) -> Optional[bytes]:
+        key = (digest, encoding)
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, digest: bytes, encoding: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        key = (digest, encoding)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+
+class CompressionMiddleware:
+    """Compress responses with zstd, brotli or gzip as negotiated from ``Accept-Encoding``.
+
+    Complete bodies below ``minimum_size`` are sent as-is. Streamed bodies (including
+    server-sent events) are compressed chunk by chunk and flushed after every chunk, so
+    nothing is held back. Complete bodies of responses with an ``ETag`` are compressed once
+    per encoding and served from ``cache`` when the same body is sent again; other bodies
+    are unlikely to repeat and are compressed without entering the cache.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 800,
+        compress_level: int = 6,
+        precompressed_max_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compress_level = compress_level
+        self.encodings = available_encodings()
+        self.cache = PrecompressedCache(precompressed_max_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._compressor: Optional[Compressor] = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body message tells whether the response is streamed
+            self._start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self._passthrough:
+            await self._send(message)
+        elif self._compressor is not None:
+            await self._send_chunk(message)
+        else:
+            await self._send_first(message)
+
+    async def _send_first(self, message: Message) -> None:
+        start = self._start
+        assert start is not None
+        headers = MutableHeaders(scope=start)
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if (
+            "content-encoding" in headers
+            or headers.get("content-type", "").startswith(EXCLUDED_CONTENT_TYPES)
+            or (not more_body and len(body) < self.middleware.minimum_size)
+        ):
+            self._passthrough = True
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+
+        if more_body:
+            # Streamed: the final length is unknown, so fall back to chunked transfer
+            del headers["Content-Length"]
+            self._compressor = self.middleware.encodings[self.encoding](self.middleware.compress_level)
+            await self._send(start)
+            await self._send_chunk(message)
+            return
+
+        body = await self._compress_body(body, cacheable="etag" in headers)
+        headers["Content-Length"] = str(len(body))
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": body})
+
+    async def _send_chunk(self, message: Message) -> None:
+        compressor = self._compressor
+        assert compressor is not None
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        data = compressor.compress(body)
+        data += compressor.flush() if more_body else compressor.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def _compress_body(self, body: bytes, cacheable: bool) -> bytes:
+        cache = self.middleware.cache
+        in_thread = len(body) >= THREAD_MINIMUM_SIZE
+        digest = None
+        if cacheable:
+            # Hashing is far cheaper than compressing, so a repeated body skips the compressor
+            digest = await anyio.to_thread.run_sync(_digest, body) if in_thread else _digest(body)
+            cached = cache.get(digest, self.encoding)
+            if cached is not None:
+                return cached
+
+        compressor = self.middleware.encodings[self.encoding](self.middleware.compress_level)
+        if in_thread:
+            compressed = await anyio.to_thread.run_sync(lambda: compressor.compress(body) + compressor.finish())
+        else:
+            compressed = compressor.compress(body) + compressor.finish()
+
+        if digest is not None:
+            cache.put(digest, self.encoding, compressed)
+        return compressed
+
+
+def _digest(body: bytes) -> bytes:
+    return hashlib.blake2b(body, digest_size=16).digest()
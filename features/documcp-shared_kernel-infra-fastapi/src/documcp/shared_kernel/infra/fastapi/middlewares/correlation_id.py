@@ -1,18 +1,53 @@
 import uuid
+from contextvars import ContextVar
+from typing import Optional
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+# Correlation id of the request being handled, for code that has no access to the request
+correlation_id_ctx: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
-    """Middleware to add correlation ID to requests."""
 
-    async def dispatch(self, request: Request, call_next):
-        correlation_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
-        request.state.correlation_id = correlation_id
+def get_correlation_id() -> Optional[str]:
+    """Return the correlation id of the current request, if any."""
+    return correlation_id_ctx.get()
 
-        response: Response = await call_next(request)
-        response.headers["X-Correlation-ID"] = correlation_id
 
-        return response
+class CorrelationIdMiddleware:
+    """Middleware to add correlation ID to requests.
+
+    Implemented as plain ASGI rather than ``BaseHTTPMiddleware``, so the downstream
+    app runs in the same task: streamed responses are passed through untouched and
+    client disconnects reach the endpoint.
+    """
+
+    def __init__(self, app: ASGIApp, header_name: str = "X-Correlation-ID"):
+        self.app = app
+        self.header_name = header_name
+        self._raw_header_name = header_name.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        correlation_id = None
+        for name, value in scope["headers"]:
+            if name == self._raw_header_name:
+                correlation_id = value.decode("latin-1")
+                break
+        if not correlation_id:
+            correlation_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["correlation_id"] = correlation_id
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[self.header_name] = correlation_id
+            await send(message)
+
+        token = correlation_id_ctx.set(correlation_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            correlation_id_ctx.reset(token)
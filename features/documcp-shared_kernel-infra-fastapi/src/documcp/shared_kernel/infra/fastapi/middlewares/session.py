@@ -1,7 +1,23 @@
+from typing import Any, Sequence
+
 from starlette.middleware.sessions import SessionMiddleware as StarletteSessionMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 
 class SessionMiddleware(StarletteSessionMiddleware):
-    """Custom session middleware wrapper."""
+    """Cookie session middleware that only runs for opted-in routes.
+
+    Requests whose path does not start with one of ``include_paths`` skip cookie
+    parsing and signing entirely and have no ``request.session``. With no paths,
+    sessions are disabled.
+    """
+
+    def __init__(self, app: ASGIApp, secret_key: str, include_paths: Sequence[str] = (), **kwargs: Any):
+        super().__init__(app, secret_key=secret_key, **kwargs)
+        self.include_paths = tuple(include_paths)
 
-    pass
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and scope["path"].startswith(self.include_paths):
+            await super().__call__(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -1,3 +1,16 @@
+from .disconnect import ClientDisconnected, cancel_on_disconnect
+from .msgspec_body import msgspec_body, request_body_openapi
+from .ndjson import NDJSON_MEDIA_TYPE, LineTooLong, NDJSONRequestLines, NDJSONStreamingResponse
 from .responses import MsgSpecJSONResponse
 
-__all__ = ["MsgSpecJSONResponse"]
+__all__ = [
+    "NDJSON_MEDIA_TYPE",
+    "ClientDisconnected",
+    "LineTooLong",
+    "MsgSpecJSONResponse",
+    "NDJSONRequestLines",
+    "NDJSONStreamingResponse",
+    "cancel_on_disconnect",
+    "msgspec_body",
+    "request_body_openapi",
+]
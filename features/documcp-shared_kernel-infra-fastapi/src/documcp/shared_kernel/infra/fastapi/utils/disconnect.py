@@ -0,0 +1,40 @@
+import asyncio
+from typing import Awaitable, TypeVar
+
+from starlette.requests import Request
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """The client closed the connection before the response was ready."""
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable``, cancelling it as soon as the client disconnects.
+
+    Starlette keeps running a regular endpoint after its client has gone away; this watches
+    ``receive`` for ``http.disconnect`` so expensive work stops instead, and raises
+    ``ClientDisconnected``. The request body must have been read already.
+    """
+    work = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait((work, watcher), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not work.done():
+            work.cancel()
+            # Let the cancellation unwind, closing upstream connections, before answering
+            await asyncio.gather(work, return_exceptions=True)
+
+    if work.cancelled():
+        raise ClientDisconnected()
+    return work.result()
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
@@ -0,0 +1,54 @@
+from typing import Any, Awaitable, Callable, Dict, Type, TypeVar
+
+import msgspec
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+def msgspec_body(struct_type: Type[T]) -> Callable[[Request], Awaitable[T]]:
+    """Dependency decoding the JSON request body straight into ``struct_type`` with msgspec.
+
+    Invalid bodies raise ``RequestValidationError``, so clients get the usual 422 response.
+    Routes using it declare no body parameter; document the body with ``request_body_openapi``.
+    """
+
+    async def decode(request: Request) -> T:
+        body = await request.body()
+        try:
+            return msgspec.json.decode(body, type=struct_type)
+        except msgspec.ValidationError as e:
+            raise RequestValidationError([{"type": "value_error", "loc": ("body",), "msg": str(e), "input": None}])
+        except msgspec.DecodeError as e:
+            raise RequestValidationError([{"type": "json_invalid", "loc": ("body",), "msg": str(e), "input": None}])
+
+    return decode
+
+
+def request_body_openapi(model: Type[BaseModel], media_type: str = "application/json") -> Dict[str, Any]:
+    """``openapi_extra`` documenting ``model`` as the JSON body of a route that uses ``msgspec_body``.
+
+    Routes reading the body themselves, e.g. one JSON document per line, pass its ``media_type``.
+    """
+    schema = model.model_json_schema()
+    definitions = schema.pop("$defs", {})
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {media_type: {"schema": _inline_refs(schema, definitions)}},
+        }
+    }
+
+
+def _inline_refs(schema: Any, definitions: Dict[str, Any]) -> Any:
+    """Replace local ``#/$defs/...`` references, which do not resolve inside an OpenAPI document."""
+    if isinstance(schema, dict):
+        ref = schema.get("$ref", "")
+        if ref.startswith("#/$defs/"):
+            return _inline_refs(definitions[ref[len("#/$defs/") :]], definitions)
+        return {key: _inline_refs(value, definitions) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_inline_refs(item, definitions) for item in schema]
+    return schema
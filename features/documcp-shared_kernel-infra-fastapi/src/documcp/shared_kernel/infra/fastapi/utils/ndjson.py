@@ -0,0 +1,84 @@
+import asyncio
+from typing import AsyncIterator, Mapping, Optional
+
+import anyio
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class LineTooLong(ValueError):
+    """A request body line is longer than allowed."""
+
+
+class NDJSONRequestLines:
+    """The non-blank lines of a newline-delimited request body, read as they arrive.
+
+    Only the current line is buffered, so the body never has to fit in memory.
+    ``consumed`` is set once reading stops.
+    """
+
+    def __init__(self, request: Request, max_line_bytes: int):
+        self.request = request
+        self.max_line_bytes = max_line_bytes
+        self.consumed = asyncio.Event()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        buffer = bytearray()
+        try:
+            async for chunk in self.request.stream():
+                buffer += chunk
+                start = 0
+                while (end := buffer.find(b"\n", start)) >= 0:
+                    line = bytes(buffer[start:end])
+                    start = end + 1
+                    if line.strip():
+                        yield line
+                del buffer[:start]
+                if len(buffer) > self.max_line_bytes:
+                    raise LineTooLong(f"Line longer than {self.max_line_bytes:,} bytes")
+            if buffer.strip():
+                yield bytes(buffer)
+        finally:
+            self.consumed.set()
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Stream newline-delimited JSON, possibly while the request body is still being read.
+
+    ``StreamingResponse`` watches for disconnects by reading ``receive`` alongside the
+    stream, which would steal the chunks of a request body that the stream reads from
+    ``lines``. This response only starts watching once ``lines`` is consumed; before that,
+    a disconnect reaches the body reader as ``ClientDisconnect``.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    def __init__(
+        self,
+        content: AsyncIterator[bytes],
+        lines: NDJSONRequestLines,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        super().__init__(content, status_code=status_code, headers=headers, background=background)
+        self.lines = lines
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async with anyio.create_task_group() as task_group:
+
+            async def stream() -> None:
+                await self.stream_response(send)
+                task_group.cancel_scope.cancel()
+
+            task_group.start_soon(stream)
+            await self.lines.consumed.wait()
+            await self.listen_for_disconnect(receive)
+            task_group.cancel_scope.cancel()
+
+        if self.background is not None:
+            await self.background()
@@ -72,6 +72,8 @@ class GZipSettings(BaseModel):
     enable: bool = True
     minimum_size: int = 800
     compress_level: int = 9
+    # Compressed bodies of responses with an ETag, keyed by body digest, are kept up to this size across all encodings
+    precompressed_max_bytes: int = 32 * 1024 * 1024
 
     @field_validator("compress_level")
     def check_compress_level_rate(cls, v):
@@ -92,6 +94,8 @@ class CORSSettings(BaseModel):
 
 class SessionSettings(BaseModel):
     secret_key: str = "your-session-secret-key"
+    # Path prefixes that use cookie sessions; other routes bypass the session middleware
+    include_paths: T.List[str] = []
 
 
 class RedisStoreSettings(BaseModel):
@@ -0,0 +1,8 @@
+"""Load benchmarks for the DocuMCP backend against a mock OpenAI-compatible LLM server.
+
+Run from ``projects/documcp-backend``::
+
+    python -m benchmarks                      # compare against benchmarks/baseline.json
+    python -m benchmarks --save-baseline      # record a new baseline
+    python -m benchmarks.mock_llm --port 1234 # serve the mock LLM on its own
+"""
@@ -0,0 +1,70 @@
+"""Command line entry point: ``python -m benchmarks``."""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from benchmarks.mock_llm import MockLLMConfig
+from benchmarks.runner import TARGETS, BenchmarkConfig, compare, format_report, load_baseline, run_suite
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark DocuMCP against a mock OpenAI-compatible LLM")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Comma-separated subset of generate,stream,mcp")
+    parser.add_argument("--levels", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per target and level")
+    parser.add_argument("--document-types", default="readme", help="Comma-separated document types per request")
+    parser.add_argument("--ttft", type=float, default=MockLLMConfig.ttft, help="Mock time to first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=MockLLMConfig.tokens_per_second)
+    parser.add_argument("--completion-tokens", type=int, default=MockLLMConfig.completion_tokens)
+    parser.add_argument("--slots", type=int, default=MockLLMConfig.slots, help="Mock parallel sequences")
+    parser.add_argument("--error-rate", type=float, default=MockLLMConfig.error_rate, help="Injected failure ratio")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 regression ratio")
+    parser.add_argument("--slo-p95", type=float, default=5.0, help="p95 latency goal in seconds")
+    args = parser.parse_args()
+
+    config = BenchmarkConfig(
+        targets=args.targets.split(","),
+        levels=[int(level) for level in args.levels.split(",")],
+        requests=args.requests,
+        document_types=args.document_types.split(","),
+        mock=MockLLMConfig(
+            ttft=args.ttft,
+            tokens_per_second=args.tokens_per_second,
+            completion_tokens=args.completion_tokens,
+            slots=args.slots,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        ),
+    )
+
+    report = asyncio.run(run_suite(config))
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    print(format_report(report, baseline))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    problems = compare(report, baseline, args.tolerance, args.slo_p95)
+    for problem in problems:
+        print(f"FAIL {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
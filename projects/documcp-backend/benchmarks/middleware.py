@@ -0,0 +1,132 @@
+"""Per-request overhead of the shared-kernel middleware stack: ``python -m benchmarks.middleware``.
+
+Requests are sent straight through ASGI, without a server or HTTP client, so the
+numbers isolate the middleware cost. The ``legacy`` stack reproduces the previous
+``BaseHTTPMiddleware`` correlation id middleware with sessions on every route.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.sessions import SessionMiddleware as StarletteSessionMiddleware
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from documcp.shared_kernel.infra.fastapi.middlewares import CorrelationIdMiddleware, SessionMiddleware
+
+SECRET_KEY = "benchmark-secret"
+
+
+class LegacyCorrelationIdMiddleware(BaseHTTPMiddleware):
+    """The correlation id middleware as it was before the pure ASGI rewrite."""
+
+    async def dispatch(self, request, call_next):
+        correlation_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
+        request.state.correlation_id = correlation_id
+        response = await call_next(request)
+        response.headers["X-Correlation-ID"] = correlation_id
+        return response
+
+
+async def _plain(request):
+    return PlainTextResponse("ok")
+
+
+async def _stream(request):
+    async def chunks():
+        for _ in range(8):
+            yield b"data: chunk\n\n"
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+STACKS: Dict[str, Callable[[], List[Middleware]]] = {
+    "none": lambda: [],
+    "legacy": lambda: [
+        Middleware(LegacyCorrelationIdMiddleware),
+        Middleware(StarletteSessionMiddleware, secret_key=SECRET_KEY),
+    ],
+    "asgi": lambda: [
+        Middleware(CorrelationIdMiddleware),
+        Middleware(SessionMiddleware, secret_key=SECRET_KEY),
+    ],
+}
+
+
+def build_app(stack: str) -> Starlette:
+    routes = [Route("/plain", _plain), Route("/stream", _stream)]
+    return Starlette(routes=routes, middleware=STACKS[stack]())
+
+
+async def call(app: Any, path: str) -> None:
+    """Send one GET request through the ASGI app and drain the response."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    received = False
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal received
+        if received:
+            # Only reached once the response is complete
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(stack: str, path: str, requests: int, warmup: int = 200) -> float:
+    """Mean seconds per request of ``stack`` on ``path``."""
+    app = build_app(stack)
+    for _ in range(warmup):
+        await call(app, path)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app, path)
+    return (time.perf_counter() - started) / requests
+
+
+async def run(requests: int) -> Dict[str, Dict[str, float]]:
+    return {path: {stack: await measure(stack, path, requests) for stack in STACKS} for path in ("/plain", "/stream")}
+
+
+def format_report(results: Dict[str, Dict[str, float]]) -> str:
+    """Per-request time of each stack and its overhead over no middleware, in microseconds."""
+    lines = [f"{'path':<9}{'stack':<8}{'us/req':>10}{'overhead':>10}", "-" * 37]
+    for path, stacks in results.items():
+        for stack, seconds in stacks.items():
+            overhead = (seconds - stacks["none"]) * 1e6
+            lines.append(f"{path:<9}{stack:<8}{seconds * 1e6:>10.1f}{overhead:>10.1f}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the per-request overhead of the middleware stack")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    print(format_report(asyncio.run(run(args.requests))))
+
+
+if __name__ == "__main__":
+    main()
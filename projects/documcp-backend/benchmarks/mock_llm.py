@@ -0,0 +1,160 @@
+"""Mock OpenAI-compatible LLM server with controllable latency, throughput and failures."""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+
+@dataclass(kw_only=True)
+class MockLLMConfig:
+    """Behaviour of the mock server.
+
+    Every completion holds one of ``slots`` for ``ttft + completion_tokens / tokens_per_second``
+    seconds; requests beyond ``slots`` wait, like a local server with a fixed number of
+    parallel sequences. ``error_rate`` of the requests fail with ``error_status``.
+    """
+
+    model: str = "mock-model"
+    ttft: float = 0.05
+    tokens_per_second: float = 200.0
+    completion_tokens: int = 64
+    slots: int = 4
+    error_rate: float = 0.0
+    error_status: int = 500
+    seed: Optional[int] = None
+
+
+class MockLLMServer:
+    """Serve ``/v1/models`` and ``/v1/chat/completions`` and record upstream service times."""
+
+    def __init__(self, config: Optional[MockLLMConfig] = None):
+        self.config = config or MockLLMConfig()
+        self.app = Starlette(
+            routes=[
+                Route("/v1/models", self.models, methods=["GET"]),
+                Route("/v1/chat/completions", self.chat_completions, methods=["POST"]),
+            ]
+        )
+        self._random = random.Random(self.config.seed)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.service_times: List[float] = []
+        self.requests = 0
+        self.errors = 0
+
+    def reset(self) -> None:
+        """Forget recorded requests, e.g. between benchmark levels."""
+        self.service_times = []
+        self.requests = 0
+        self.errors = 0
+
+    async def models(self, request: Request) -> Response:
+        return JSONResponse({"object": "list", "data": [{"id": self.config.model, "object": "model"}]})
+
+    async def chat_completions(self, request: Request) -> Response:
+        started = time.perf_counter()
+        payload = await request.json()
+        self.requests += 1
+
+        if self._random.random() < self.config.error_rate:
+            self.errors += 1
+            return JSONResponse(
+                {"error": {"message": "Injected failure", "type": "server_error"}}, status_code=self.config.error_status
+            )
+
+        tokens = min(payload.get("max_tokens") or self.config.completion_tokens, self.config.completion_tokens)
+        if payload.get("stream"):
+            return StreamingResponse(self._stream(tokens, started), media_type="text/event-stream")
+
+        async with self._get_slots():
+            await asyncio.sleep(self.config.ttft + tokens / self.config.tokens_per_second)
+
+        self.service_times.append(time.perf_counter() - started)
+        return JSONResponse(
+            {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "model": self.config.model,
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": _text(tokens)}, "finish_reason": "stop"}
+                ],
+                "usage": {"prompt_tokens": 0, "completion_tokens": tokens, "total_tokens": tokens},
+            }
+        )
+
+    async def _stream(self, tokens: int, started: float) -> AsyncIterator[str]:
+        async with self._get_slots():
+            await asyncio.sleep(self.config.ttft)
+            for i in range(tokens):
+                if i:
+                    await asyncio.sleep(1 / self.config.tokens_per_second)
+                chunk = {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": f"tok{i} "}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        self.service_times.append(time.perf_counter() - started)
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # Created lazily so the semaphore belongs to the server's event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.config.slots)
+        return self._slots
+
+
+@asynccontextmanager
+async def serve(app: Any, host: str = "127.0.0.1", port: int = 0, lifespan: str = "auto") -> AsyncIterator[str]:
+    """Run an ASGI app with uvicorn in the current event loop and yield its base URL."""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, lifespan=lifespan, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+
+    while not server.started:
+        if task.done():
+            await task
+            raise RuntimeError("Server failed to start")
+        await asyncio.sleep(0.01)
+
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{bound_port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+def _text(tokens: int) -> str:
+    return " ".join(f"tok{i}" for i in range(tokens))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI-compatible LLM")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--ttft", type=float, default=MockLLMConfig.ttft)
+    parser.add_argument("--tokens-per-second", type=float, default=MockLLMConfig.tokens_per_second)
+    parser.add_argument("--completion-tokens", type=int, default=MockLLMConfig.completion_tokens)
+    parser.add_argument("--slots", type=int, default=MockLLMConfig.slots)
+    parser.add_argument("--error-rate", type=float, default=MockLLMConfig.error_rate)
+    args = parser.parse_args()
+
+    config = MockLLMConfig(
+        ttft=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        slots=args.slots,
+        error_rate=args.error_rate,
+    )
+    uvicorn.run(MockLLMServer(config).app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
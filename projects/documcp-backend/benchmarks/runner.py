@@ -0,0 +1,247 @@
+"""Drive the HTTP and MCP entry points at increasing concurrency and summarize latencies."""
+
+import asyncio
+import itertools
+import json
+import math
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from mcp.types import TextContent
+
+from benchmarks.mock_llm import MockLLMConfig, MockLLMServer, serve
+
+TARGETS = ("generate", "stream", "mcp")
+
+# Request numbers are unique across targets and levels so no request is served from the cache
+_request_ids = itertools.count()
+
+
+@dataclass(kw_only=True)
+class Sample:
+    """Outcome of one benchmark request."""
+
+    latency: float
+    ok: bool
+    ttft: Optional[float] = None
+
+
+@dataclass(kw_only=True)
+class BenchmarkConfig:
+    """What to run; each request asks for ``document_types`` about a distinct project."""
+
+    targets: List[str] = field(default_factory=lambda: list(TARGETS))
+    levels: List[int] = field(default_factory=lambda: [1, 4, 16])
+    requests: int = 32
+    document_types: List[str] = field(default_factory=lambda: ["readme"])
+    mock: MockLLMConfig = field(default_factory=MockLLMConfig)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: List[Sample], duration: float, upstream_times: List[float]) -> Dict[str, float]:
+    """Throughput, latency percentiles and service-side overhead of one benchmark level.
+
+    Overhead is the median end-to-end latency minus the median time the mock LLM spent
+    serving a completion, i.e. the time added by DocuMCP itself when each request
+    produces a single upstream call.
+    """
+    latencies = [sample.latency for sample in samples if sample.ok]
+    ttfts = [sample.ttft for sample in samples if sample.ok and sample.ttft is not None]
+    upstream_p50 = percentile(upstream_times, 50)
+
+    summary = {
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if not sample.ok),
+        "throughput_rps": len(latencies) / duration if duration else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "upstream_p50": upstream_p50,
+        "overhead_p50": percentile(latencies, 50) - upstream_p50 if latencies else 0.0,
+    }
+    if ttfts:
+        summary["ttft_p50"] = percentile(ttfts, 50)
+    return summary
+
+
+async def run_level(request_fn: Callable[[int], Awaitable[Sample]], concurrency: int, requests: int) -> tuple:
+    """Issue ``requests`` calls with at most ``concurrency`` in flight."""
+    remaining = iter(range(requests))
+    samples: List[Sample] = []
+
+    async def worker() -> None:
+        for _ in remaining:
+            samples.append(await request_fn(next(_request_ids)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+async def run_suite(config: BenchmarkConfig) -> Dict[str, Any]:
+    """Start the mock LLM and the backend, then benchmark every target and level."""
+    mock = MockLLMServer(config.mock)
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    async with serve(mock.app) as llm_url:
+        with tempfile.TemporaryDirectory() as data_dir:
+            _configure_backend(llm_url, data_dir, config)
+
+            http_targets = [target for target in config.targets if target in ("generate", "stream")]
+            if http_targets:
+                # Imported late: the backend reads its settings from the environment at import time
+                from documcp.backend.api import generation
+                from documcp.backend.main import create_app
+
+                async with serve(create_app(), lifespan="on") as api_url:
+                    # The API connects to the LLM in the background; measure only once it is ready
+                    if not await generation.readiness.wait(timeout=30):
+                        raise RuntimeError(f"Backend not ready: {generation.readiness.error}")
+                    async with httpx.AsyncClient(base_url=api_url, timeout=None) as client:
+                        for target in http_targets:
+                            request_fn = _http_request_fn(client, target, config)
+                            results[target] = await _run_levels(mock, request_fn, config)
+
+            if "mcp" in config.targets:
+                from documcp.backend import mcp_server
+
+                await mcp_server.initialize_services()
+                try:
+                    results["mcp"] = await _run_levels(mock, _mcp_request_fn(mcp_server, config), config)
+                finally:
+                    await mcp_server.shutdown_services()
+
+    return {"config": asdict(config), "results": results}
+
+
+def compare(report: Dict[str, Any], baseline: Optional[Dict[str, Any]], tolerance: float, slo_p95: float) -> List[str]:
+    """List SLO violations and p95 regressions beyond ``tolerance`` relative to the baseline."""
+    problems = []
+    baseline_results = (baseline or {}).get("results", {})
+
+    for target, levels in report["results"].items():
+        for level, summary in levels.items():
+            if summary["p95"] > slo_p95:
+                problems.append(f"{target} @ {level}: p95 {summary['p95']:.3f}s exceeds the {slo_p95:.1f}s goal")
+
+            reference = baseline_results.get(target, {}).get(level)
+            if reference and reference["p95"] and summary["p95"] > reference["p95"] * (1 + tolerance):
+                problems.append(f"{target} @ {level}: p95 {summary['p95']:.3f}s regressed from {reference['p95']:.3f}s")
+    return problems
+
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Render results as a table, with the p95 change against the baseline when available."""
+    baseline_results = (baseline or {}).get("results", {})
+    header = (
+        f"{'target':<9}{'conc':>5}{'req':>5}{'err':>5}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+        f"{'ttft50':>9}{'ovh50':>9}{'p95 vs base':>13}"
+    )
+    lines = [header, "-" * len(header)]
+
+    for target, levels in report["results"].items():
+        for level, summary in levels.items():
+            reference = baseline_results.get(target, {}).get(level)
+            delta = f"{(summary['p95'] / reference['p95'] - 1) * 100:+.1f}%" if reference and reference["p95"] else "-"
+            ttft = f"{summary['ttft_p50']:.3f}" if "ttft_p50" in summary else "-"
+            lines.append(
+                f"{target:<9}{level:>5}{summary['requests']:>5}{summary['errors']:>5}"
+                f"{summary['throughput_rps']:>9.2f}{summary['p50']:>9.3f}{summary['p95']:>9.3f}"
+                f"{summary['p99']:>9.3f}{ttft:>9}{summary['overhead_p50']:>9.3f}{delta:>13}"
+            )
+    return "\n".join(lines)
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+async def _run_levels(
+    mock: MockLLMServer, request_fn: Callable[[int], Awaitable[Sample]], config: BenchmarkConfig
+) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for concurrency in config.levels:
+        mock.reset()
+        samples, duration = await run_level(request_fn, concurrency, config.requests)
+        results[str(concurrency)] = summarize(samples, duration, mock.service_times)
+    return results
+
+
+def _configure_backend(llm_url: str, data_dir: str, config: BenchmarkConfig) -> None:
+    os.environ.update(
+        {
+            "DOCUMCP_LM_STUDIO__BASE_URL": llm_url,
+            "DOCUMCP_LM_STUDIO__MODEL_NAME": config.mock.model,
+            # Keep every store in the run's temporary directory, away from the developer's ./data
+            "DOCUMCP_JOBS__STORE_PATH": os.path.join(data_dir, "jobs.db"),
+            "DOCUMCP_DATABASE__URL": f"sqlite+aiosqlite:///{os.path.join(data_dir, 'database.db')}",
+            "DOCUMCP_DOCUMENTS__PATH": os.path.join(data_dir, "documents.db"),
+        }
+    )
+    # Let the backend use every mock slot and queue the largest level, unless told otherwise
+    os.environ.setdefault("DOCUMCP_SCHEDULER__MAX_CONCURRENCY", str(config.mock.slots))
+    os.environ.setdefault("DOCUMCP_SCHEDULER__MAX_QUEUE_SIZE", str(max(config.levels) * len(config.document_types)))
+
+
+def _payload(index: int, config: BenchmarkConfig) -> Dict[str, Any]:
+    # A distinct project per request, so the cache and request coalescing do not skew results
+    return {
+        "input_text": f"Benchmark project {index}: a service that turns project descriptions into documentation.",
+        "project_name": f"bench-{index}",
+        "document_types": config.document_types,
+    }
+
+
+def _http_request_fn(
+    client: httpx.AsyncClient, target: str, config: BenchmarkConfig
+) -> Callable[[int], Awaitable[Sample]]:
+    async def generate(index: int) -> Sample:
+        started = time.perf_counter()
+        response = await client.post("/api/v1/generate", json=_payload(index, config))
+        ok = response.status_code == 200 and not any(
+            document["metadata"].get("error") for document in response.json()["documents"]
+        )
+        return Sample(latency=time.perf_counter() - started, ok=ok)
+
+    async def stream(index: int) -> Sample:
+        started = time.perf_counter()
+        ttft = None
+        ok = False
+        async with client.stream("POST", "/api/v1/generate/stream", json=_payload(index, config)) as response:
+            async for line in response.aiter_lines():
+                if line == "event: chunk" and ttft is None:
+                    ttft = time.perf_counter() - started
+                elif line == "event: error":
+                    break
+                elif line == "event: done":
+                    ok = response.status_code == 200
+        return Sample(latency=time.perf_counter() - started, ok=ok, ttft=ttft)
+
+    return generate if target == "generate" else stream
+
+
+def _mcp_request_fn(mcp_server: Any, config: BenchmarkConfig) -> Callable[[int], Awaitable[Sample]]:
+    async def call_tool(index: int) -> Sample:
+        started = time.perf_counter()
+        contents = await mcp_server.handle_call_tool("generate_documents", _payload(index, config))
+        # Documents come back as resource links next to the text summary
+        texts = [content.text for content in contents if isinstance(content, TextContent)]
+        ok = bool(texts) and not any(text.startswith("Error") or "# Error" in text for text in texts)
+        return Sample(latency=time.perf_counter() - started, ok=ok)
+
+    return call_tool
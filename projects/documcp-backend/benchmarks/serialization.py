@@ -0,0 +1,146 @@
+"""Request decoding and response encoding cost: ``python -m benchmarks.serialization``.
+
+Compares FastAPI's pydantic path (body validation, ``response_model`` validation and
+serialization to Python objects) with the msgspec path used by the generation routes, on large
+multi-document responses. Requests go straight through ASGI and the endpoint returns a
+prebuilt response, so only decoding, encoding and framework overhead are measured.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from fastapi import Depends, FastAPI
+
+from documcp.backend.domain.models import DocumentType, GeneratedDocument, GenerationRequest, GenerationResponse
+from documcp.backend.domain.structs import GenerationRequestStruct, GenerationResponseStruct
+from documcp.shared_kernel.infra.fastapi.utils import MsgSpecJSONResponse, msgspec_body, request_body_openapi
+
+PARAGRAPH = "DocuMCP turns project descriptions into Markdown documentation, with headings, lists and `code`.\n"
+
+
+def build_response(documents: int, document_kb: int) -> GenerationResponse:
+    content = "# Document\n\n" + PARAGRAPH * (document_kb * 1024 // len(PARAGRAPH))
+    types = list(DocumentType)
+    return GenerationResponse(
+        documents=[
+            GeneratedDocument(
+                document_type=types[i % len(types)],
+                content=content,
+                metadata={"generated_by": "bench", "cached": False, "length": len(content)},
+            )
+            for i in range(documents)
+        ],
+        generation_time=1.5,
+        model_info={"model_name": "bench-model", "service": "LM Studio"},
+    )
+
+
+def build_app(path: str, response: GenerationResponse) -> FastAPI:
+    app = FastAPI(default_response_class=MsgSpecJSONResponse)
+
+    if path == "pydantic":
+
+        @app.post("/generate", response_model=GenerationResponse)
+        async def generate_pydantic(request: GenerationRequest) -> GenerationResponse:
+            return response
+
+    else:
+        decode = msgspec_body(GenerationRequestStruct)
+
+        @app.post("/generate", response_model=GenerationResponse, openapi_extra=request_body_openapi(GenerationRequest))
+        async def generate_msgspec(body: GenerationRequestStruct = Depends(decode)) -> MsgSpecJSONResponse:
+            body.to_model()
+            return MsgSpecJSONResponse(GenerationResponseStruct.from_model(response))
+
+    return app
+
+
+async def call(app: Any, body: bytes) -> int:
+    """POST ``body`` to ``/generate`` through ASGI and return the response size."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/generate",
+        "raw_path": b"/generate",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    received = False
+    size = 0
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def measure(path: str, response: GenerationResponse, body: bytes, requests: int) -> Dict[str, float]:
+    app = build_app(path, response)
+    size = 0
+    for _ in range(max(requests // 10, 5)):
+        size = await call(app, body)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app, body)
+    return {"seconds": (time.perf_counter() - started) / requests, "bytes": size}
+
+
+async def run(
+    documents: List[int], document_kb: int, input_kb: int, requests: int
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    input_text = PARAGRAPH * (input_kb * 1024 // len(PARAGRAPH))
+    body = json.dumps(
+        {"input_text": input_text, "document_types": ["prd", "what_is_this", "readme"], "project_name": "bench"}
+    ).encode()
+    results = {}
+    for count in documents:
+        response = build_response(count, document_kb)
+        results[str(count)] = {path: await measure(path, response, body, requests) for path in ("pydantic", "msgspec")}
+    return results
+
+
+def format_report(results: Dict[str, Dict[str, Dict[str, float]]]) -> str:
+    lines = [f"{'docs':>5}{'bytes':>11}{'pydantic ms':>13}{'msgspec ms':>12}{'speedup':>9}", "-" * 50]
+    for count, paths in results.items():
+        pydantic_ms = paths["pydantic"]["seconds"] * 1e3
+        msgspec_ms = paths["msgspec"]["seconds"] * 1e3
+        lines.append(
+            f"{count:>5}{paths['msgspec']['bytes']:>11,}{pydantic_ms:>13.3f}{msgspec_ms:>12.3f}"
+            f"{pydantic_ms / msgspec_ms:>8.1f}x"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare pydantic and msgspec request/response handling")
+    parser.add_argument("--documents", default="3,30", help="Comma-separated documents per response")
+    parser.add_argument("--document-kb", type=int, default=64, help="Size of each document in KiB")
+    parser.add_argument("--input-kb", type=int, default=64, help="Size of the request input text in KiB")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    documents = [int(count) for count in args.documents.split(",")]
+    print(format_report(asyncio.run(run(documents, args.document_kb, args.input_kb, args.requests))))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,14 @@ from pathlib import Path
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
-from documcp.backend.mcp_server import main
+import documcp.backend.startup  # noqa: E402, F401  (first, to time the imports below)
+from documcp.backend.mcp_server import main, parse_args  # noqa: E402
 
 if __name__ == "__main__":
+    args = parse_args()
+
     # Set environment variables
     os.environ.setdefault("DOCUMCP_MODE", "development")
 
     # Run the MCP server
-    asyncio.run(main())
+    asyncio.run(main(profile_startup=args.profile_startup))
@@ -1,30 +1,97 @@
 """Document generation API endpoints."""
 
-from typing import Any, Dict
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Optional
 
+import httpx
+import msgspec
 import structlog
-from fastapi import APIRouter, Depends, HTTPException
-
-from documcp.backend.domain.models import GenerationRequest, GenerationResponse, HealthResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.requests import ClientDisconnect
+
+from documcp.backend.domain.models import (
+    DocumentUpdateRequest,
+    GenerationRequest,
+    GenerationResponse,
+    HealthResponse,
+    StreamEventType,
+)
+from documcp.backend.domain.structs import (
+    BatchDocumentStruct,
+    BatchErrorStruct,
+    DocumentUpdateRequestStruct,
+    GenerationRequestStruct,
+    GenerationResponseStruct,
+)
+from documcp.backend.services.batch import BatchGenerator, BatchItem, BatchResult
+from documcp.backend.services.cache import GenerationCache
 from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.history import open_recorder
+from documcp.backend.services.ingestion import InputReducer
 from documcp.backend.services.llm_service import LMStudioService
+from documcp.backend.services.metrics import GenerationMetrics
+from documcp.backend.services.readiness import ServiceReadiness
+from documcp.backend.services.scheduler import GenerationScheduler, Priority, QueueFullError
+from documcp.backend.settings import Settings
+from documcp.backend.tracing import current_span, tracer
+from documcp.shared_kernel.infra.fastapi.utils import (
+    NDJSON_MEDIA_TYPE,
+    ClientDisconnected,
+    LineTooLong,
+    MsgSpecJSONResponse,
+    NDJSONRequestLines,
+    NDJSONStreamingResponse,
+    cancel_on_disconnect,
+    msgspec_body,
+    request_body_openapi,
+)
 
 logger = structlog.get_logger(__name__)
 
 router = APIRouter()
 
+# Status for requests whose client disconnected first (nginx's "client closed request")
+CLIENT_CLOSED_REQUEST = 499
+
 # Global service instances (will be initialized in main.py)
 llm_service: LMStudioService = None  # type: ignore
 document_service: DocumentGenerationService = None  # type: ignore
+generation_metrics: Optional[GenerationMetrics] = None
+# Background connection to LM Studio; None when services were wired up without it (tests)
+readiness: Optional[ServiceReadiness] = None
+
+batch_generator: Optional[BatchGenerator] = None
+
+# Longer inputs are summarized before generation, so this only guards against abuse; both limits are
+# replaced from settings by ``initialize_services``
+max_input_chars = 200_000
+max_batch_line_bytes = 4 * 1024 * 1024
+
+GENERATION_REQUEST_BODY = request_body_openapi(GenerationRequest)
+BATCH_REQUEST_BODY = request_body_openapi(GenerationRequest, media_type=NDJSON_MEDIA_TYPE)
+UPDATE_REQUEST_BODY = request_body_openapi(DocumentUpdateRequest)
 
 
 def get_document_service() -> DocumentGenerationService:
     """Dependency to get document service."""
     if document_service is None:
         raise HTTPException(status_code=503, detail="Document service not initialized")
+    if readiness is not None and not readiness.is_ready:
+        detail = "LM Studio is not connected yet" + (f": {readiness.error}" if readiness.error else "")
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": str(int(readiness.retry_interval))})
     return document_service
 
 
+def get_batch_generator(doc_service: DocumentGenerationService = Depends(get_document_service)) -> BatchGenerator:
+    """Dependency to get the batch generator, once the document service is ready."""
+    if batch_generator is None:
+        raise HTTPException(status_code=503, detail="Batch generation not initialized")
+    return batch_generator
+
+
 def get_llm_service() -> LMStudioService:
     """Dependency to get LLM service."""
     if llm_service is None:
@@ -32,11 +99,70 @@ def get_llm_service() -> LMStudioService:
     return llm_service
 
 
-@router.post("/generate", response_model=GenerationResponse)
+def validate_generation_request(
+    body: GenerationRequestStruct = Depends(msgspec_body(GenerationRequestStruct)),
+) -> GenerationRequest:
+    """Dependency to validate a generation request before any service is resolved.
+
+    The body is decoded by msgspec; routes using this dependency document it with
+    ``openapi_extra=GENERATION_REQUEST_BODY``.
+    """
+    request = body.to_model()
+    error = _input_error(request.input_text)
+    if error is not None:
+        raise HTTPException(status_code=400, detail=error)
+    return request
+
+
+def validate_update_request(
+    body: DocumentUpdateRequestStruct = Depends(msgspec_body(DocumentUpdateRequestStruct)),
+) -> DocumentUpdateRequest:
+    """Dependency to validate a document update request; see ``validate_generation_request``."""
+    request = body.to_model()
+    for input_text in (request.input_text, request.previous_input_text):
+        error = _input_error(input_text)
+        if error is not None:
+            raise HTTPException(status_code=400, detail=error)
+    return request
+
+
+def _input_error(input_text: str) -> Optional[str]:
+    if not input_text.strip():
+        return "Input text cannot be empty"
+    if len(input_text) > max_input_chars:
+        return f"Input text too long (max {max_input_chars:,} characters)"
+    return None
+
+
+def get_client_id(request: Request, x_client_id: Optional[str] = Header(default=None)) -> str:
+    """Dependency to identify the caller for per-client scheduling fairness."""
+    if x_client_id:
+        return x_client_id
+    if request.client is not None:
+        return request.client.host
+    return getattr(request.state, "correlation_id", "anonymous")
+
+
+def get_priority() -> Priority:
+    """Dependency to pick the scheduling lane; HTTP callers always use the bulk lane.
+
+    The interactive lane is reserved for MCP tool calls, so no request header can move an
+    HTTP client ahead of the bulk queue.
+    """
+    return Priority.BULK
+
+
+@router.post("/generate", response_model=GenerationResponse, openapi_extra=GENERATION_REQUEST_BODY)
 async def generate_documents(
-    request: GenerationRequest, doc_service: DocumentGenerationService = Depends(get_document_service)
-) -> GenerationResponse:
-    """Generate documents based on input text."""
+    http_request: Request,
+    request: GenerationRequest = Depends(validate_generation_request),
+    doc_service: DocumentGenerationService = Depends(get_document_service),
+    client_id: str = Depends(get_client_id),
+    priority: Priority = Depends(get_priority),
+) -> Response:
+    """Generate documents based on input text; generation stops if the client disconnects."""
+    start_time = time.time()
+    status = "error"
 
     try:
         logger.info(
@@ -46,15 +172,10 @@ async def generate_documents(
             input_length=len(request.input_text),
         )
 
-        # Validate input
-        if not request.input_text.strip():
-            raise HTTPException(status_code=400, detail="Input text cannot be empty")
-
-        if len(request.input_text) > 10000:  # 10KB limit
-            raise HTTPException(status_code=400, detail="Input text too long (max 10,000 characters)")
-
         # Generate documents
-        response = await doc_service.generate_documents(request)
+        response = await cancel_on_disconnect(
+            http_request, doc_service.generate_documents(request, priority=priority, client_id=client_id)
+        )
 
         logger.info(
             "Generation completed successfully",
@@ -62,13 +183,216 @@ async def generate_documents(
             generation_time=response.generation_time,
         )
 
-        return response
-
+        # Serialize here rather than in FastAPI, so the time shows up in the request trace
+        with tracer.span("serialize", documents=len(response.documents)):
+            content = MsgSpecJSONResponse(GenerationResponseStruct.from_model(response))
+
+        status = "ok"
+        return content
+
+    except ClientDisconnected:
+        status = "cancelled"
+        _record_cancellation()
+        logger.info("Client disconnected, generation cancelled")
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except QueueFullError as e:
+        status = "rejected"
+        _record_error(e)
+        raise
     except HTTPException:
         raise
     except Exception as e:
         logger.error("Unexpected error during generation", error=str(e))
+        _record_error(e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    finally:
+        _observe_request("generate", status, start_time)
+
+
+@router.post("/generate/update", response_model=GenerationResponse, openapi_extra=UPDATE_REQUEST_BODY)
+async def update_documents(
+    http_request: Request,
+    request: DocumentUpdateRequest = Depends(validate_update_request),
+    doc_service: DocumentGenerationService = Depends(get_document_service),
+    client_id: str = Depends(get_client_id),
+    priority: Priority = Depends(get_priority),
+) -> Response:
+    """Update documents after an input change, regenerating only the sections the change affects.
+
+    Previous documents missing from the request are looked up in the generation history;
+    documents that cannot be found there are generated in full.
+    """
+    start_time = time.time()
+    status = "error"
+    try:
+        response = await cancel_on_disconnect(
+            http_request, doc_service.update_documents(request, priority=priority, client_id=client_id)
+        )
+        logger.info(
+            "Update completed successfully",
+            documents_updated=len(response.documents),
+            generation_time=response.generation_time,
+        )
+        status = "ok"
+        return MsgSpecJSONResponse(GenerationResponseStruct.from_model(response))
+
+    except ClientDisconnected:
+        status = "cancelled"
+        _record_cancellation()
+        logger.info("Client disconnected, update cancelled")
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except QueueFullError as e:
+        status = "rejected"
+        _record_error(e)
+        raise
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error during update", error=str(e))
+        _record_error(e)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    finally:
+        _observe_request("update", status, start_time)
+
+
+@router.post("/generate/stream", response_class=StreamingResponse, openapi_extra=GENERATION_REQUEST_BODY)
+async def stream_documents(
+    request: GenerationRequest = Depends(validate_generation_request),
+    doc_service: DocumentGenerationService = Depends(get_document_service),
+    client_id: str = Depends(get_client_id),
+    priority: Priority = Depends(get_priority),
+) -> StreamingResponse:
+    """Generate documents, relaying tokens as Server-Sent Events as they arrive."""
+    start_time = time.time()
+
+    logger.info(
+        "Received streaming generation request",
+        document_types=[dt.value for dt in request.document_types],
+        project_name=request.project_name,
+        input_length=len(request.input_text),
+    )
+
+    # Reject before the response starts so the client sees a 429 rather than an error event
+    try:
+        doc_service.check_admission(request)
+    except QueueFullError as e:
+        _record_error(e)
+        _observe_request("stream", "rejected", start_time)
+        raise
+
+    return StreamingResponse(
+        _format_event_stream(doc_service.stream_documents(request, priority=priority, client_id=client_id), start_time),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _format_event_stream(
+    events: AsyncIterator[tuple[StreamEventType, Dict[str, Any]]], start_time: Optional[float] = None
+) -> AsyncIterator[str]:
+    """Serialize service events into the Server-Sent Events wire format."""
+    status = "cancelled"
+    try:
+        serialize_time = 0.0
+        async for event, payload in events:
+            started = time.perf_counter()
+            message = f"event: {event.value}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+            serialize_time += time.perf_counter() - started
+            yield message
+        status = "ok"
+        span = current_span()
+        if span is not None:
+            span.set_attribute("serialize_time", serialize_time)
+    except Exception as e:
+        status = "error"
+        logger.error("Unexpected error during streamed generation", error=str(e))
+        _record_error(e)
+        error = {"error": True, "error_message": f"Internal server error: {str(e)}"}
+        yield f"event: {StreamEventType.ERROR.value}\ndata: {json.dumps(error)}\n\n"
+    finally:
+        # Starlette cancels the stream when the client disconnects, which stops the document tasks
+        if status == "cancelled":
+            _record_cancellation()
+        if start_time is not None:
+            _observe_request("stream", status, start_time)
+
+
+@router.post("/generate/batch", response_class=NDJSONStreamingResponse, openapi_extra=BATCH_REQUEST_BODY)
+async def generate_batch(
+    http_request: Request,
+    batch: BatchGenerator = Depends(get_batch_generator),
+    client_id: str = Depends(get_client_id),
+    priority: Priority = Depends(get_priority),
+) -> NDJSONStreamingResponse:
+    """Generate documents for many requests, sent and answered as newline-delimited JSON.
+
+    The body holds one ``GenerationRequest`` per line and is read while results are sent.
+    Each document is answered on its own line, tagged with the ``request_index`` of its
+    request, as soon as it is generated; unreadable requests are answered with an error line.
+    """
+    logger.info("Received batch generation request")
+    lines = NDJSONRequestLines(http_request, max_line_bytes=max_batch_line_bytes)
+    results = batch.generate(_read_batch(lines), priority=priority, client_id=client_id)
+    return NDJSONStreamingResponse(_format_batch(results, time.time()), lines)
+
+
+async def _read_batch(lines: NDJSONRequestLines) -> AsyncIterator[BatchItem]:
+    """Decode and validate one generation request per line."""
+    decoder = msgspec.json.Decoder(GenerationRequestStruct)
+    async for line in lines:
+        try:
+            request = decoder.decode(line).to_model()
+        except msgspec.MsgspecError as e:
+            yield ValueError(f"Invalid request: {e}")
+            continue
+        error = _input_error(request.input_text)
+        yield ValueError(error) if error is not None else request
+
+
+async def _format_batch(results: AsyncIterator[BatchResult], start_time: float) -> AsyncIterator[bytes]:
+    """Serialize batch results as newline-delimited JSON."""
+    encoder = msgspec.json.Encoder()
+    status = "cancelled"
+    documents = 0
+    try:
+        async for index, result in results:
+            if isinstance(result, Exception):
+                yield encoder.encode(BatchErrorStruct(request_index=index, error_message=str(result))) + b"\n"
+            else:
+                documents += 1
+                yield encoder.encode(BatchDocumentStruct.from_model(index, result)) + b"\n"
+        status = "ok"
+    except ClientDisconnect:
+        logger.info("Client disconnected while sending the batch, generation cancelled")
+    except LineTooLong as e:
+        status = "rejected"
+        yield encoder.encode(BatchErrorStruct(error_message=str(e))) + b"\n"
+    except Exception as e:
+        status = "error"
+        logger.error("Unexpected error during batch generation", error=str(e))
+        _record_error(e)
+        yield encoder.encode(BatchErrorStruct(error_message=f"Internal server error: {str(e)}")) + b"\n"
+    finally:
+        # The stream is cancelled when the client disconnects, which stops the requests in progress
+        if status == "cancelled":
+            _record_cancellation()
+        logger.info("Batch generation finished", status=status, documents=documents)
+        _observe_request("batch", status, start_time)
+
+
+def _observe_request(endpoint: str, status: str, start_time: float) -> None:
+    if generation_metrics is not None:
+        generation_metrics.observe_request(endpoint, status, time.time() - start_time)
+
+
+def _record_error(error: BaseException) -> None:
+    if generation_metrics is not None:
+        generation_metrics.record_error(error)
+
+
+def _record_cancellation() -> None:
+    if generation_metrics is not None:
+        generation_metrics.record_cancellation("request")
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -83,6 +407,9 @@ async def health_check(llm_svc: LMStudioService = Depends(get_llm_service)) -> H
         message = (
             "DocuMCP is running and model is loaded" if model_loaded else "DocuMCP is running but model is not loaded"
         )
+        if readiness is not None and not readiness.is_ready:
+            status = "starting"
+            message = f"DocuMCP is connecting to LM Studio ({readiness.error or 'first attempt in progress'})"
 
         return HealthResponse(status=status, message=message, model_loaded=model_loaded, memory_usage=memory_usage)
 
@@ -93,25 +420,34 @@ async def health_check(llm_svc: LMStudioService = Depends(get_llm_service)) -> H
 
 @router.get("/metrics")
 async def metrics(llm_svc: LMStudioService = Depends(get_llm_service)) -> Dict[str, Any]:
-    """Prometheus-style metrics endpoint."""
+    """Service statistics as JSON; Prometheus scrapes the exposition endpoint instead."""
 
     try:
         model_info = llm_svc.get_model_info()
-        memory_usage = llm_svc.get_memory_usage()
 
         metrics = {
             "model_loaded": 1 if llm_svc.is_loaded else 0,
             "model_info": model_info,
+            "backends": llm_svc.pool.get_stats(),
         }
-
-        if memory_usage:
-            metrics.update(
-                {
-                    "memory_allocated_gb": memory_usage.get("allocated_gb", 0),
-                    "memory_reserved_gb": memory_usage.get("reserved_gb", 0),
-                    "memory_max_allocated_gb": memory_usage.get("max_allocated_gb", 0),
-                }
-            )
+        if llm_svc.hedging is not None:
+            metrics["hedging"] = llm_svc.hedging.get_stats()
+        if readiness is not None:
+            metrics["readiness"] = readiness.get_stats()
+
+        if batch_generator is not None:
+            metrics["batch"] = batch_generator.get_stats()
+
+        if document_service is not None:
+            metrics["inflight"] = document_service.inflight.get_stats()
+            if document_service.cache is not None:
+                metrics["cache"] = document_service.cache.get_stats()
+            if document_service.scheduler is not None:
+                metrics["scheduler"] = document_service.scheduler.get_stats()
+            if document_service.reducer is not None:
+                metrics["ingestion"] = document_service.reducer.get_stats()
+            if document_service.recorder is not None:
+                metrics["history"] = document_service.recorder.get_stats()
 
         return metrics
 
@@ -120,17 +456,70 @@ async def metrics(llm_svc: LMStudioService = Depends(get_llm_service)) -> Dict[s
         return {"error": str(e)}
 
 
-async def initialize_services():
-    """Initialize global services."""
-    global llm_service, document_service
+async def prometheus_metrics(request: Request) -> Response:
+    """Prometheus text exposition endpoint, mounted at ``settings.prometheus.endpoint``."""
+    if generation_metrics is None:
+        raise HTTPException(status_code=503, detail="Metrics not initialized")
+
+    body, headers = generation_metrics.render(
+        request.headers.get("accept-encoding", ""), should_gzip=request.app.settings.prometheus.should_gzip
+    )
+    return Response(content=body, headers=headers)
+
+
+async def initialize_services(
+    settings: Settings,
+    http_client: Optional[httpx.AsyncClient] = None,
+    session_factory: Optional[async_sessionmaker[AsyncSession]] = None,
+):
+    """Initialize global services; the LM Studio connection is established in the background."""
+    global llm_service, document_service, batch_generator, generation_metrics, max_input_chars, max_batch_line_bytes
+    global readiness
 
     logger.info("Initializing services...")
 
-    # Initialize LLM service
-    llm_service = LMStudioService()
-    await llm_service.initialize()
+    # Initialize LLM service without blocking startup on LM Studio
+    generation_metrics = GenerationMetrics.from_settings(settings.prometheus)
+    scheduler = GenerationScheduler.from_settings(settings.scheduler)
+    llm_service = LMStudioService.from_settings(
+        settings.lm_studio, client=http_client, metrics=generation_metrics, scheduler=scheduler
+    )
+    readiness = ServiceReadiness(
+        "lm_studio", llm_service.initialize, retry_interval=settings.lm_studio.connect_retry_interval
+    )
+    readiness.start()
 
     # Initialize document service
-    document_service = DocumentGenerationService(llm_service)
+    cache = GenerationCache.from_settings(settings.cache)
+    document_service = DocumentGenerationService(
+        llm_service,
+        cache=cache,
+        scheduler=scheduler,
+        reducer=InputReducer.from_settings(settings.ingestion, llm_service, cache=cache, scheduler=scheduler),
+        recorder=await open_recorder(settings.history, session_factory) if session_factory is not None else None,
+    )
+    batch_generator = BatchGenerator.from_settings(settings.batch, document_service)
+    max_input_chars = settings.ingestion.max_input_chars
+    max_batch_line_bytes = settings.batch.max_line_bytes
+
+    generation_metrics.track_inflight(lambda: sum(backend.outstanding for backend in llm_service.pool.backends))
+    generation_metrics.track_queued(lambda: scheduler.queue_depth)
 
     logger.info("Services initialized successfully")
+
+
+async def shutdown_services():
+    """Release resources held by global services."""
+    if readiness is not None:
+        await readiness.stop()
+
+    if document_service is not None and document_service.cache is not None:
+        await document_service.cache.close()
+
+    if document_service is not None and document_service.recorder is not None:
+        await document_service.recorder.stop()
+
+    if llm_service is not None:
+        await llm_service.aclose()
+
+    logger.info("Services shut down")
@@ -0,0 +1,87 @@
+"""Generation history API endpoints."""
+
+from typing import Optional, Union
+
+import structlog
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+
+from documcp.backend.api import generation
+from documcp.backend.domain.models import DocumentType, GenerationRecord, GenerationSummary
+from documcp.backend.services.history import GenerationHistoryRepository, SearchUnavailableError
+from documcp.shared_kernel.infra.fastapi.dtos.request import CursorPageable
+from documcp.shared_kernel.infra.fastapi.dtos.response import CursorPage
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter()
+
+# Global repository (will be initialized in main.py); None while history is disabled
+history_repository: Optional[GenerationHistoryRepository] = None
+
+
+def get_history_repository() -> GenerationHistoryRepository:
+    """Dependency to get the generation history."""
+    if history_repository is None:
+        raise HTTPException(status_code=503, detail="Generation history is disabled")
+    return history_repository
+
+
+@router.get("/history", response_model=CursorPage[GenerationSummary])
+async def list_history(
+    pageable: CursorPageable = Depends(),
+    document_type: Optional[DocumentType] = None,
+    project_name: Optional[str] = None,
+    history: GenerationHistoryRepository = Depends(get_history_repository),
+) -> CursorPage[GenerationSummary]:
+    """List generated documents, newest first by default, with the start of each document."""
+    try:
+        items, next_cursor = await history.list(pageable, document_type=document_type, project_name=project_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return CursorPage[GenerationSummary](items=items, next_cursor=next_cursor)
+
+
+@router.get("/history/search", response_model=CursorPage[GenerationSummary])
+async def search_history(
+    pageable: CursorPageable = Depends(),
+    q: str = Query(..., min_length=1, description="Words that must all appear in the document"),
+    document_type: Optional[DocumentType] = None,
+    project_name: Optional[str] = None,
+    history: GenerationHistoryRepository = Depends(get_history_repository),
+) -> CursorPage[GenerationSummary]:
+    """Search generated documents by content and return matching snippets."""
+    try:
+        items, next_cursor = await history.search(q, pageable, document_type=document_type, project_name=project_name)
+    except SearchUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return CursorPage[GenerationSummary](items=items, next_cursor=next_cursor)
+
+
+@router.get("/history/{record_id}", response_model=GenerationRecord)
+async def get_history_record(
+    record_id: int,
+    response: Response,
+    history: GenerationHistoryRepository = Depends(get_history_repository),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Union[GenerationRecord, Response]:
+    """Return a generated document with its full content."""
+    record = await history.get(record_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Generation record not found: {record_id}")
+
+    # Records never change once written, so the ETag lets clients and the compression cache reuse them
+    etag = f'W/"history-{record_id}"'
+    if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return record
+
+
+def initialize_history_service():
+    """Serve the history recorded by the document service, if it records one."""
+    global history_repository
+
+    recorder = generation.document_service.recorder if generation.document_service is not None else None
+    history_repository = recorder.repository if recorder is not None else None
@@ -0,0 +1,90 @@
+"""Asynchronous generation job API endpoints."""
+
+from typing import Optional, Union
+
+import structlog
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+
+from documcp.backend.api import generation
+from documcp.backend.api.generation import GENERATION_REQUEST_BODY, get_client_id, validate_generation_request
+from documcp.backend.domain.models import GenerationRequest, Job, JobResponse
+from documcp.backend.services.job_service import JobService
+from documcp.backend.services.job_store import JobStore
+from documcp.backend.settings import Settings
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter()
+
+# Global service instance (will be initialized in main.py)
+job_service: JobService = None  # type: ignore
+
+
+def get_job_service() -> JobService:
+    """Dependency to get job service."""
+    if job_service is None:
+        raise HTTPException(status_code=503, detail="Job service not initialized")
+    return job_service
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=202, openapi_extra=GENERATION_REQUEST_BODY)
+async def create_job(
+    request: GenerationRequest = Depends(validate_generation_request),
+    jobs: JobService = Depends(get_job_service),
+    client_id: str = Depends(get_client_id),
+) -> JobResponse:
+    """Queue a generation job and return its id immediately."""
+    job = await jobs.submit(request, client_id=client_id)
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    response: Response,
+    jobs: JobService = Depends(get_job_service),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Union[JobResponse, Response]:
+    """Report per-document status and partial results of a job."""
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    # Pollers revalidate with If-None-Match; unchanged jobs also reuse their compressed body
+    etag = _job_etag(job)
+    if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return job
+
+
+def _job_etag(job: Job) -> str:
+    """Weak ETag that changes whenever the job is updated; weak so it holds across content encodings."""
+    return f'W/"{job.job_id}-{job.updated_at!r}"'
+
+
+async def initialize_job_service(settings: Settings):
+    """Start the background job workers."""
+    global job_service
+
+    if generation.document_service is None:
+        raise RuntimeError("Document service not initialized")
+
+    job_service = JobService(
+        generation.document_service,
+        JobStore(settings.jobs.store_path),
+        workers=settings.jobs.workers,
+        readiness=generation.readiness,
+    )
+    await job_service.start()
+
+    logger.info("Job workers started", workers=settings.jobs.workers)
+
+
+async def shutdown_job_service():
+    """Stop the background job workers."""
+    global job_service
+
+    if job_service is not None:
+        await job_service.stop()
+        job_service = None
@@ -1,14 +1,41 @@
+import importlib.util
+from typing import AsyncIterator
+
 import httpx
+import structlog
 from dependency_injector import containers, providers
 
-from documcp.backend.settings import Settings
+from documcp.backend.settings import HttpClientSettings, Settings
+from documcp.shared_kernel.infra.database.sqla.container.di import SqlaContainer
+
+logger = structlog.get_logger(__name__)
 
 
-def http_client(retries: int = 3):
-    """Create an async HTTP client with retry configuration."""
-    transports = httpx.AsyncHTTPTransport(retries=retries)
-    client = httpx.AsyncClient(transport=transports)
-    return client
+async def http_client(settings: HttpClientSettings, read_timeout: float) -> AsyncIterator[httpx.AsyncClient]:
+    """Create the shared async HTTP client for upstream LLM traffic and close it on shutdown."""
+    http2 = settings.http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        keepalive_expiry=settings.keepalive_expiry,
+    )
+    timeout = httpx.Timeout(
+        read_timeout,
+        connect=settings.connect_timeout,
+        write=settings.write_timeout,
+        pool=settings.pool_timeout,
+    )
+    transport = httpx.AsyncHTTPTransport(retries=settings.retries, limits=limits, http2=http2)
+    client = httpx.AsyncClient(transport=transport, timeout=timeout, http2=http2)
+
+    try:
+        yield client
+    finally:
+        await client.aclose()
 
 
 class ApplicationContainer(containers.DeclarativeContainer):
@@ -20,4 +47,9 @@ class ApplicationContainer(containers.DeclarativeContainer):
     )
 
     settings = providers.Resource(Settings)  # type: ignore
-    async_http_client = providers.Singleton(http_client)
+    async_http_client = providers.Resource(
+        http_client,
+        settings=settings.provided.http_client,
+        read_timeout=settings.provided.lm_studio.timeout,
+    )
+    database = providers.Container(SqlaContainer, settings=settings.provided.database)
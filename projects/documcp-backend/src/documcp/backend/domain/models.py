@@ -14,6 +14,24 @@ class DocumentType(str, Enum):
     README = "readme"
 
 
+class GenerationMode(str, Enum):
+    """How the requested documents are produced by the LLM."""
+
+    PER_DOCUMENT = "per_document"
+    COMBINED = "combined"
+    SECTIONED = "sectioned"
+
+
+class StreamEventType(str, Enum):
+    """Server-sent event types emitted while streaming generation."""
+
+    STARTED = "started"
+    CHUNK = "chunk"
+    DOCUMENT = "document"
+    ERROR = "error"
+    DONE = "done"
+
+
 class GenerationRequest(BaseModel):
     """Request model for document generation."""
 
@@ -26,6 +44,33 @@ class GenerationRequest(BaseModel):
     additional_context: Optional[Dict[str, Any]] = Field(
         default_factory=dict, description="Additional context for generation"
     )
+    mode: GenerationMode = Field(
+        GenerationMode.PER_DOCUMENT,
+        description=(
+            "'combined' requests all documents in a single completion; 'sectioned' writes the sections of each "
+            "document concurrently from an outline. In both, streams and MCP progress receive each document "
+            "whole rather than token by token"
+        ),
+    )
+
+
+class DocumentUpdateRequest(BaseModel):
+    """Request model for updating documents after their project description changed."""
+
+    input_text: str = Field(..., description="Updated project description")
+    previous_input_text: str = Field(..., description="Project description the previous documents were generated from")
+    previous_documents: Dict[DocumentType, str] = Field(
+        default_factory=dict,
+        description="Previous content per document type; looked up in the generation history when missing",
+    )
+    document_types: list[DocumentType] = Field(
+        default=[DocumentType.PRD, DocumentType.WHAT_IS_THIS, DocumentType.README],
+        description="Types of documents to update",
+    )
+    project_name: Optional[str] = Field(None, description="Project name for context")
+    additional_context: Optional[Dict[str, Any]] = Field(
+        default_factory=dict, description="Additional context for generation"
+    )
 
 
 class GeneratedDocument(BaseModel):
@@ -36,6 +81,61 @@ class GeneratedDocument(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
+class GenerationRecord(BaseModel):
+    """A generated document as recorded in the generation history."""
+
+    id: Optional[int] = None
+    document_type: DocumentType
+    content: str
+    input_hash: str = Field(..., description="SHA-256 of the input text the document was generated from")
+    project_name: Optional[str] = None
+    model: str
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    input_length: int
+    output_length: int
+    cached: bool = False
+    coalesced: bool = False
+    combined: bool = False
+    upstream_time: Optional[float] = Field(None, description="Duration of the upstream completion in seconds")
+    time_to_first_token: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    generated_at: float
+
+
+class GenerationSummary(BaseModel):
+    """A generation history entry with a snippet of its content instead of the full document."""
+
+    id: int
+    document_type: DocumentType
+    project_name: Optional[str] = None
+    model: str
+    output_length: int
+    generated_at: float
+    snippet: str = Field(..., description="Start of the document, or the passage matching a search")
+
+
+# Generated documents are exposed to MCP clients under this URI prefix, followed by their content hash
+DOCUMENT_URI_PREFIX = "documcp://documents/"
+
+
+class StoredDocument(BaseModel):
+    """A generated document kept in the document store, addressed by the hash of its content."""
+
+    digest: str
+    document_type: DocumentType
+    project_name: Optional[str] = None
+    title: str
+    summary: str
+    size: int = Field(..., description="Content length in characters")
+    created_at: float
+
+    @property
+    def uri(self) -> str:
+        return DOCUMENT_URI_PREFIX + self.digest
+
+
 class GenerationResponse(BaseModel):
     """Response model for document generation."""
 
@@ -51,3 +151,39 @@ class HealthResponse(BaseModel):
     message: str
     model_loaded: bool = False
     memory_usage: Optional[Dict[str, float]] = None
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a generation job and of each of its documents."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobDocument(BaseModel):
+    """Status and (partial) result of one document within a job."""
+
+    document_type: DocumentType
+    status: JobStatus = JobStatus.QUEUED
+    document: Optional[GeneratedDocument] = None
+    error: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    """Response model for an asynchronous generation job."""
+
+    job_id: str
+    status: JobStatus = JobStatus.QUEUED
+    documents: list[JobDocument] = Field(default_factory=list)
+    created_at: float = Field(..., description="Creation time as a UNIX timestamp")
+    updated_at: float = Field(..., description="Last update time as a UNIX timestamp")
+    generation_time: Optional[float] = Field(None, description="Generation time in seconds once finished")
+
+
+class Job(JobResponse):
+    """A persisted generation job, including the request it was created from."""
+
+    request: GenerationRequest
+    client_id: Optional[str] = None
@@ -0,0 +1,120 @@
+"""msgspec counterparts of the domain models for the HTTP hot path.
+
+Bodies are decoded and encoded directly by msgspec, skipping pydantic validation
+and ``jsonable_encoder``. The pydantic models in ``models`` remain the source of
+truth for services and for the OpenAPI schema.
+"""
+
+from typing import Any, Dict, Optional
+
+import msgspec
+
+from documcp.backend.domain.models import (
+    DocumentType,
+    DocumentUpdateRequest,
+    GeneratedDocument,
+    GenerationMode,
+    GenerationRequest,
+    GenerationResponse,
+)
+
+
+class GenerationRequestStruct(msgspec.Struct, kw_only=True):
+    """Request body for document generation."""
+
+    input_text: str
+    document_types: list[DocumentType] = msgspec.field(
+        default_factory=lambda: [DocumentType.PRD, DocumentType.WHAT_IS_THIS, DocumentType.README]
+    )
+    project_name: Optional[str] = None
+    additional_context: Optional[Dict[str, Any]] = msgspec.field(default_factory=dict)
+    mode: GenerationMode = GenerationMode.PER_DOCUMENT
+
+    def to_model(self) -> GenerationRequest:
+        """Build the service-layer request; the body is already validated, so pydantic validation is skipped."""
+        return GenerationRequest.model_construct(
+            input_text=self.input_text,
+            document_types=self.document_types,
+            project_name=self.project_name,
+            additional_context=self.additional_context,
+            mode=self.mode,
+        )
+
+
+class DocumentUpdateRequestStruct(msgspec.Struct, kw_only=True):
+    """Request body for updating documents after their project description changed."""
+
+    input_text: str
+    previous_input_text: str
+    previous_documents: Dict[DocumentType, str] = msgspec.field(default_factory=dict)
+    document_types: list[DocumentType] = msgspec.field(
+        default_factory=lambda: [DocumentType.PRD, DocumentType.WHAT_IS_THIS, DocumentType.README]
+    )
+    project_name: Optional[str] = None
+    additional_context: Optional[Dict[str, Any]] = msgspec.field(default_factory=dict)
+
+    def to_model(self) -> DocumentUpdateRequest:
+        """Build the service-layer request; the body is already validated, so pydantic validation is skipped."""
+        return DocumentUpdateRequest.model_construct(
+            input_text=self.input_text,
+            previous_input_text=self.previous_input_text,
+            previous_documents=self.previous_documents,
+            document_types=self.document_types,
+            project_name=self.project_name,
+            additional_context=self.additional_context,
+        )
+
+
+class GeneratedDocumentStruct(msgspec.Struct, kw_only=True):
+    """A single generated document."""
+
+    document_type: DocumentType
+    content: str
+    metadata: Dict[str, Any] = {}
+
+    @classmethod
+    def from_model(cls, document: GeneratedDocument) -> "GeneratedDocumentStruct":
+        return cls(document_type=document.document_type, content=document.content, metadata=document.metadata)
+
+
+class BatchDocumentStruct(msgspec.Struct, kw_only=True):
+    """A document of a batch, tagged with the position of its request in the batch."""
+
+    request_index: int
+    document_type: DocumentType
+    content: str
+    metadata: Dict[str, Any] = {}
+
+    @classmethod
+    def from_model(cls, request_index: int, document: GeneratedDocument) -> "BatchDocumentStruct":
+        return cls(
+            request_index=request_index,
+            document_type=document.document_type,
+            content=document.content,
+            metadata=document.metadata,
+        )
+
+
+class BatchErrorStruct(msgspec.Struct, kw_only=True):
+    """A batch request that could not be read or generated; no index when the batch itself failed."""
+
+    request_index: Optional[int] = None
+    error: bool = True
+    error_message: str
+
+
+class GenerationResponseStruct(msgspec.Struct, kw_only=True):
+    """Response body for document generation."""
+
+    documents: list[GeneratedDocumentStruct]
+    generation_time: float
+    model_info: Dict[str, str] = {}
+
+    @classmethod
+    def from_model(cls, response: GenerationResponse) -> "GenerationResponseStruct":
+        """Wrap a service response without re-validating or copying document contents."""
+        return cls(
+            documents=[GeneratedDocumentStruct.from_model(document) for document in response.documents],
+            generation_time=response.generation_time,
+            model_info=response.model_info,
+        )
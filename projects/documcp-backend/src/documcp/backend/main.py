@@ -1,54 +1,61 @@
 from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any
 
 import structlog
-from fastapi import FastAPI
-from fastapi.middleware import Middleware
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-
-from documcp.backend.api.generation import initialize_services
-from documcp.backend.api.generation import router as generation_router
-from documcp.backend.container import ApplicationContainer
-from documcp.backend.settings import Settings
-from documcp.shared_kernel.domain.exception import BaseMsgException
-from documcp.shared_kernel.infra.fastapi.exception_handlers.base import custom_exception_handler
-from documcp.shared_kernel.infra.fastapi.middlewares.correlation_id import CorrelationIdMiddleware
-from documcp.shared_kernel.infra.fastapi.middlewares.session import SessionMiddleware
-from documcp.shared_kernel.infra.fastapi.utils.responses import MsgSpecJSONResponse
-
-# Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer(),
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=True,
-)
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
 
 logger = structlog.get_logger(__name__)
 
-container = ApplicationContainer()
-settings: Settings = container.settings.provided()
+
+def configure_logging() -> None:
+    """Configure structured logging."""
+    from documcp.backend.tracing import add_trace_context
+
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            add_trace_context,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            structlog.processors.JSONRenderer(),
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI):
+async def lifespan(app: "FastAPI"):
     """Application lifespan manager."""
+    from documcp.backend.api.generation import initialize_services, shutdown_services
+    from documcp.backend.api.history import initialize_history_service
+    from documcp.backend.api.jobs import initialize_job_service, shutdown_job_service
+    from documcp.backend.tracing import configure_tracing, shutdown_tracing
+
     logger.info("Starting up DocuMCP application")
+    container = app.container  # type: ignore[attr-defined]
+    settings = app.settings  # type: ignore[attr-defined]
 
     # Initialize services on startup
     try:
-        await initialize_services()
+        configure_tracing(settings.tracing)
+        await container.init_resources()
+        await initialize_services(
+            settings,
+            http_client=await container.async_http_client(),
+            session_factory=await container.database.session_factory(),
+        )
+        await initialize_job_service(settings)
+        initialize_history_service()
         logger.info("Application startup completed successfully")
         yield
     except Exception as e:
@@ -56,12 +63,42 @@ async def lifespan(app: FastAPI):
         raise
     finally:
         logger.info("Shutting down DocuMCP application")
-
-
-def create_app() -> FastAPI:
-    """Create and configure the FastAPI application."""
+        await shutdown_job_service()
+        await shutdown_services()
+        await container.shutdown_resources()
+        shutdown_tracing()
+
+
+def create_app() -> "FastAPI":
+    """Create and configure the FastAPI application.
+
+    The web stack, the routers and the container are imported here rather than at module
+    level, so importing this module (e.g. by a process manager resolving ``main:app``) is cheap.
+    """
+    from fastapi import FastAPI
+    from fastapi.middleware import Middleware
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from documcp.backend.api.generation import prometheus_metrics
+    from documcp.backend.api.generation import router as generation_router
+    from documcp.backend.api.history import router as history_router
+    from documcp.backend.api.jobs import router as jobs_router
+    from documcp.backend.container import ApplicationContainer
+    from documcp.backend.settings import Settings
+    from documcp.backend.tracing import TracingMiddleware
+    from documcp.shared_kernel.domain.exception import BaseMsgException
+    from documcp.shared_kernel.infra.fastapi.exception_handlers.base import custom_exception_handler
+    from documcp.shared_kernel.infra.fastapi.middlewares.compression import CompressionMiddleware
+    from documcp.shared_kernel.infra.fastapi.middlewares.correlation_id import CorrelationIdMiddleware
+    from documcp.shared_kernel.infra.fastapi.middlewares.session import SessionMiddleware
+    from documcp.shared_kernel.infra.fastapi.utils.responses import MsgSpecJSONResponse
+
+    configure_logging()
+    container = ApplicationContainer()
+    settings: Settings = container.settings()
     middleware = [
         Middleware(CorrelationIdMiddleware),
+        Middleware(TracingMiddleware),
         Middleware(
             CORSMiddleware,
             allow_origins=settings.cors.allow_origins,
@@ -69,9 +106,21 @@ def create_app() -> FastAPI:
             allow_methods=settings.cors.allow_methods,
             allow_headers=settings.cors.allow_headers,
         ),
-        Middleware(SessionMiddleware, secret_key=settings.session.secret_key),
-        Middleware(GZipMiddleware),
+        Middleware(
+            SessionMiddleware,
+            secret_key=settings.session.secret_key,
+            include_paths=settings.session.include_paths,
+        ),
     ]
+    if settings.gzip.enable:
+        middleware.append(
+            Middleware(
+                CompressionMiddleware,
+                minimum_size=settings.gzip.minimum_size,
+                compress_level=settings.gzip.compress_level,
+                precompressed_max_bytes=settings.gzip.precompressed_max_bytes,
+            )
+        )
 
     app = FastAPI(
         title=settings.fastapi.title,
@@ -94,8 +143,22 @@ def create_app() -> FastAPI:
 
     # Include API routers
     app.include_router(generation_router, prefix="/api/v1", tags=["generation"])
+    app.include_router(jobs_router, prefix="/api/v1", tags=["jobs"])
+    app.include_router(history_router, prefix="/api/v1", tags=["history"])
+    app.add_api_route(
+        settings.prometheus.endpoint,
+        prometheus_metrics,
+        methods=["GET"],
+        include_in_schema=settings.prometheus.include_in_schema,
+    )
 
     return app
 
 
-app = create_app()
+def __getattr__(name: str) -> Any:
+    # ``documcp.backend.main:app`` is built on first access by ``create_app``
+    if name == "app":
+        app = create_app()
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
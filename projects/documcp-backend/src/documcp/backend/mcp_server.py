@@ -1,38 +1,96 @@
-"""MCP Server for DocuMCP - Document Generation Service."""
+"""MCP Server for DocuMCP - Document Generation Service.
 
+Only the MCP SDK is imported up front, so ``initialize`` and ``list_tools`` are
+answered right after the stdio transport opens. Settings, the HTTP client, the
+services and the LM Studio connection are set up in the background, and tool
+calls wait for them.
+"""
+
+from documcp.backend.startup import startup_profile  # isort: skip  (first, to time the imports below)
+
+import argparse
 import asyncio
-from typing import Any, Dict, List, Optional
+import importlib
+import sys
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import structlog
 from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.server.stdio import stdio_server
 from mcp.types import (
+    ContentBlock,
     GetPromptResult,
     Prompt,
     PromptArgument,
     PromptMessage,
+    Resource,
+    ResourceLink,
     TextContent,
     Tool,
 )
 
-from documcp.backend.domain.models import DocumentType, GenerationRequest
-from documcp.backend.services.document_service import DocumentGenerationService
-from documcp.backend.services.llm_service import LMStudioService
+from documcp.backend.services.readiness import ServiceReadiness
+
+if TYPE_CHECKING:
+    from documcp.backend.container import ApplicationContainer
+    from documcp.backend.domain.models import DocumentType, GenerationRequest, StoredDocument, StreamEventType
+    from documcp.backend.services.document_service import DocumentGenerationService
+    from documcp.backend.services.document_store import DocumentStore
+    from documcp.backend.services.llm_service import LMStudioService
+    from documcp.backend.services.metrics import GenerationMetrics
+    from documcp.backend.settings import Settings
 
 logger = structlog.get_logger(__name__)
 
-# Global services
-llm_service: Optional[LMStudioService] = None
-document_service: Optional[DocumentGenerationService] = None
+# Global services, created in the background by ``initialize_services``
+container: Optional["ApplicationContainer"] = None
+settings: Optional["Settings"] = None
+llm_service: Optional["LMStudioService"] = None
+document_service: Optional["DocumentGenerationService"] = None
+document_store: Optional["DocumentStore"] = None
+generation_metrics: Optional["GenerationMetrics"] = None
+readiness: Optional[ServiceReadiness] = None
+
+# Modules imported off the event loop during background initialization
+SERVICE_MODULES = (
+    "documcp.backend.container",
+    "documcp.backend.services.document_service",
+    "documcp.backend.services.document_store",
+    "documcp.backend.services.history",
+    "documcp.backend.services.ingestion",
+    "documcp.backend.tracing",
+)
+
+# How long a tool call waits for initialization before settings are loaded
+DEFAULT_STARTUP_WAIT = 15.0
+
+# Minimum seconds between progress notifications for new content; state changes are always sent
+PROGRESS_INTERVAL = 0.5
+# Characters after which a running document counts as half done (about 256 tokens)
+PROGRESS_HALF_CHARS = 1024
 
 # Create MCP server
 server = Server("documcp")
 
+# Tool calls are interactive, so they are scheduled ahead of bulk HTTP traffic
+MCP_CLIENT_ID = "mcp"
+
+# Tool results link to stored documents unless the client asks for the full text
+INLINE_PROPERTY = {
+    "type": "boolean",
+    "description": "Return full documents instead of resource links with summaries (default: false)",
+    "default": False,
+}
+
 
 @server.list_tools()
 async def handle_list_tools() -> List[Tool]:
     """List available tools."""
+    startup_profile.mark("list_tools")
     return [
         Tool(
             name="generate_documents",
@@ -42,12 +100,23 @@ async def handle_list_tools() -> List[Tool]:
                 "properties": {
                     "input_text": {"type": "string", "description": "Project description or requirements"},
                     "project_name": {"type": "string", "description": "Name of the project (optional)"},
+                    "inline": INLINE_PROPERTY,
                     "document_types": {
                         "type": "array",
                         "items": {"type": "string", "enum": ["prd", "what_is_this", "readme"]},
                         "description": "Types of documents to generate (default: all types)",
                         "default": ["prd", "what_is_this", "readme"],
                     },
+                    "mode": {
+                        "type": "string",
+                        "enum": ["per_document", "combined", "sectioned"],
+                        "description": (
+                            "'combined' writes all documents in a single completion; 'sectioned' writes the "
+                            "sections of each document concurrently. Both report each document once it is "
+                            "assembled rather than as it is written (default: per_document)"
+                        ),
+                        "default": "per_document",
+                    },
                 },
                 "required": ["input_text"],
             },
@@ -60,6 +129,7 @@ async def handle_list_tools() -> List[Tool]:
                 "properties": {
                     "input_text": {"type": "string", "description": "Project description or requirements"},
                     "project_name": {"type": "string", "description": "Name of the project (optional)"},
+                    "inline": INLINE_PROPERTY,
                 },
                 "required": ["input_text"],
             },
@@ -72,6 +142,7 @@ async def handle_list_tools() -> List[Tool]:
                 "properties": {
                     "input_text": {"type": "string", "description": "Project description or requirements"},
                     "project_name": {"type": "string", "description": "Name of the project (optional)"},
+                    "inline": INLINE_PROPERTY,
                 },
                 "required": ["input_text"],
             },
@@ -84,6 +155,7 @@ async def handle_list_tools() -> List[Tool]:
                 "properties": {
                     "input_text": {"type": "string", "description": "Project description or requirements"},
                     "project_name": {"type": "string", "description": "Name of the project (optional)"},
+                    "inline": INLINE_PROPERTY,
                 },
                 "required": ["input_text"],
             },
@@ -92,10 +164,45 @@ async def handle_list_tools() -> List[Tool]:
 
 
 @server.call_tool()
-async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[ContentBlock]:
     """Handle tool calls."""
-    if not document_service:
-        return [TextContent(type="text", text="Error: Document service not initialized")]
+    error = await _wait_until_ready()
+    if error is not None:
+        return [TextContent(type="text", text=f"Error: {error}")]
+
+    from documcp.backend.tracing import SPAN_KIND_SERVER, tracer
+    from documcp.shared_kernel.infra.fastapi.middlewares import correlation_id_ctx
+
+    # Each tool call is its own request: give it a correlation id and a root span
+    token = correlation_id_ctx.set(str(uuid.uuid4()))
+    try:
+        with tracer.span(f"mcp.call_tool {name}", kind=SPAN_KIND_SERVER, tool=name):
+            return await _dispatch_tool(name, arguments)
+    except asyncio.CancelledError:
+        # The MCP session cancels the handler on notifications/cancelled; upstream calls stop with it
+        logger.info("Tool call cancelled by client", tool=name)
+        if generation_metrics is not None:
+            generation_metrics.record_cancellation("request")
+        raise
+    finally:
+        correlation_id_ctx.reset(token)
+
+
+async def _wait_until_ready() -> Optional[str]:
+    """Wait for background initialization; return why the services are unavailable, if they are."""
+    if llm_service is not None and llm_service.is_loaded:
+        return None
+    if readiness is None:
+        return "Document service not initialized"
+
+    startup_wait = settings.lm_studio.startup_wait if settings is not None else DEFAULT_STARTUP_WAIT
+    if await readiness.wait(timeout=startup_wait):
+        return None
+    return f"DocuMCP is not ready yet ({readiness.error or 'still starting'}); try again shortly"
+
+
+async def _dispatch_tool(name: str, arguments: Dict[str, Any]) -> List[ContentBlock]:
+    from documcp.backend.domain.models import DocumentType
 
     try:
         if name == "generate_documents":
@@ -114,8 +221,10 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
         return [TextContent(type="text", text=f"Error: {str(e)}")]
 
 
-async def _handle_generate_documents(arguments: Dict[str, Any]) -> List[TextContent]:
+async def _handle_generate_documents(arguments: Dict[str, Any]) -> List[ContentBlock]:
     """Handle generate_documents tool call."""
+    from documcp.backend.domain.models import DocumentType, GenerationMode, GenerationRequest
+
     input_text = arguments.get("input_text", "")
     project_name = arguments.get("project_name")
     doc_types_str = arguments.get("document_types", ["prd", "what_is_this", "readme"])
@@ -130,36 +239,262 @@ async def _handle_generate_documents(arguments: Dict[str, Any]) -> List[TextCont
         elif dt_str == "readme":
             doc_types.append(DocumentType.README)
 
-    request = GenerationRequest(input_text=input_text, document_types=doc_types, project_name=project_name)
+    request = GenerationRequest(
+        input_text=input_text,
+        document_types=doc_types,
+        project_name=project_name,
+        mode=GenerationMode(arguments.get("mode", GenerationMode.PER_DOCUMENT.value)),
+    )
 
-    response = await document_service.generate_documents(request)
+    documents, generation_time = await _generate_with_progress(request)
 
-    results = []
-    for doc in response.documents:
-        doc_type_name = doc.document_type.value.replace("_", " ").title()
-        results.append(TextContent(type="text", text=f"## {doc_type_name}\n\n{doc.content}\n\n---\n"))
+    results: List[ContentBlock] = []
+    for doc, stored in documents:
+        doc_type_name = doc["document_type"].replace("_", " ").title()
+        if stored is None or arguments.get("inline"):
+            results.append(TextContent(type="text", text=f"## {doc_type_name}\n\n{doc['content']}\n\n---\n"))
+        else:
+            results.extend(_resource_contents(stored, heading=f"## {doc_type_name}"))
 
-    summary = f"Generated {len(response.documents)} documents in {response.generation_time:.2f} seconds"
+    summary = f"Generated {len(documents)} documents in {generation_time:.2f} seconds"
     results.insert(0, TextContent(type="text", text=f"# Document Generation Complete\n\n{summary}\n\n"))
 
     return results
 
 
-async def _handle_generate_single_document(arguments: Dict[str, Any], doc_type: DocumentType) -> List[TextContent]:
+async def _handle_generate_single_document(arguments: Dict[str, Any], doc_type: "DocumentType") -> List[ContentBlock]:
     """Handle single document generation tool calls."""
+    from documcp.backend.domain.models import GenerationRequest
+
     input_text = arguments.get("input_text", "")
     project_name = arguments.get("project_name")
 
     request = GenerationRequest(input_text=input_text, document_types=[doc_type], project_name=project_name)
 
-    response = await document_service.generate_documents(request)
+    documents, _ = await _generate_with_progress(request)
 
-    if response.documents:
-        doc = response.documents[0]
-        return [TextContent(type="text", text=doc.content)]
-    else:
+    if not documents:
         return [TextContent(type="text", text="No document generated")]
 
+    doc, stored = documents[0]
+    if stored is None or arguments.get("inline"):
+        return [TextContent(type="text", text=doc["content"])]
+    return _resource_contents(stored)
+
+
+def _resource_contents(stored: "StoredDocument", heading: Optional[str] = None) -> List[ContentBlock]:
+    """Describe a stored document with a short summary and a link to read it in full."""
+    text = f"{stored.summary}\n\n{stored.size:,} characters; read the full document from {stored.uri}\n"
+    if heading:
+        text = f"{heading}\n\n{text}"
+    return [
+        TextContent(type="text", text=text),
+        ResourceLink(
+            type="resource_link",
+            uri=stored.uri,
+            name=_resource_name(stored),
+            title=stored.title,
+            description=stored.summary,
+            mimeType="text/markdown",
+            size=stored.size,
+        ),
+    ]
+
+
+def _resource_name(stored: "StoredDocument") -> str:
+    name = f"{stored.document_type.value}-{stored.digest[:12]}.md"
+    return f"{stored.project_name}/{name}" if stored.project_name else name
+
+
+async def _generate_with_progress(
+    request: "GenerationRequest",
+) -> Tuple[List[Tuple[Dict[str, Any], Optional["StoredDocument"]]], float]:
+    """Generate documents as a stream, reporting progress to the client.
+
+    Returns each document in request order, with its stored description when it was saved
+    to the document store.
+    """
+    from documcp.backend.domain.models import GeneratedDocument, StreamEventType
+    from documcp.backend.services.scheduler import Priority
+
+    document_service.check_admission(request)
+    progress = _ProgressReporter.for_current_request([doc_type.value for doc_type in request.document_types])
+    await progress.send(force=True)
+
+    documents: Dict[str, Tuple[Dict[str, Any], Optional["StoredDocument"]]] = {}
+    generation_time = 0.0
+    async for event, payload in document_service.stream_documents(
+        request, priority=Priority.INTERACTIVE, client_id=MCP_CLIENT_ID
+    ):
+        stored = None
+        if event is StreamEventType.DOCUMENT and document_store is not None:
+            stored = await document_store.put(GeneratedDocument.model_validate(payload))
+        if event in (StreamEventType.DOCUMENT, StreamEventType.ERROR):
+            documents[payload["document_type"]] = (payload, stored)
+        elif event is StreamEventType.DONE:
+            generation_time = payload["generation_time"]
+        await progress.update(event, payload, stored)
+
+    ordered = [documents[doc_type.value] for doc_type in request.document_types if doc_type.value in documents]
+    return ordered, generation_time
+
+
+class _ProgressReporter:
+    """Report the per-document state of a tool call through MCP progress notifications.
+
+    Progress counts finished documents plus, for each running one, a fraction that grows with
+    the characters generated so far and approaches one. Finished documents are also sent as
+    log messages, so the client can show each one before the slowest is done; partial content
+    is not sent. Nothing is sent unless the client asked for progress with a progress token.
+    """
+
+    def __init__(
+        self,
+        document_types: List[str],
+        session: Any = None,
+        progress_token: Optional[Any] = None,
+        request_id: Optional[str] = None,
+    ):
+        self.states = {doc_type: "queued" for doc_type in document_types}
+        self.chars = {doc_type: 0 for doc_type in document_types}
+        self._session = session
+        self._progress_token = progress_token
+        self._request_id = request_id
+        self._last_progress = -1.0
+        self._last_sent = 0.0
+
+    @classmethod
+    def for_current_request(cls, document_types: List[str]) -> "_ProgressReporter":
+        try:
+            context = server.request_context
+        except LookupError:
+            # Called outside an MCP request, e.g. from the benchmarks
+            return cls(document_types)
+
+        progress_token = context.meta.progressToken if context.meta is not None else None
+        if progress_token is None:
+            return cls(document_types)
+        return cls(document_types, context.session, progress_token, str(context.request_id))
+
+    @property
+    def progress(self) -> float:
+        return sum(self._document_progress(doc_type) for doc_type in self.states)
+
+    @property
+    def message(self) -> str:
+        parts = []
+        for doc_type, state in self.states.items():
+            chars = self.chars[doc_type]
+            parts.append(f"{doc_type} {state}" + (f" ({chars:,} chars)" if chars and state != "failed" else ""))
+        return ", ".join(parts)
+
+    def _document_progress(self, doc_type: str) -> float:
+        state = self.states[doc_type]
+        if state == "queued":
+            return 0.0
+        if state == "generating":
+            # Starting counts as one character, so a start alone is reported as progress
+            chars = self.chars[doc_type] + 1
+            return chars / (chars + PROGRESS_HALF_CHARS)
+        return 1.0
+
+    async def update(
+        self, event: "StreamEventType", payload: Dict[str, Any], stored: Optional["StoredDocument"] = None
+    ) -> None:
+        """Apply a stream event and notify the client when something changed."""
+        from documcp.backend.domain.models import StreamEventType
+
+        doc_type = payload.get("document_type")
+        if doc_type not in self.states:
+            return
+
+        if event is StreamEventType.CHUNK:
+            self.chars[doc_type] += len(payload.get("content", ""))
+            await self.send()
+            return
+
+        if event is StreamEventType.STARTED:
+            self.states[doc_type] = "generating"
+        elif event is StreamEventType.DOCUMENT:
+            self.states[doc_type] = "done"
+            await self._send_document("info", payload, stored)
+        elif event is StreamEventType.ERROR:
+            self.states[doc_type] = "failed"
+            await self._send_document("error", payload)
+        await self.send(force=True)
+
+    async def send(self, force: bool = False) -> None:
+        """Send a progress notification; updates for new content alone are throttled to ``PROGRESS_INTERVAL``."""
+        if self._progress_token is None:
+            return
+
+        progress = self.progress
+        now = time.monotonic()
+        # MCP requires progress to increase with every notification
+        if progress <= self._last_progress or (not force and now - self._last_sent < PROGRESS_INTERVAL):
+            return
+
+        self._last_progress = progress
+        self._last_sent = now
+        await self._session.send_progress_notification(
+            self._progress_token,
+            progress,
+            total=float(len(self.states)),
+            message=self.message,
+            related_request_id=self._request_id,
+        )
+
+    async def _send_document(
+        self, level: str, document: Dict[str, Any], stored: Optional["StoredDocument"] = None
+    ) -> None:
+        if self._session is None:
+            return
+        if stored is not None:
+            # The content is read from its resource, so only a pointer goes over stdio
+            data = {
+                "document_type": document["document_type"],
+                "uri": stored.uri,
+                "summary": stored.summary,
+                "size": stored.size,
+            }
+        else:
+            data = {"document_type": document["document_type"], "content": document["content"]}
+        await self._session.send_log_message(level, data, logger="documcp", related_request_id=self._request_id)
+
+
+@server.list_resources()
+async def handle_list_resources() -> List[Resource]:
+    """List generated documents, newest first."""
+    if document_store is None:
+        return []
+
+    return [
+        Resource(
+            uri=stored.uri,
+            name=_resource_name(stored),
+            title=stored.title,
+            description=stored.summary,
+            mimeType="text/markdown",
+            size=stored.size,
+        )
+        for stored in await document_store.list()
+    ]
+
+
+@server.read_resource()
+async def handle_read_resource(uri: Any) -> List[ReadResourceContents]:
+    """Return a generated document by its content-addressed URI."""
+    from documcp.backend.services.document_store import digest_from_uri
+
+    if document_store is None:
+        raise ValueError("Document store not initialized")
+
+    digest = digest_from_uri(str(uri))
+    content = await document_store.get_content(digest) if digest else None
+    if content is None:
+        raise ValueError(f"Unknown resource: {uri}")
+    return [ReadResourceContents(content=content, mime_type="text/markdown")]
+
 
 @server.list_prompts()
 async def handle_list_prompts() -> List[Prompt]:
@@ -238,34 +573,121 @@ async def handle_get_prompt(name: str, arguments: Dict[str, str]) -> GetPromptRe
 
 
 async def initialize_services():
-    """Initialize the LLM and document services."""
-    global llm_service, document_service
+    """Initialize the LLM and document services; safe to call again after a failure."""
+    global container, settings, llm_service, document_service, document_store, generation_metrics
+
+    if document_service is None:
+        logger.info("Initializing DocuMCP services...")
+
+        # Import the service stack in a worker thread, so the event loop keeps answering the client
+        await asyncio.to_thread(_import_service_modules)
+        startup_profile.mark("imports_done")
+
+        from documcp.backend.container import ApplicationContainer
+        from documcp.backend.services.cache import GenerationCache
+        from documcp.backend.services.document_service import DocumentGenerationService
+        from documcp.backend.services.document_store import DocumentStore
+        from documcp.backend.services.history import open_recorder
+        from documcp.backend.services.ingestion import InputReducer
+        from documcp.backend.services.llm_service import LMStudioService
+        from documcp.backend.services.metrics import GenerationMetrics
+        from documcp.backend.services.scheduler import GenerationScheduler
+        from documcp.backend.tracing import configure_tracing
+
+        container = ApplicationContainer()
+        await container.init_resources()
+        settings = container.settings()
+        configure_tracing(settings.tracing)
+        if readiness is not None:
+            readiness.retry_interval = settings.lm_studio.connect_retry_interval
+
+        # LM Studio service on the container-managed connection pool, recording the same metrics as HTTP
+        generation_metrics = GenerationMetrics.from_settings(settings.prometheus)
+        scheduler = GenerationScheduler.from_settings(settings.scheduler)
+        llm_service = LMStudioService.from_settings(
+            settings.lm_studio,
+            client=await container.async_http_client(),
+            metrics=generation_metrics,
+            scheduler=scheduler,
+        )
 
-    logger.info("Initializing DocuMCP services...")
+        cache = GenerationCache.from_settings(settings.cache)
+        document_service = DocumentGenerationService(
+            llm_service,
+            cache=cache,
+            scheduler=scheduler,
+            reducer=InputReducer.from_settings(settings.ingestion, llm_service, cache=cache, scheduler=scheduler),
+            recorder=await open_recorder(settings.history, await container.database.session_factory()),
+        )
+        document_store = await asyncio.to_thread(DocumentStore.from_settings, settings.documents)
 
-    try:
-        # Initialize LM Studio service
-        llm_service = LMStudioService()
+        service = llm_service
+        generation_metrics.track_inflight(lambda: sum(backend.outstanding for backend in service.pool.backends))
+        generation_metrics.track_queued(lambda: scheduler.queue_depth)
+
+    # Raises while LM Studio is unreachable; the readiness loop retries
+    if not llm_service.is_loaded:
         await llm_service.initialize()
 
-        # Initialize document service
-        document_service = DocumentGenerationService(llm_service)
+    startup_profile.mark("services_ready")
+    logger.info("DocuMCP services initialized successfully")
 
-        logger.info("DocuMCP services initialized successfully")
 
-    except Exception as e:
-        logger.error("Failed to initialize services", error=str(e))
-        raise
+def start_services() -> ServiceReadiness:
+    """Initialize services in the background and return their readiness."""
+    global readiness
+
+    readiness = ServiceReadiness("documcp", initialize_services)
+    readiness.start()
+    return readiness
+
+
+def _import_service_modules() -> None:
+    for module in SERVICE_MODULES:
+        importlib.import_module(module)
+
+
+async def shutdown_services():
+    """Release the cache and the shared HTTP client."""
+    global container, settings, llm_service, document_service, document_store, generation_metrics, readiness
+
+    if readiness is not None:
+        await readiness.stop()
 
+    if document_service is not None and document_service.cache is not None:
+        await document_service.cache.close()
 
-async def main():
+    if document_service is not None and document_service.recorder is not None:
+        await document_service.recorder.stop()
+
+    if document_store is not None:
+        document_store.close()
+
+    if llm_service is not None:
+        await llm_service.aclose()
+
+    if container is not None:
+        await container.shutdown_resources()
+
+    tracing = sys.modules.get("documcp.backend.tracing")
+    if tracing is not None:
+        tracing.shutdown_tracing()
+
+    container = settings = llm_service = document_service = document_store = generation_metrics = readiness = None
+
+
+async def main(profile_startup: bool = False):
     """Main entry point for MCP server."""
+    if profile_startup:
+        startup_profile.enable()
+
     # Configure structured logging for MCP
     structlog.configure(
         processors=[
             structlog.stdlib.filter_by_level,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
+            _add_trace_context,
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.JSONRenderer(),
         ],
@@ -275,23 +697,44 @@ async def main():
         cache_logger_on_first_use=True,
     )
 
-    # Initialize services
-    await initialize_services()
-
-    # Run MCP server
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="documcp",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(), experimental_capabilities={}
+    # Run MCP server; services are initialized in the background once the transport is open
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            startup_profile.mark("transport_open")
+            start_services()
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="documcp",
+                    server_version="1.0.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(), experimental_capabilities={}
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        await shutdown_services()
+
+
+def _add_trace_context(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    # Tracing is imported in the background; until then there is no trace context to add
+    tracing = sys.modules.get("documcp.backend.tracing")
+    if tracing is None:
+        return event_dict
+    return tracing.add_trace_context(logger, method_name, event_dict)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="DocuMCP MCP server (stdio)")
+    parser.add_argument(
+        "--profile-startup", action="store_true", help="Print startup milestones in milliseconds to stderr"
+    )
+    return parser.parse_args(argv)
+
+
+startup_profile.mark("imports")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(profile_startup=parse_args().profile_startup))
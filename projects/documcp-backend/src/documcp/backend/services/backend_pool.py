@@ -0,0 +1,197 @@
+"""Load balancing across several OpenAI-compatible LLM servers."""
+
+import asyncio
+import bisect
+import hashlib
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+import httpx
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+VIRTUAL_NODES = 64
+
+
+@dataclass(kw_only=True, eq=False)
+class LLMBackend:
+    """One upstream OpenAI-compatible server and its observed state."""
+
+    base_url: str
+    healthy: bool = True
+    outstanding: int = 0
+    models: List[str] = field(default_factory=list)
+    last_error: Optional[str] = None
+    requests: int = 0
+    failures: int = 0
+
+
+class NoHealthyBackendError(RuntimeError):
+    """Raised when every backend has been tried or is unhealthy."""
+
+
+class BackendPool:
+    """Route requests across backends by affinity and least outstanding requests.
+
+    A consistent-hash ring maps an affinity key (project or input hash) to a
+    preferred backend, so repeated work for the same project reuses that
+    server's prompt/KV cache. The preferred backend is skipped when it is
+    unhealthy or carries ``affinity_slack`` more outstanding requests than the
+    least-loaded one. Background probes against ``/v1/models`` take failed
+    backends out of rotation and bring recovered ones back.
+    """
+
+    def __init__(
+        self,
+        base_urls: Iterable[str],
+        client: httpx.AsyncClient,
+        health_check_interval: float = 15.0,
+        affinity_slack: int = 2,
+        probe_timeout: float = 5.0,
+    ):
+        self.backends = [LLMBackend(base_url=url.rstrip("/")) for url in base_urls]
+        if not self.backends:
+            raise ValueError("At least one LLM backend URL is required")
+        self.client = client
+        self.health_check_interval = health_check_interval
+        self.affinity_slack = affinity_slack
+        self.probe_timeout = probe_timeout
+        self._ring: List[int] = []
+        self._ring_backends: List[LLMBackend] = []
+        self._health_task: Optional[asyncio.Task] = None
+        self._build_ring()
+
+    @property
+    def base_urls(self) -> List[str]:
+        return [backend.base_url for backend in self.backends]
+
+    async def start(self) -> None:
+        """Probe every backend once and start background health checks."""
+        await self.check_health()
+        if self._health_task is None and self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        """Stop background health checks."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+    async def check_health(self) -> None:
+        """Probe all backends concurrently."""
+        await asyncio.gather(*(self._probe(backend) for backend in self.backends))
+
+    def healthy_backends(self) -> List[LLMBackend]:
+        return [backend for backend in self.backends if backend.healthy]
+
+    def available_models(self) -> List[str]:
+        """Models reported by healthy backends, in backend order."""
+        models: List[str] = []
+        for backend in self.healthy_backends():
+            models.extend(model for model in backend.models if model not in models)
+        return models
+
+    def select(self, affinity_key: Optional[str] = None, exclude: Iterable[LLMBackend] = ()) -> LLMBackend:
+        """Pick a backend for the next request."""
+        excluded = list(exclude)
+        candidates = [backend for backend in self.healthy_backends() if backend not in excluded]
+        if not candidates:
+            # Every healthy node has been tried; give the others a chance before failing
+            candidates = [backend for backend in self.backends if backend not in excluded]
+        if not candidates:
+            raise NoHealthyBackendError("No LLM backend available")
+
+        least_loaded = min(candidates, key=lambda backend: backend.outstanding)
+        if affinity_key is None:
+            return least_loaded
+
+        preferred = self._lookup(affinity_key, candidates)
+        if preferred.outstanding - least_loaded.outstanding > self.affinity_slack:
+            return least_loaded
+        return preferred
+
+    @asynccontextmanager
+    async def lease(self, backend: LLMBackend) -> AsyncIterator[LLMBackend]:
+        """Count a request as outstanding on ``backend`` for the duration of the block."""
+        backend.outstanding += 1
+        backend.requests += 1
+        try:
+            yield backend
+        finally:
+            backend.outstanding -= 1
+
+    def mark_failed(self, backend: LLMBackend, error: str) -> None:
+        """Take a backend out of rotation until the next successful probe."""
+        backend.failures += 1
+        backend.last_error = error
+        if backend.healthy:
+            backend.healthy = False
+            logger.warning("LLM backend marked unhealthy", base_url=backend.base_url, error=error)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Get per-backend health and load."""
+        return [
+            {
+                "base_url": backend.base_url,
+                "healthy": backend.healthy,
+                "outstanding": backend.outstanding,
+                "requests": backend.requests,
+                "failures": backend.failures,
+                "last_error": backend.last_error,
+            }
+            for backend in self.backends
+        ]
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error("LLM backend health check failed", error=str(e))
+
+    async def _probe(self, backend: LLMBackend) -> None:
+        try:
+            response = await self.client.get(f"{backend.base_url}/v1/models", timeout=self.probe_timeout)
+        except httpx.HTTPError as e:
+            self.mark_failed(backend, f"Cannot connect: {e.__class__.__name__}")
+            return
+
+        if response.status_code != 200:
+            self.mark_failed(backend, f"Health check returned {response.status_code}")
+            return
+
+        backend.models = [model["id"] for model in response.json().get("data", [])]
+        if not backend.models:
+            self.mark_failed(backend, "No models loaded")
+            return
+
+        if not backend.healthy:
+            logger.info("LLM backend recovered", base_url=backend.base_url)
+        backend.healthy = True
+        backend.last_error = None
+
+    def _build_ring(self) -> None:
+        points = sorted(
+            (_hash(f"{backend.base_url}#{replica}"), index)
+            for index, backend in enumerate(self.backends)
+            for replica in range(VIRTUAL_NODES)
+        )
+        self._ring = [point for point, _ in points]
+        self._ring_backends = [self.backends[index] for _, index in points]
+
+    def _lookup(self, affinity_key: str, candidates: List[LLMBackend]) -> LLMBackend:
+        """Walk the ring clockwise from the key to the first candidate backend."""
+        start = bisect.bisect(self._ring, _hash(affinity_key))
+        for offset in range(len(self._ring)):
+            backend = self._ring_backends[(start + offset) % len(self._ring)]
+            if backend in candidates:
+                return backend
+        return candidates[0]
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
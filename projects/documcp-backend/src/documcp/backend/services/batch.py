@@ -0,0 +1,120 @@
+"""Batch generation over many requests with bounded concurrency."""
+
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Optional, Set, Tuple, Union
+
+import structlog
+
+from documcp.backend.domain.models import GeneratedDocument, GenerationRequest
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.scheduler import Priority
+from documcp.backend.settings import BatchSettings
+
+logger = structlog.get_logger(__name__)
+
+# A batch item is a request, or the error that kept a request from being read
+BatchItem = Union[GenerationRequest, Exception]
+BatchResult = Tuple[int, Union[GeneratedDocument, Exception]]
+
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class BatchGenerator:
+    """Generate many requests with bounded concurrency, yielding documents as they complete.
+
+    At most ``max_concurrency`` requests are generated at once across all batches. The next
+    request is read only when a slot frees up, and finished documents wait in a queue of the
+    same size until the caller takes them, so memory stays flat however large the batch and
+    however slowly its results are read.
+    """
+
+    def __init__(self, document_service: DocumentGenerationService, max_concurrency: int = 4):
+        self.document_service = document_service
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    @classmethod
+    def from_settings(cls, settings: BatchSettings, document_service: DocumentGenerationService) -> "BatchGenerator":
+        """Create a batch generator from application settings."""
+        return cls(document_service, max_concurrency=settings.max_concurrency)
+
+    async def generate(
+        self, items: AsyncIterable[BatchItem], priority: Priority = Priority.BULK, client_id: Optional[str] = None
+    ) -> AsyncIterator[BatchResult]:
+        """Yield ``(request index, document)`` for every document of every request as soon as it is done.
+
+        Requests that cannot be read or generated yield ``(request index, error)``. Closing
+        the iterator early cancels the requests in progress and stops reading ``items``.
+        """
+        results: asyncio.Queue[Any] = asyncio.Queue(maxsize=self.max_concurrency)
+        running: Set[asyncio.Task] = set()
+
+        async def run(index: int, request: GenerationRequest) -> None:
+            try:
+                # The batch was accepted, so a full scheduler queue delays its documents rather than failing them
+                async for document in self.document_service.iter_documents(
+                    request, priority=priority, client_id=client_id, wait_for_queue=True
+                ):
+                    await results.put((index, document))
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error("Batch request failed", request_index=index, error=str(e))
+                await results.put((index, e))
+
+        async def feed() -> None:
+            try:
+                count = 0
+                async for item in items:
+                    index, count = count, count + 1
+                    if isinstance(item, Exception):
+                        self.failed += 1
+                        await results.put((index, item))
+                        continue
+                    await self._slots.acquire()
+                    self.active += 1
+                    task = asyncio.create_task(run(index, item))
+                    running.add(task)
+                    # A callback rather than ``finally``: it also runs for tasks cancelled before they start
+                    task.add_done_callback(self._release)
+                    task.add_done_callback(running.discard)
+                while running:
+                    await asyncio.wait(set(running))
+                logger.info("Batch completed", requests=count)
+            except Exception as e:
+                await results.put(_Failed(e))
+            else:
+                await results.put(_DONE)
+
+        feeder = asyncio.create_task(feed())
+        try:
+            while (result := await results.get()) is not _DONE:
+                if isinstance(result, _Failed):
+                    raise result.error
+                yield result
+        finally:
+            tasks = [feeder, *running]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _release(self, _: asyncio.Task) -> None:
+        self.active -= 1
+        self._slots.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batch counters."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
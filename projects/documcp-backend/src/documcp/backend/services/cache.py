@@ -0,0 +1,234 @@
+"""Content-addressed cache for generated documents."""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set, Tuple, TypeVar
+
+import structlog
+
+from documcp.backend.settings import GenerationCacheSettings
+
+logger = structlog.get_logger(__name__)
+
+SQLITE_URL_PREFIX = "sqlite:///"
+
+T = TypeVar("T")
+
+# Share of ``max_disk_entries`` removed beyond the cap when pruning, so pruning runs once per batch of writes
+DISK_PRUNE_BATCH = 0.1
+
+
+def make_generation_key(prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+    """Build a content-addressed key for a rendered prompt and its sampling parameters."""
+    material = json.dumps([prompt, model, temperature, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """Two-tier cache: a bounded in-memory LRU backed by an optional SQLite file.
+
+    Entries are keyed by a hash of the fully rendered prompt plus the sampling
+    parameters, so identical generations are served without calling LM Studio.
+    The SQLite tier keeps at most ``max_disk_entries`` rows, evicting the oldest in
+    batches once a write goes over the cap, and drops expired rows every
+    ``purge_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        expire: int = 86400,
+        prefix: str = "",
+        path: Optional[str] = None,
+        enable: bool = True,
+        max_disk_entries: int = 10000,
+        purge_interval: int = 300,
+    ):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.purge_interval = purge_interval
+        self.expire = expire
+        self.prefix = prefix
+        self.enable = enable
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._purged_at = 0.0
+        # Rows in the SQLite tier; replaced keys overcount it until the next exact count
+        self._disk_rows = 0
+        # SQLite calls running in worker threads, awaited by ``close``
+        self._in_flight: Set[asyncio.Future] = set()
+
+        if enable and path:
+            self._open_database(path)
+
+    @classmethod
+    def from_settings(cls, settings: GenerationCacheSettings) -> "GenerationCache":
+        """Create a cache from application settings."""
+        path = None
+        if settings.backend_url:
+            if settings.backend_url.startswith(SQLITE_URL_PREFIX):
+                path = settings.backend_url[len(SQLITE_URL_PREFIX) :]
+            else:
+                logger.warning("Unsupported cache backend, using in-memory tier only", backend_url=settings.backend_url)
+
+        return cls(
+            max_entries=settings.max_entries,
+            expire=settings.expire,
+            prefix=settings.prefix,
+            path=path,
+            enable=settings.enable,
+            max_disk_entries=settings.max_disk_entries,
+            purge_interval=settings.purge_interval,
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached value for ``key``, or ``None`` on a miss."""
+        if not self.enable:
+            return None
+
+        key = self.prefix + key
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        if self._db is not None:
+            try:
+                row = await self._in_thread(self._db_get, key, now)
+            except sqlite3.Error as e:
+                logger.warning("Failed to read cache entry", error=str(e))
+                row = None
+            if row is not None:
+                expires_at, value = row
+                self._remember(key, value, expires_at)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        """Store ``value`` under ``key`` in both tiers."""
+        if not self.enable:
+            return
+
+        key = self.prefix + key
+        expires_at = time.time() + self.expire
+        self._remember(key, value, expires_at)
+
+        if self._db is not None:
+            try:
+                await self._in_thread(self._db_set, key, value, expires_at)
+            except sqlite3.Error as e:
+                logger.warning("Failed to persist cache entry", error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enable,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "persistent": self._db is not None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    async def close(self) -> None:
+        """Close the persistent tier once the reads and writes already running in threads are done."""
+        db, self._db = self._db, None
+        while self._in_flight:
+            await asyncio.wait(set(self._in_flight))
+        if db is not None:
+            with self._db_lock:
+                db.close()
+
+    async def _in_thread(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a SQLite call in a worker thread, tracked until it finishes even if the caller is cancelled."""
+        future = asyncio.ensure_future(asyncio.to_thread(fn, self._db, *args))
+        self._in_flight.add(future)
+        future.add_done_callback(self._in_flight.discard)
+        return await asyncio.shield(future)
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        """Insert into the in-memory tier, evicting the least recently used entries."""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _open_database(self, path: str) -> None:
+        """Open (and create if needed) the SQLite tier."""
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db_lock, self._db:
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS generation_cache "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._db.execute(
+                    "CREATE INDEX IF NOT EXISTS generation_cache_expires_at ON generation_cache (expires_at)"
+                )
+                self._purge_expired(self._db, time.time())
+                (self._disk_rows,) = self._db.execute("SELECT COUNT(*) FROM generation_cache").fetchone()
+            logger.info("Generation cache persistence enabled", path=path)
+        except sqlite3.Error as e:
+            logger.warning("Failed to open cache database, using in-memory tier only", path=path, error=str(e))
+            self._db = None
+
+    def _db_get(self, db: sqlite3.Connection, key: str, now: float) -> Optional[Tuple[float, str]]:
+        with self._db_lock:
+            row = db.execute(
+                "SELECT expires_at, value FROM generation_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        return row
+
+    def _db_set(self, db: sqlite3.Connection, key: str, value: str, expires_at: float) -> None:
+        now = time.time()
+        with self._db_lock, db:
+            db.execute(
+                "INSERT OR REPLACE INTO generation_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._disk_rows += 1
+            if now - self._purged_at >= self.purge_interval:
+                self._purge_expired(db, now)
+            if self._disk_rows > self.max_disk_entries:
+                self._prune(db)
+
+    def _prune(self, db: sqlite3.Connection) -> None:
+        """Delete the oldest rows beyond ``max_disk_entries``, down to a batch below the cap."""
+        (self._disk_rows,) = db.execute("SELECT COUNT(*) FROM generation_cache").fetchone()
+        if self._disk_rows <= self.max_disk_entries:
+            return
+        keep = self.max_disk_entries - int(self.max_disk_entries * DISK_PRUNE_BATCH)
+        # Every row lives for ``expire``, so the soonest to expire are the oldest; the index finds the cut-off
+        row = db.execute(
+            "SELECT expires_at FROM generation_cache ORDER BY expires_at DESC LIMIT 1 OFFSET ?", (keep,)
+        ).fetchone()
+        if row is not None:
+            self._disk_rows -= db.execute("DELETE FROM generation_cache WHERE expires_at <= ?", row).rowcount
+
+    def _purge_expired(self, db: sqlite3.Connection, now: float) -> None:
+        self._disk_rows -= db.execute("DELETE FROM generation_cache WHERE expires_at <= ?", (now,)).rowcount
+        self._purged_at = now
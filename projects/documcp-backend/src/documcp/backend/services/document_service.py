@@ -1,26 +1,101 @@
 """Document generation service."""
 
 import asyncio
+import contextlib
+import functools
+import hashlib
 import time
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple, TypeVar, Union
 
 import structlog
 
-from documcp.backend.domain.models import DocumentType, GeneratedDocument, GenerationRequest, GenerationResponse
-from documcp.backend.services.llm_service import LMStudioService
+from documcp.backend.domain.models import (
+    DocumentType,
+    DocumentUpdateRequest,
+    GeneratedDocument,
+    GenerationMode,
+    GenerationRecord,
+    GenerationRequest,
+    GenerationResponse,
+    StreamEventType,
+)
+from documcp.backend.services.cache import GenerationCache, make_generation_key
+from documcp.backend.services.ingestion import InputReducer
+from documcp.backend.services.history import GenerationRecorder
+from documcp.backend.services.llm_service import DOCUMENT_SECTIONS, CompletionStats, LMStudioService
+from documcp.backend.services.scheduler import GenerationScheduler, Priority, QueueFullError
+from documcp.backend.services.sections import (
+    DocumentSections,
+    diff_inputs,
+    document_title,
+    heading_line,
+    parse_section_numbers,
+    replace_heading,
+    section_heading,
+    section_title,
+    split_sections,
+)
+from documcp.backend.services.single_flight import SingleFlight, generation_flights
+from documcp.backend.tracing import tracer
 
 logger = structlog.get_logger(__name__)
 
+# Answer length of the call deciding which sections an input change affects
+TRIAGE_MAX_TOKENS = 32
+OUTLINE_MAX_TOKENS = 512
+MIN_SECTION_TOKENS = 256
+
+T = TypeVar("T")
+
 
 class DocumentGenerationService:
     """Service for generating documents using LLM."""
 
-    def __init__(self, llm_service: LMStudioService):
+    def __init__(
+        self,
+        llm_service: LMStudioService,
+        cache: Optional[GenerationCache] = None,
+        inflight: Optional[SingleFlight] = None,
+        scheduler: Optional[GenerationScheduler] = None,
+        reducer: Optional[InputReducer] = None,
+        recorder: Optional[GenerationRecorder] = None,
+    ):
         self.llm_service = llm_service
+        self.cache = cache
+        self.inflight = inflight if inflight is not None else generation_flights
+        self.scheduler = scheduler
+        self.reducer = reducer
+        self.recorder = recorder
+
+    def check_admission(self, request: Union[GenerationRequest, DocumentUpdateRequest]) -> None:
+        """Reject a request up front when the scheduler queue cannot take it."""
+        if self.scheduler is not None:
+            self.scheduler.check_admission(self._admission_cost(request))
+
+    async def until_admitted(self, generate: Callable[[], Awaitable[T]]) -> T:
+        """Run ``generate``, starting over after ``Retry-After`` whenever the scheduler queue is full.
+
+        For callers that already accepted the work, such as batches and jobs.
+        """
+        while True:
+            try:
+                return await generate()
+            except QueueFullError as e:
+                logger.info("Generation queue full, waiting to retry", retry_after=e.retry_after)
+                await asyncio.sleep(e.retry_after)
 
-    async def generate_documents(self, request: GenerationRequest) -> GenerationResponse:
-        """Generate multiple documents based on request."""
+    async def generate_documents(
+        self, request: GenerationRequest, priority: Priority = Priority.BULK, client_id: Optional[str] = None
+    ) -> GenerationResponse:
+        """Generate multiple documents based on request.
+
+        Cancelling the call cancels its document tasks and, with them, upstream calls that no
+        other request shares. Documents that were already generated stay cached.
+        """
         start_time = time.time()
+        self.check_admission(request)
+        source_text = request.input_text
+        request = await self._reduce_input(request, priority=priority, client_id=client_id)
 
         logger.info(
             "Starting document generation",
@@ -29,16 +104,34 @@ class DocumentGenerationService:
             input_length=len(request.input_text),
         )
 
-        # Generate documents concurrently
-        tasks = []
-        for doc_type in request.document_types:
-            task = self._generate_single_document(
-                request.input_text, doc_type, request.project_name, request.additional_context
+        if self._is_combined(request):
+            # One completion for every document, so the project description is prefilled once
+            generated_docs = await self._generate_combined_documents(
+                request, priority=priority, client_id=client_id, source_text=source_text
             )
-            tasks.append(task)
+        else:
+            # Generate documents concurrently
+            generate = self._document_generator(request)
+            tasks = []
+            for doc_type in request.document_types:
+                task = generate(
+                    request.input_text,
+                    doc_type,
+                    request.project_name,
+                    request.additional_context,
+                    priority=priority,
+                    client_id=client_id,
+                    source_text=source_text,
+                )
+                tasks.append(task)
+
+            # Wait for all documents to be generated
+            generated_docs = await asyncio.gather(*tasks, return_exceptions=True)
 
-        # Wait for all documents to be generated
-        generated_docs = await asyncio.gather(*tasks, return_exceptions=True)
+        # Surface backpressure to the caller instead of returning error documents
+        for result in generated_docs:
+            if isinstance(result, QueueFullError):
+                raise result
 
         # Process results and handle any exceptions
         successful_docs = []
@@ -46,13 +139,7 @@ class DocumentGenerationService:
             if isinstance(result, Exception):
                 doc_type = request.document_types[i]
                 logger.error("Failed to generate document", document_type=doc_type.value, error=str(result))
-                # Create error document
-                error_doc = GeneratedDocument(
-                    document_type=doc_type,
-                    content=f"# Error\n\nFailed to generate {doc_type.value}: {str(result)}",
-                    metadata={"error": True, "error_message": str(result)},
-                )
-                successful_docs.append(error_doc)
+                successful_docs.append(self._build_error_document(doc_type, result))
             else:
                 successful_docs.append(result)
 
@@ -66,50 +153,808 @@ class DocumentGenerationService:
             documents=successful_docs, generation_time=generation_time, model_info=self.llm_service.get_model_info()
         )
 
+    async def generate_document(
+        self,
+        request: GenerationRequest,
+        document_type: DocumentType,
+        priority: Priority = Priority.BULK,
+        client_id: Optional[str] = None,
+    ) -> GeneratedDocument:
+        """Generate one of the documents described by a request."""
+        source_text = request.input_text
+        request = await self._reduce_input(request, priority=priority, client_id=client_id)
+        return await self._document_generator(request)(
+            request.input_text,
+            document_type,
+            request.project_name,
+            request.additional_context,
+            priority=priority,
+            client_id=client_id,
+            source_text=source_text,
+        )
+
+    async def update_documents(
+        self, request: DocumentUpdateRequest, priority: Priority = Priority.BULK, client_id: Optional[str] = None
+    ) -> GenerationResponse:
+        """Update documents after their project description changed, regenerating only affected sections.
+
+        The inputs are diffed by paragraph and a short completion picks the sections the change
+        affects; the others are reused verbatim. A document whose previous version is unknown, or
+        whose sections cannot be found in it, is generated in full.
+        """
+        start_time = time.time()
+        self.check_admission(request)
+        generation_request = await self._reduce_input(
+            GenerationRequest(
+                input_text=request.input_text,
+                document_types=request.document_types,
+                project_name=request.project_name,
+                additional_context=request.additional_context,
+            ),
+            priority=priority,
+            client_id=client_id,
+        )
+        diff = diff_inputs(request.previous_input_text, request.input_text)
+
+        logger.info(
+            "Starting document update",
+            document_types=[dt.value for dt in request.document_types],
+            project_name=request.project_name,
+            changed_lines=len(diff.splitlines()),
+        )
+
+        results = await asyncio.gather(
+            *(
+                self._update_document(
+                    generation_request, doc_type, request, diff, priority=priority, client_id=client_id
+                )
+                for doc_type in request.document_types
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, QueueFullError):
+                raise result
+
+        documents = []
+        for doc_type, result in zip(request.document_types, results):
+            if isinstance(result, Exception):
+                logger.error("Failed to update document", document_type=doc_type.value, error=str(result))
+                documents.append(self._build_error_document(doc_type, result))
+            else:
+                documents.append(result)
+
+        generation_time = time.time() - start_time
+        logger.info("Document update completed", total_documents=len(documents), generation_time=generation_time)
+        return GenerationResponse(
+            documents=documents, generation_time=generation_time, model_info=self.llm_service.get_model_info()
+        )
+
+    async def iter_documents(
+        self,
+        request: GenerationRequest,
+        priority: Priority = Priority.BULK,
+        client_id: Optional[str] = None,
+        wait_for_queue: bool = False,
+    ) -> AsyncIterator[GeneratedDocument]:
+        """Generate the documents of a request, yielding each one as soon as it is ready.
+
+        Failed documents are yielded as error documents. With ``wait_for_queue``, work turned
+        away by a full scheduler queue is retried after its ``Retry-After`` instead of failing,
+        for callers that already accepted the request. Closing the iterator early cancels the
+        documents still being generated.
+        """
+        admitted = self.until_admitted if wait_for_queue else _call
+        source_text = request.input_text
+        request = await admitted(lambda: self._reduce_input(request, priority=priority, client_id=client_id))
+
+        if self._is_combined(request):
+            results = await admitted(
+                lambda: self._generate_combined_documents(
+                    request, priority=priority, client_id=client_id, source_text=source_text
+                )
+            )
+            for doc_type, result in zip(request.document_types, results):
+                yield self._build_error_document(doc_type, result) if isinstance(result, BaseException) else result
+            return
+
+        generate = self._document_generator(request)
+
+        def generate_document(doc_type: DocumentType) -> Awaitable[GeneratedDocument]:
+            return generate(
+                request.input_text,
+                doc_type,
+                request.project_name,
+                request.additional_context,
+                priority=priority,
+                client_id=client_id,
+                source_text=source_text,
+            )
+
+        tasks = {
+            asyncio.create_task(admitted(functools.partial(generate_document, doc_type))): doc_type
+            for doc_type in request.document_types
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        yield task.result()
+                    else:
+                        logger.error("Failed to generate document", document_type=tasks[task].value, error=str(error))
+                        yield self._build_error_document(tasks[task], error)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def stream_documents(
+        self, request: GenerationRequest, priority: Priority = Priority.BULK, client_id: Optional[str] = None
+    ) -> AsyncIterator[Tuple[StreamEventType, Dict[str, Any]]]:
+        """Stream multiple documents, yielding events as soon as they are produced.
+
+        Each document emits a start event once it holds a scheduler slot (or is served from
+        the cache or another request), content deltas tagged with its document type, and its
+        own completion event when it finishes rather than waiting for the slowest one.
+        Combined and sectioned modes send each document in one piece once it is assembled.
+        """
+        if self._is_combined(request) or request.mode is GenerationMode.SECTIONED:
+            async for event in self._stream_whole_documents(request, priority=priority, client_id=client_id):
+                yield event
+            return
+
+        start_time = time.time()
+        source_text = request.input_text
+        request = await self._reduce_input(request, priority=priority, client_id=client_id)
+
+        logger.info(
+            "Starting streamed document generation",
+            document_types=[dt.value for dt in request.document_types],
+            project_name=request.project_name,
+            input_length=len(request.input_text),
+        )
+
+        events: asyncio.Queue[Tuple[StreamEventType, Dict[str, Any]]] = asyncio.Queue()
+
+        async def produce(doc_type: DocumentType) -> None:
+            try:
+                with tracer.span("stream_document", document_type=doc_type.value) as span:
+                    max_length = self._get_max_length_for_type(doc_type)
+                    temperature = self._get_temperature_for_type(doc_type)
+                    with tracer.span("prompt.build"):
+                        prompt = self.llm_service.build_prompt(request.input_text, doc_type, request.project_name)
+                    generation_key = make_generation_key(prompt, self.llm_service.model_name, temperature, max_length)
+
+                    async def stream_and_cache() -> Tuple[str, CompletionStats]:
+                        chunks = []
+                        stats = CompletionStats()
+                        async with self._slot(priority, client_id):
+                            await events.put((StreamEventType.STARTED, {"document_type": doc_type.value}))
+                            async for delta in self.llm_service.stream_completion(
+                                prompt,
+                                max_length=max_length,
+                                temperature=temperature,
+                                affinity_key=self._get_affinity_key(request.input_text, request.project_name),
+                                document_type=doc_type.value,
+                                stats=stats,
+                            ):
+                                chunks.append(delta)
+                                await events.put(
+                                    (StreamEventType.CHUNK, {"document_type": doc_type.value, "content": delta})
+                                )
+                        content = "".join(chunks).strip()
+                        await self._set_cached(generation_key, content)
+                        return content, stats
+
+                    content = await self._get_cached(generation_key)
+                    cached = content is not None
+                    stats: Optional[CompletionStats] = None
+                    coalesced = False
+                    if not cached:
+                        # Shared with identical streamed or complete generations, which receive the finished content
+                        (content, stats), coalesced = await self.inflight.do(generation_key, stream_and_cache)
+
+                    if cached or coalesced:
+                        await events.put((StreamEventType.STARTED, {"document_type": doc_type.value}))
+                        await events.put((StreamEventType.CHUNK, {"document_type": doc_type.value, "content": content}))
+
+                    span.set_attribute("cached", cached)
+                    span.set_attribute("coalesced", coalesced)
+                    document = self._build_document(
+                        content,
+                        doc_type,
+                        source_text,
+                        request.project_name,
+                        request.additional_context,
+                        cached=cached,
+                        coalesced=coalesced,
+                        temperature=temperature,
+                        max_length=max_length,
+                        stats=stats,
+                    )
+                    await events.put((StreamEventType.DOCUMENT, document.model_dump(mode="json")))
+
+            except Exception as e:
+                logger.error("Failed to stream document", document_type=doc_type.value, error=str(e))
+                error_doc = self._build_error_document(doc_type, e)
+                await events.put((StreamEventType.ERROR, error_doc.model_dump(mode="json")))
+
+        tasks = [asyncio.create_task(produce(doc_type)) for doc_type in request.document_types]
+        remaining = len(tasks)
+
+        try:
+            while remaining:
+                event, payload = await events.get()
+                if event in (StreamEventType.DOCUMENT, StreamEventType.ERROR):
+                    remaining -= 1
+                yield event, payload
+        finally:
+            # Stop upstream generation if the consumer went away early, and let the tasks clean up
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        generation_time = time.time() - start_time
+
+        logger.info(
+            "Streamed document generation completed",
+            total_documents=len(tasks),
+            generation_time=generation_time,
+        )
+
+        yield (
+            StreamEventType.DONE,
+            {
+                "generation_time": generation_time,
+                "model_info": self.llm_service.get_model_info(),
+            },
+        )
+
+    async def _stream_whole_documents(
+        self, request: GenerationRequest, priority: Priority = Priority.BULK, client_id: Optional[str] = None
+    ) -> AsyncIterator[Tuple[StreamEventType, Dict[str, Any]]]:
+        """Stream the documents of a combined or sectioned request as ``stream_documents`` does.
+
+        A shared completion cannot be split until it ends, and sections are written out of
+        order, so every document starts at once and its content arrives as a single delta
+        right before its completion event.
+        """
+        start_time = time.time()
+        logger.info(
+            "Starting streamed whole-document generation",
+            mode=request.mode.value,
+            document_types=[dt.value for dt in request.document_types],
+            project_name=request.project_name,
+            input_length=len(request.input_text),
+        )
+
+        for doc_type in dict.fromkeys(request.document_types):
+            yield StreamEventType.STARTED, {"document_type": doc_type.value}
+        async for document in self.iter_documents(request, priority=priority, client_id=client_id):
+            if document.metadata.get("error"):
+                yield StreamEventType.ERROR, document.model_dump(mode="json")
+                continue
+            yield StreamEventType.CHUNK, {"document_type": document.document_type.value, "content": document.content}
+            yield StreamEventType.DOCUMENT, document.model_dump(mode="json")
+
+        generation_time = time.time() - start_time
+        logger.info(
+            "Streamed whole-document generation completed",
+            total_documents=len(request.document_types),
+            generation_time=generation_time,
+        )
+        yield (
+            StreamEventType.DONE,
+            {
+                "generation_time": generation_time,
+                "model_info": self.llm_service.get_model_info(),
+            },
+        )
+
     async def _generate_single_document(
         self,
         input_text: str,
         document_type: DocumentType,
         project_name: Optional[str] = None,
         additional_context: Optional[Dict[str, Any]] = None,
+        priority: Priority = Priority.BULK,
+        client_id: Optional[str] = None,
+        source_text: Optional[str] = None,
     ) -> GeneratedDocument:
-        """Generate a single document."""
+        """Generate a single document.
+
+        ``source_text`` is the input the client sent when ``input_text`` is its reduction; it is
+        what the document's metadata and history record describe.
+        """
 
         logger.info("Generating document", document_type=document_type.value)
 
         try:
-            # Generate content using LLM
-            content = await self.llm_service.generate_document(
-                input_text=input_text,
-                document_type=document_type,
-                project_name=project_name,
-                max_length=self._get_max_length_for_type(document_type),
-                temperature=self._get_temperature_for_type(document_type),
-            )
+            with tracer.span("generate_document", document_type=document_type.value) as span:
+                max_length = self._get_max_length_for_type(document_type)
+                temperature = self._get_temperature_for_type(document_type)
+                with tracer.span("prompt.build"):
+                    prompt = self.llm_service.build_prompt(input_text, document_type, project_name)
+                content, stats, cached, coalesced = await self._complete_cached(
+                    prompt,
+                    max_length,
+                    temperature,
+                    priority=priority,
+                    client_id=client_id,
+                    affinity_key=self._get_affinity_key(input_text, project_name),
+                    document_type=document_type.value,
+                )
+                span.set_attribute("cached", cached)
+                span.set_attribute("coalesced", coalesced)
 
-            # Create metadata
-            metadata = {
-                "generated_at": time.time(),
-                "project_name": project_name,
-                "input_length": len(input_text),
-                "output_length": len(content),
-                "model": self.llm_service.model_name,
-            }
+                return self._build_document(
+                    content,
+                    document_type,
+                    source_text or input_text,
+                    project_name,
+                    additional_context,
+                    cached=cached,
+                    coalesced=coalesced,
+                    temperature=temperature,
+                    max_length=max_length,
+                    stats=stats,
+                )
 
-            if additional_context:
-                metadata.update(additional_context)
+        except Exception as e:
+            logger.error("Error generating document", document_type=document_type.value, error=str(e))
+            raise
+
+    async def _generate_sectioned_document(
+        self,
+        input_text: str,
+        document_type: DocumentType,
+        project_name: Optional[str] = None,
+        additional_context: Optional[Dict[str, Any]] = None,
+        priority: Priority = Priority.BULK,
+        client_id: Optional[str] = None,
+        source_text: Optional[str] = None,
+    ) -> GeneratedDocument:
+        """Generate a document from an outline, then all of its sections concurrently.
 
-            return GeneratedDocument(document_type=document_type, content=content, metadata=metadata)
+        The outline keeps sections written apart from repeating each other; they are stitched
+        back in order under the section headings. With spare LM Studio slots the document takes
+        about as long as the outline and its slowest section. ``source_text`` is as for
+        ``_generate_single_document``.
+        """
+        logger.info("Generating sectioned document", document_type=document_type.value)
+
+        try:
+            with tracer.span("generate_sectioned", document_type=document_type.value) as span:
+                start_time = time.time()
+                temperature = self._get_temperature_for_type(document_type)
+                affinity_key = self._get_affinity_key(input_text, project_name)
+                with tracer.span("prompt.build"):
+                    prompt = self.llm_service.build_outline_prompt(input_text, document_type, project_name)
+                outline_call = await self._complete_cached(
+                    prompt,
+                    OUTLINE_MAX_TOKENS,
+                    temperature,
+                    priority=priority,
+                    client_id=client_id,
+                    affinity_key=affinity_key,
+                    document_type=f"{document_type.value}_outline",
+                )
+
+                max_length = self._get_section_max_length(document_type)
+                outline = outline_call[0].strip()
+                count = len(DOCUMENT_SECTIONS[document_type])
+                headings = [section_heading(document_type, i, project_name) for i in range(count)]
+                section_calls = await _gather_all(
+                    *(
+                        self._complete_cached(
+                            self.llm_service.build_section_prompt(
+                                input_text, document_type, i, heading, outline, project_name
+                            ),
+                            max_length,
+                            temperature,
+                            priority=priority,
+                            client_id=client_id,
+                            affinity_key=affinity_key,
+                            document_type=document_type.value,
+                        )
+                        for i, heading in enumerate(headings)
+                    )
+                )
+
+                sections = [
+                    replace_heading(content, heading) if heading else f"{content.strip()}\n\n"
+                    for (content, *_), heading in zip(section_calls, headings)
+                ]
+                content = DocumentSections(document_title(document_type, project_name), sections).join()
+                calls = [outline_call, *section_calls]
+                cached = all(call_cached for _, _, call_cached, _ in calls)
+                coalesced = all(call_coalesced for _, _, _, call_coalesced in calls)
+                span.set_attribute("sections", len(sections))
+                span.set_attribute("cached", cached)
+
+                document = self._build_document(
+                    content,
+                    document_type,
+                    source_text or input_text,
+                    project_name,
+                    additional_context,
+                    cached=cached,
+                    coalesced=coalesced,
+                    temperature=temperature,
+                    max_length=max_length,
+                    stats=_total_stats([stats for _, stats, _, _ in calls], time.time() - start_time),
+                )
+                document.metadata["sections"] = len(sections)
+                return document
 
         except Exception as e:
-            logger.error("Error generating document", document_type=document_type.value, error=str(e))
+            logger.error("Error generating sectioned document", document_type=document_type.value, error=str(e))
+            raise
+
+    async def _generate_combined_documents(
+        self,
+        request: GenerationRequest,
+        priority: Priority = Priority.BULK,
+        client_id: Optional[str] = None,
+        source_text: Optional[str] = None,
+    ) -> List[Union[GeneratedDocument, BaseException]]:
+        """Generate every requested document from a single delimited completion.
+
+        Documents missing from the completion are generated individually, so a model that
+        ignores the delimiters degrades to per-document mode instead of failing.
+        """
+        document_types = list(dict.fromkeys(request.document_types))
+        logger.info("Generating combined documents", document_types=[dt.value for dt in document_types])
+
+        try:
+            with tracer.span("generate_combined", document_types=",".join(dt.value for dt in document_types)) as span:
+                max_length = sum(self._get_max_length_for_type(doc_type) for doc_type in document_types)
+                temperature = min(self._get_temperature_for_type(doc_type) for doc_type in document_types)
+                with tracer.span("prompt.build"):
+                    prompt = self.llm_service.build_combined_prompt(
+                        request.input_text, document_types, request.project_name
+                    )
+                content, stats, cached, coalesced = await self._complete_cached(
+                    prompt,
+                    max_length,
+                    temperature,
+                    priority=priority,
+                    client_id=client_id,
+                    affinity_key=self._get_affinity_key(request.input_text, request.project_name),
+                    document_type="combined",
+                )
+                span.set_attribute("cached", cached)
+                span.set_attribute("coalesced", coalesced)
+        except QueueFullError:
             raise
+        except Exception as e:
+            logger.error("Error generating combined documents", error=str(e))
+            return [e] * len(request.document_types)
+
+        sections = self.llm_service.split_combined_output(content, document_types)
+        missing = [doc_type for doc_type in document_types if doc_type not in sections]
+        if missing:
+            logger.warning(
+                "Combined completion is missing documents, generating them individually",
+                missing=[dt.value for dt in missing],
+            )
+
+        fallbacks = await asyncio.gather(
+            *(
+                self._generate_single_document(
+                    request.input_text,
+                    doc_type,
+                    request.project_name,
+                    request.additional_context,
+                    priority=priority,
+                    client_id=client_id,
+                    source_text=source_text,
+                )
+                for doc_type in missing
+            ),
+            return_exceptions=True,
+        )
+        documents: Dict[DocumentType, Union[GeneratedDocument, BaseException]] = dict(zip(missing, fallbacks))
+        for doc_type, section in sections.items():
+            documents[doc_type] = self._build_document(
+                section,
+                doc_type,
+                source_text or request.input_text,
+                request.project_name,
+                request.additional_context,
+                cached=cached,
+                coalesced=coalesced,
+                combined=True,
+                temperature=temperature,
+                max_length=max_length,
+                stats=stats,
+            )
+
+        return [documents[doc_type] for doc_type in request.document_types]
+
+    async def _update_document(
+        self,
+        request: GenerationRequest,
+        document_type: DocumentType,
+        update: DocumentUpdateRequest,
+        diff: str,
+        priority: Priority = Priority.BULK,
+        client_id: Optional[str] = None,
+    ) -> GeneratedDocument:
+        """Update one document; ``request`` carries the (possibly reduced) updated input."""
+        with tracer.span("update_document", document_type=document_type.value) as span:
+            previous = update.previous_documents.get(document_type)
+            if previous is None:
+                previous = await self._find_previous(update.previous_input_text, document_type)
+            parts = split_sections(previous, document_type) if previous is not None else None
+
+            if parts is None:
+                span.set_attribute("update", "full")
+                logger.info(
+                    "Previous document unknown or unsectioned, generating it in full",
+                    document_type=document_type.value,
+                    previous_found=previous is not None,
+                )
+                document = await self._generate_single_document(
+                    request.input_text,
+                    document_type,
+                    request.project_name,
+                    request.additional_context,
+                    priority=priority,
+                    client_id=client_id,
+                    source_text=update.input_text,
+                )
+                document.metadata["update"] = "full"
+                return document
+
+            affinity_key = self._get_affinity_key(request.input_text, request.project_name)
+            affected: Set[int] = set()
+            if diff:
+                triage, *_ = await self._complete_cached(
+                    self.llm_service.build_section_triage_prompt(diff, document_type),
+                    TRIAGE_MAX_TOKENS,
+                    0.0,
+                    priority=priority,
+                    client_id=client_id,
+                    affinity_key=affinity_key,
+                    document_type=f"{document_type.value}_triage",
+                )
+                parsed = parse_section_numbers(triage, len(parts.sections))
+                # An answer that cannot be read regenerates everything rather than risk stale sections
+                affected = parsed if parsed is not None else set(range(len(parts.sections)))
+
+            indexes = sorted(affected)
+            temperature = self._get_temperature_for_type(document_type)
+            revised = await _gather_all(
+                *(
+                    self._complete_cached(
+                        self.llm_service.build_section_update_prompt(
+                            request.input_text, document_type, parts.sections[i], diff, request.project_name
+                        ),
+                        self._get_section_max_length(document_type),
+                        temperature,
+                        priority=priority,
+                        client_id=client_id,
+                        affinity_key=affinity_key,
+                        document_type=document_type.value,
+                    )
+                    for i in indexes
+                )
+            )
+            for i, (content, *_) in zip(indexes, revised):
+                heading = heading_line(parts.sections[i])
+                # Without a previous heading the revised section keeps whichever title the model wrote
+                parts.sections[i] = replace_heading(content, heading) if heading else f"{content.strip()}\n\n"
+
+            titles = [section_title(section) for section in DOCUMENT_SECTIONS[document_type]]
+            span.set_attribute("update", "sections")
+            span.set_attribute("sections_regenerated", len(indexes))
+            document = self._build_document(
+                parts.join(),
+                document_type,
+                update.input_text,
+                request.project_name,
+                request.additional_context,
+                cached=not indexes,
+                temperature=temperature,
+            )
+            document.metadata.update(
+                update="sections",
+                sections_regenerated=[titles[i] for i in indexes],
+                sections_reused=[title for i, title in enumerate(titles) if i not in affected],
+            )
+            return document
+
+    async def _find_previous(self, previous_input_text: str, document_type: DocumentType) -> Optional[str]:
+        """Content last generated from ``previous_input_text``, according to the generation history."""
+        if self.recorder is None:
+            return None
+        input_hash = hashlib.sha256(previous_input_text.encode("utf-8")).hexdigest()
+        record = await self.recorder.repository.latest_for_input(input_hash, document_type)
+        return record.content if record is not None else None
+
+    async def _reduce_input(
+        self, request: GenerationRequest, priority: Priority = Priority.BULK, client_id: Optional[str] = None
+    ) -> GenerationRequest:
+        """Replace an input that does not fit the context window with its map-reduced summary."""
+        if self.reducer is None or not self.reducer.needs_reduction(request.input_text):
+            return request
+
+        with tracer.span("ingestion.reduce", input_length=len(request.input_text)):
+            input_text = await self.reducer.reduce(
+                request.input_text, request.project_name, priority=priority, client_id=client_id
+            )
+        return request.model_copy(update={"input_text": input_text})
+
+    def _build_document(
+        self,
+        content: str,
+        document_type: DocumentType,
+        input_text: str,
+        project_name: Optional[str] = None,
+        additional_context: Optional[Dict[str, Any]] = None,
+        cached: bool = False,
+        coalesced: bool = False,
+        combined: bool = False,
+        temperature: Optional[float] = None,
+        max_length: Optional[int] = None,
+        stats: Optional[CompletionStats] = None,
+    ) -> GeneratedDocument:
+        """Wrap generated content with its metadata and record it in the generation history."""
+        metadata = {
+            "generated_at": time.time(),
+            "project_name": project_name,
+            "input_hash": hashlib.sha256(input_text.encode("utf-8")).hexdigest(),
+            "input_length": len(input_text),
+            "output_length": len(content),
+            "model": self.llm_service.model_name,
+            "temperature": temperature,
+            "max_tokens": max_length,
+            "cached": cached,
+            "coalesced": coalesced,
+            "combined": combined,
+        }
+        if stats is not None:
+            metadata.update(
+                upstream_time=stats.generation_time,
+                time_to_first_token=stats.time_to_first_token,
+                prompt_tokens=stats.prompt_tokens,
+                completion_tokens=stats.completion_tokens,
+            )
+
+        if self.recorder is not None:
+            # Recorded before ``additional_context`` is merged, so clients cannot overwrite the facts
+            self.recorder.record(GenerationRecord(document_type=document_type, content=content, **metadata))
+
+        if additional_context:
+            metadata.update(additional_context)
+
+        return GeneratedDocument(document_type=document_type, content=content, metadata=metadata)
+
+    def _build_error_document(self, document_type: DocumentType, error: BaseException) -> GeneratedDocument:
+        """Create a placeholder document describing a generation failure."""
+        return GeneratedDocument(
+            document_type=document_type,
+            content=f"# Error\n\nFailed to generate {document_type.value}: {str(error)}",
+            metadata={"error": True, "error_message": str(error)},
+        )
+
+    async def _complete_cached(
+        self,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        priority: Priority = Priority.BULK,
+        client_id: Optional[str] = None,
+        affinity_key: Optional[str] = None,
+        document_type: str = "other",
+    ) -> Tuple[str, Optional[CompletionStats], bool, bool]:
+        """Complete ``prompt`` from the cache, or upstream while sharing the call with identical in-flight requests.
+
+        Returns the content, its upstream stats (``None`` when cached), and whether it was
+        cached or coalesced.
+        """
+        generation_key = make_generation_key(prompt, self.llm_service.model_name, temperature, max_length)
+        content = await self._get_cached(generation_key)
+        if content is not None:
+            return content, None, True, False
+
+        (content, stats), coalesced = await self.inflight.do(
+            generation_key,
+            lambda: self._complete_and_cache(
+                generation_key,
+                prompt,
+                max_length,
+                temperature,
+                priority=priority,
+                client_id=client_id,
+                affinity_key=affinity_key,
+                document_type=document_type,
+            ),
+        )
+        return content, stats, False, coalesced
+
+    async def _complete_and_cache(
+        self,
+        generation_key: str,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        priority: Priority = Priority.BULK,
+        client_id: Optional[str] = None,
+        affinity_key: Optional[str] = None,
+        document_type: str = "other",
+    ) -> Tuple[str, CompletionStats]:
+        """Call LM Studio through the scheduler and store the result for later identical requests."""
+        stats = CompletionStats()
+        async with self._slot(priority, client_id):
+            content = await self.llm_service.complete(
+                prompt,
+                max_length=max_length,
+                temperature=temperature,
+                affinity_key=affinity_key,
+                document_type=document_type,
+                stats=stats,
+            )
+        await self._set_cached(generation_key, content)
+        return content, stats
+
+    def _document_generator(self, request: GenerationRequest) -> Callable[..., Awaitable[GeneratedDocument]]:
+        """Per-document generation method for the mode of a request."""
+        if request.mode is GenerationMode.SECTIONED:
+            return self._generate_sectioned_document
+        return self._generate_single_document
+
+    def _admission_cost(self, request: Union[GenerationRequest, DocumentUpdateRequest]) -> int:
+        """Upstream calls a request queues at once."""
+        if isinstance(request, DocumentUpdateRequest):
+            # Every document starts with its triage, or with its full generation when the previous one is unknown
+            return len(request.document_types)
+        if self._is_combined(request):
+            return 1
+        if request.mode is GenerationMode.SECTIONED:
+            # The outline comes first, then every section at once
+            return sum(len(DOCUMENT_SECTIONS[doc_type]) for doc_type in request.document_types)
+        return len(request.document_types)
+
+    def _is_combined(self, request: GenerationRequest) -> bool:
+        """Whether a request should be served by a single combined completion."""
+        return request.mode is GenerationMode.COMBINED and len(set(request.document_types)) > 1
+
+    def _get_affinity_key(self, input_text: str, project_name: Optional[str] = None) -> str:
+        """Key that routes a project's requests to the same backend so its prompt cache is reused."""
+        return project_name or hashlib.sha256(input_text.encode("utf-8")).hexdigest()
+
+    def _slot(self, priority: Priority, client_id: Optional[str]) -> contextlib.AbstractAsyncContextManager:
+        """Acquire an upstream slot, or do nothing when no scheduler is configured."""
+        if self.scheduler is None:
+            return contextlib.nullcontext()
+        return self.scheduler.slot(priority, client_id)
+
+    async def _get_cached(self, generation_key: str) -> Optional[str]:
+        """Look up previously generated content."""
+        if self.cache is None:
+            return None
+        return await self.cache.get(generation_key)
+
+    async def _set_cached(self, generation_key: str, content: str) -> None:
+        """Store generated content for later identical requests."""
+        if self.cache is not None:
+            await self.cache.set(generation_key, content)
 
     def _get_max_length_for_type(self, document_type: DocumentType) -> int:
         """Get appropriate max length for document type."""
         length_map = {DocumentType.PRD: 3000, DocumentType.WHAT_IS_THIS: 2500, DocumentType.README: 2000}
         return length_map.get(document_type, 2048)
 
+    def _get_section_max_length(self, document_type: DocumentType) -> int:
+        """Token budget of one section: twice its even share of the document's, so long sections fit."""
+        share = self._get_max_length_for_type(document_type) // len(DOCUMENT_SECTIONS[document_type])
+        return max(MIN_SECTION_TOKENS, 2 * share)
+
     def _get_temperature_for_type(self, document_type: DocumentType) -> float:
         """Get appropriate temperature for document type."""
         temp_map = {
@@ -118,3 +963,30 @@ class DocumentGenerationService:
             DocumentType.README: 0.5,  # Balanced
         }
         return temp_map.get(document_type, 0.7)
+
+
+async def _call(generate: Callable[[], Awaitable[T]]) -> T:
+    return await generate()
+
+
+async def _gather_all(*awaitables: Awaitable[T]) -> List[T]:
+    """Await all of ``awaitables``, cancelling the others as soon as one fails."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _total_stats(calls: List[Optional[CompletionStats]], generation_time: float) -> Optional[CompletionStats]:
+    """Token usage summed over the upstream calls of a document; ``None`` when all were cached."""
+    upstream = [stats for stats in calls if stats is not None]
+    if not upstream:
+        return None
+    return CompletionStats(
+        generation_time=generation_time,
+        prompt_tokens=sum(stats.prompt_tokens or 0 for stats in upstream),
+        completion_tokens=sum(stats.completion_tokens or 0 for stats in upstream),
+    )
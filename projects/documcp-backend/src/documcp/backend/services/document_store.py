@@ -0,0 +1,178 @@
+"""Content-addressed SQLite store for generated documents."""
+
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from documcp.backend.domain.models import DOCUMENT_URI_PREFIX, GeneratedDocument, StoredDocument
+from documcp.backend.settings import DocumentStoreSettings
+
+SUMMARY_CHARS = 280
+
+_COLUMNS = "digest, document_type, project_name, title, summary, size, created_at"
+_HEADING = re.compile(r"^#+\s*(.+?)\s*#*$")
+
+
+def content_digest(content: str) -> str:
+    """Hash the document content; the digest is the document's stable identity."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def digest_from_uri(uri: str) -> Optional[str]:
+    """Extract the digest from a ``documcp://documents/<sha256>`` URI."""
+    if not uri.startswith(DOCUMENT_URI_PREFIX):
+        return None
+    digest = uri[len(DOCUMENT_URI_PREFIX) :]
+    return digest if re.fullmatch(r"[0-9a-f]{64}", digest) else None
+
+
+def summarize(content: str, limit: int = SUMMARY_CHARS) -> Tuple[str, str]:
+    """Return the first heading and the first paragraph of Markdown ``content``."""
+    title = ""
+    paragraph: List[str] = []
+    for line in content.splitlines():
+        line = line.strip()
+        heading = _HEADING.match(line)
+        if heading:
+            if paragraph:
+                break
+            title = title or heading.group(1)
+        elif line:
+            paragraph.append(line)
+        elif paragraph:
+            break
+
+    summary = " ".join(paragraph)
+    if len(summary) > limit:
+        summary = summary[: limit - 1].rsplit(" ", 1)[0] + "…"
+    return title, summary
+
+
+class DocumentStore:
+    """Keep generated documents in a local SQLite file, keyed by the SHA-256 of their content.
+
+    Identical content is stored once; storing it again only refreshes its position in the
+    listing. Once a write goes beyond ``max_documents`` the oldest documents are pruned.
+    """
+
+    def __init__(self, path: str = "./data/documents.db", max_documents: int = 1000):
+        self.path = path
+        self.max_documents = max_documents
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS documents "
+                "(digest TEXT PRIMARY KEY, document_type TEXT NOT NULL, project_name TEXT, title TEXT NOT NULL, "
+                "summary TEXT NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL, content TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_documents_created_at ON documents (created_at)")
+            # Stored documents; storing the same content again overcounts it until the next exact count
+            (self._documents,) = self._db.execute("SELECT COUNT(*) FROM documents").fetchone()
+
+    @classmethod
+    def from_settings(cls, settings: DocumentStoreSettings) -> "DocumentStore":
+        """Create a document store from application settings."""
+        return cls(path=settings.path, max_documents=settings.max_documents)
+
+    async def put(self, document: GeneratedDocument) -> StoredDocument:
+        """Store a generated document and return its stored description."""
+        title, summary = summarize(document.content)
+        stored = StoredDocument(
+            digest=content_digest(document.content),
+            document_type=document.document_type,
+            project_name=document.metadata.get("project_name"),
+            title=title or document.document_type.value.replace("_", " ").title(),
+            summary=summary,
+            size=len(document.content),
+            created_at=time.time(),
+        )
+        await asyncio.to_thread(self._put, stored, document.content)
+        return stored
+
+    async def get(self, digest: str) -> Optional[StoredDocument]:
+        """Load a document's description by digest."""
+        return await asyncio.to_thread(self._get, digest)
+
+    async def get_content(self, digest: str) -> Optional[str]:
+        """Load a document's content by digest."""
+        return await asyncio.to_thread(self._get_content, digest)
+
+    async def list(self, limit: Optional[int] = None) -> List[StoredDocument]:
+        """List stored documents, newest first."""
+        return await asyncio.to_thread(self._list, limit if limit is not None else self.max_documents)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the number of stored documents."""
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM documents").fetchone()
+        return {"documents": count, "max_documents": self.max_documents}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+    def _put(self, stored: StoredDocument, content: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                f"INSERT INTO documents ({_COLUMNS}, content) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (digest) DO UPDATE SET created_at = excluded.created_at",
+                (*self._row(stored), content),
+            )
+            self._documents += 1
+            if self._documents > self.max_documents:
+                self._prune()
+
+    def _prune(self) -> None:
+        """Delete the oldest documents beyond ``max_documents``, finding the cut-off through the index."""
+        (self._documents,) = self._db.execute("SELECT COUNT(*) FROM documents").fetchone()
+        if self._documents <= self.max_documents:
+            return
+        row = self._db.execute(
+            "SELECT created_at FROM documents ORDER BY created_at DESC LIMIT 1 OFFSET ?", (self.max_documents,)
+        ).fetchone()
+        if row is not None:
+            self._documents -= self._db.execute("DELETE FROM documents WHERE created_at <= ?", row).rowcount
+
+    def _get(self, digest: str) -> Optional[StoredDocument]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM documents WHERE digest = ?", (digest,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def _get_content(self, digest: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT content FROM documents WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def _list(self, limit: int) -> List[StoredDocument]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM documents ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    @staticmethod
+    def _row(stored: StoredDocument) -> Tuple[Any, ...]:
+        return (
+            stored.digest,
+            stored.document_type.value,
+            stored.project_name,
+            stored.title,
+            stored.summary,
+            stored.size,
+            stored.created_at,
+        )
+
+    @staticmethod
+    def _from_row(row: Tuple[Any, ...]) -> StoredDocument:
+        return StoredDocument(**dict(zip(_COLUMNS.split(", "), row)))
@@ -0,0 +1,91 @@
+"""Hedging policy for upstream LLM completions."""
+
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from documcp.backend.settings import HedgingSettings
+
+# Hedges that may be sent back to back after a quiet period
+MAX_BURST = 3.0
+
+
+class HedgePolicy:
+    """Decide when a completion that has not produced its first token gets a duplicate request.
+
+    The delay is the ``percentile`` of the last ``window`` times to first token, so only
+    completions slower than almost all recent ones are hedged. Every completion earns
+    ``max_fraction`` of a hedge and every hedge spends a whole one, so at most that share
+    of completions is duplicated in the long run, with bursts of up to ``MAX_BURST``.
+    """
+
+    def __init__(self, percentile: float = 95.0, max_fraction: float = 0.05, min_samples: int = 20, window: int = 200):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        self.percentile = percentile
+        self.max_fraction = max_fraction
+        self.min_samples = min_samples
+        self.requests = 0
+        self.hedged = 0
+        self.won = 0
+        self.over_budget = 0
+        self.no_slot = 0
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._budget = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: HedgingSettings) -> Optional["HedgePolicy"]:
+        """Create a policy from application settings, or ``None`` when hedging is disabled."""
+        if not settings.enable:
+            return None
+        return cls(
+            percentile=settings.percentile,
+            max_fraction=settings.max_fraction,
+            min_samples=settings.min_samples,
+            window=settings.window,
+        )
+
+    def delay(self) -> Optional[float]:
+        """Count a new completion and return how long its first token may take before hedging.
+
+        ``None`` until ``min_samples`` times to first token have been observed.
+        """
+        self.requests += 1
+        self._budget = min(MAX_BURST, self._budget + self.max_fraction)
+        return self._threshold()
+
+    def try_hedge(self) -> bool:
+        """Spend the budget for one hedge, or tell that it is exhausted."""
+        if self._budget < 1.0:
+            self.over_budget += 1
+            return False
+        self._budget -= 1.0
+        self.hedged += 1
+        return True
+
+    def skip(self) -> None:
+        """Count a hedge left out because no scheduler slot was free; the budget is kept."""
+        self.no_slot += 1
+
+    def observe(self, time_to_first_token: float, hedge_won: bool = False) -> None:
+        """Record the first token of a completion, as seen by its caller."""
+        self._samples.append(time_to_first_token)
+        if hedge_won:
+            self.won += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging counters and the current delay."""
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedges_won": self.won,
+            "over_budget": self.over_budget,
+            "no_slot": self.no_slot,
+            "samples": len(self._samples),
+            "delay": self._threshold(),
+        }
+
+    def _threshold(self) -> Optional[float]:
+        if len(self._samples) < max(1, self.min_samples):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))]
@@ -0,0 +1,294 @@
+"""Generation history on the shared SQLAlchemy kernel."""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import Boolean, Float, Index, Integer, String, Text, column, func, insert, literal_column, select, table
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Mapped, mapped_column
+
+from documcp.backend.domain.models import DocumentType, GenerationRecord, GenerationSummary
+from documcp.backend.settings import HistorySettings
+from documcp.shared_kernel.infra.database.sqla.base import Base
+from documcp.shared_kernel.infra.database.sqla.write_behind import WriteBehindBuffer
+from documcp.shared_kernel.infra.fastapi.dtos.request import CursorPageable
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_SORT = "generated_at:desc"
+# Listings show the start of each document, searches the best-matching passage
+PREVIEW_CHARS = 200
+SNIPPET_TOKENS = 24
+
+# SQLite FTS5 index over the content of generation_records. It stores no copy of the
+# documents (external content), and triggers keep it in step with every insert and delete.
+FTS_TABLE = "generation_records_fts"
+FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        content, content='generation_records', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS generation_records_fts_insert AFTER INSERT ON generation_records BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS generation_records_fts_delete AFTER DELETE ON generation_records BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+]
+
+
+class SearchUnavailableError(RuntimeError):
+    """Raised when the history database has no full-text index."""
+
+
+class GenerationRecordTable(Base):
+    """One row per generated document."""
+
+    __tablename__ = "generation_records"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    document_type: Mapped[str] = mapped_column(String(32))
+    content: Mapped[str] = mapped_column(Text)
+    input_hash: Mapped[str] = mapped_column(String(64))
+    project_name: Mapped[Optional[str]] = mapped_column(String(255))
+    model: Mapped[str] = mapped_column(String(255))
+    temperature: Mapped[Optional[float]] = mapped_column(Float)
+    max_tokens: Mapped[Optional[int]] = mapped_column(Integer)
+    input_length: Mapped[int] = mapped_column(Integer)
+    output_length: Mapped[int] = mapped_column(Integer)
+    cached: Mapped[bool] = mapped_column(Boolean, default=False)
+    coalesced: Mapped[bool] = mapped_column(Boolean, default=False)
+    combined: Mapped[bool] = mapped_column(Boolean, default=False)
+    upstream_time: Mapped[Optional[float]] = mapped_column(Float)
+    time_to_first_token: Mapped[Optional[float]] = mapped_column(Float)
+    prompt_tokens: Mapped[Optional[int]] = mapped_column(Integer)
+    completion_tokens: Mapped[Optional[int]] = mapped_column(Integer)
+    generated_at: Mapped[float] = mapped_column(Float)
+
+    __table_args__ = (
+        # Keyset pagination over all records or one document type
+        Index("ix_generation_records_generated_at", "generated_at"),
+        Index("ix_generation_records_document_type_generated_at", "document_type", "generated_at"),
+        # "Latest document for this input (and type)" is one index seek from the newest end
+        Index("ix_generation_records_input_hash_generated_at", "input_hash", "generated_at"),
+        Index(
+            "ix_generation_records_input_hash_document_type_generated_at",
+            "input_hash",
+            "document_type",
+            "generated_at",
+        ),
+    )
+
+
+_FIELDS = [column.name for column in GenerationRecordTable.__table__.columns]
+
+
+def fts_query(query_text: str) -> str:
+    """Turn free text into an FTS5 query matching every word, so user input is never parsed as FTS5 syntax."""
+    words = re.findall(r"\w+", query_text)
+    if not words:
+        raise ValueError("Search query contains no words")
+    return " ".join(f'"{word}"' for word in words)
+
+
+def _summary_query(snippet: Any) -> Any:
+    table = GenerationRecordTable
+    return select(
+        table.id,
+        table.document_type,
+        table.project_name,
+        table.model,
+        table.output_length,
+        table.generated_at,
+        snippet.label("snippet"),
+    )
+
+
+def _filter(query: Any, document_type: Optional[DocumentType], project_name: Optional[str]) -> Any:
+    if document_type is not None:
+        query = query.where(GenerationRecordTable.document_type == document_type.value)
+    if project_name is not None:
+        query = query.where(GenerationRecordTable.project_name == project_name)
+    return query
+
+
+def _to_record(row: GenerationRecordTable) -> GenerationRecord:
+    return GenerationRecord(**{field: getattr(row, field) for field in _FIELDS})
+
+
+def _to_summary(row: Any, preview: bool) -> GenerationSummary:
+    summary = GenerationSummary(**row._mapping)
+    if preview and row.output_length > PREVIEW_CHARS:
+        summary.snippet += "…"
+    return summary
+
+
+class GenerationHistoryRepository:
+    """Read and write generation records."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+        self.full_text = False
+
+    async def create_schema(self) -> None:
+        """Create the history table, its indexes and, on SQLite, the full-text index."""
+        async with self.session_factory() as session, session.begin():
+            await session.run_sync(lambda sync_session: self._create_schema(sync_session.connection()))
+
+    def _create_schema(self, connection: Any) -> None:
+        table = GenerationRecordTable.__table__
+        Base.metadata.create_all(connection, tables=[table])
+        # create_all skips the indexes of existing tables, including those added since they were created
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+        self.full_text = connection.dialect.name == "sqlite"
+        if not self.full_text:
+            return
+        indexed = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).first()
+        for statement in FTS_SCHEMA:
+            connection.exec_driver_sql(statement)
+        if not indexed:
+            # Index the records written before the full-text index existed
+            connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    async def add_many(self, records: List[GenerationRecord]) -> None:
+        """Insert records in one batched statement."""
+        rows = [record.model_dump(mode="json", exclude={"id"}) for record in records]
+        async with self.session_factory() as session, session.begin():
+            await session.execute(insert(GenerationRecordTable), rows)
+
+    async def latest_for_input(
+        self, input_hash: str, document_type: Optional[DocumentType] = None
+    ) -> Optional[GenerationRecord]:
+        """Return the most recent record generated from ``input_hash``, optionally of one document type."""
+        query = select(GenerationRecordTable).where(GenerationRecordTable.input_hash == input_hash)
+        if document_type is not None:
+            query = query.where(GenerationRecordTable.document_type == document_type.value)
+        query = query.order_by(GenerationRecordTable.generated_at.desc()).limit(1)
+
+        async with self.session_factory() as session:
+            row = (await session.execute(query)).scalar_one_or_none()
+        return _to_record(row) if row else None
+
+    async def get(self, record_id: int) -> Optional[GenerationRecord]:
+        """Return a record with its full content."""
+        async with self.session_factory() as session:
+            row = await session.get(GenerationRecordTable, record_id)
+        return _to_record(row) if row else None
+
+    async def list(
+        self,
+        pageable: CursorPageable,
+        document_type: Optional[DocumentType] = None,
+        project_name: Optional[str] = None,
+    ) -> Tuple[List[GenerationSummary], Optional[str]]:
+        """Return one page of records, each with the start of its content, and the next page's cursor."""
+        snippet = func.substr(GenerationRecordTable.content, 1, PREVIEW_CHARS)
+        query = _filter(_summary_query(snippet), document_type, project_name)
+        return await self._page(query, pageable, preview=True)
+
+    async def search(
+        self,
+        query_text: str,
+        pageable: CursorPageable,
+        document_type: Optional[DocumentType] = None,
+        project_name: Optional[str] = None,
+    ) -> Tuple[List[GenerationSummary], Optional[str]]:
+        """Return one page of records containing every word of ``query_text``, with a highlighted snippet."""
+        if not self.full_text:
+            raise SearchUnavailableError("Full-text search requires a SQLite history database")
+
+        fts = literal_column(FTS_TABLE)
+        fts_rows = table(FTS_TABLE, column("rowid"))
+        snippet = func.snippet(fts, 0, "**", "**", "…", SNIPPET_TOKENS)
+        query = (
+            _summary_query(snippet)
+            .join(fts_rows, fts_rows.c.rowid == GenerationRecordTable.id)
+            .where(fts.op("MATCH")(fts_query(query_text)))
+        )
+        return await self._page(_filter(query, document_type, project_name), pageable, preview=False)
+
+    async def _page(
+        self, query: Any, pageable: CursorPageable, preview: bool
+    ) -> Tuple[List[GenerationSummary], Optional[str]]:
+        sortable = {"generated_at": GenerationRecordTable.generated_at, "id": GenerationRecordTable.id}
+        query = pageable.seek(query, sortable, GenerationRecordTable.id, DEFAULT_SORT)
+        field, _ = pageable.sort_key(DEFAULT_SORT)
+
+        async with self.session_factory() as session:
+            rows = (await session.execute(query)).all()
+
+        summaries = [_to_summary(row, preview) for row in rows]
+        return pageable.collect(summaries, lambda summary: (getattr(summary, field), summary.id), DEFAULT_SORT)
+
+
+class GenerationRecorder:
+    """Record generated documents through a write-behind buffer.
+
+    ``record`` only appends to memory, so generation never waits for the database;
+    records are batch-inserted by a background task.
+    """
+
+    def __init__(
+        self,
+        repository: GenerationHistoryRepository,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_pending: int = 10_000,
+    ):
+        self.repository = repository
+        self.buffer: WriteBehindBuffer[GenerationRecord] = WriteBehindBuffer(
+            repository.add_many, batch_size=batch_size, flush_interval=flush_interval, max_pending=max_pending
+        )
+
+    @classmethod
+    def from_settings(cls, settings: HistorySettings, repository: GenerationHistoryRepository) -> "GenerationRecorder":
+        """Create a recorder from application settings."""
+        return cls(
+            repository,
+            batch_size=settings.batch_size,
+            flush_interval=settings.flush_interval,
+            max_pending=settings.max_pending,
+        )
+
+    def record(self, record: GenerationRecord) -> None:
+        """Queue a record for the next batch."""
+        self.buffer.offer(record)
+
+    def start(self) -> None:
+        """Start writing batches in the background."""
+        self.buffer.start()
+
+    async def stop(self) -> None:
+        """Stop the background writer after writing pending records."""
+        await self.buffer.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write-behind counters."""
+        return self.buffer.get_stats()
+
+
+async def open_recorder(
+    settings: HistorySettings, session_factory: async_sessionmaker[AsyncSession]
+) -> Optional[GenerationRecorder]:
+    """Create the schema and start a recorder, or return ``None`` when history is disabled.
+
+    History is not needed to generate documents, so an unusable database only disables it.
+    """
+    if not settings.enable:
+        return None
+
+    repository = GenerationHistoryRepository(session_factory)
+    try:
+        await repository.create_schema()
+    except (SQLAlchemyError, OSError) as e:
+        logger.warning("Generation history disabled, database unavailable", error=str(e))
+        return None
+
+    recorder = GenerationRecorder.from_settings(settings, repository)
+    recorder.start()
+    return recorder
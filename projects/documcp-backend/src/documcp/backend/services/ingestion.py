@@ -0,0 +1,230 @@
+"""Map-reduce ingestion of project descriptions that do not fit the model's context window."""
+
+import asyncio
+import contextlib
+import hashlib
+import math
+import re
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from documcp.backend.services.cache import GenerationCache, make_generation_key
+from documcp.backend.services.llm_service import LMStudioService
+from documcp.backend.services.scheduler import GenerationScheduler, Priority
+from documcp.backend.services.single_flight import SingleFlight, generation_flights
+from documcp.backend.settings import IngestionSettings
+
+logger = structlog.get_logger(__name__)
+
+SUMMARY_TEMPERATURE = 0.2
+# Summaries of summaries are allowed this many times before the reduced text is used as is
+MAX_REDUCE_ROUNDS = 3
+# On average one paragraph in BOUNDARY_RATIO may end a chunk once the chunk is large enough
+BOUNDARY_RATIO = 4
+
+PARAGRAPH_SEPARATOR = re.compile(r"\n\s*\n")
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Cheap token estimate that does not depend on the model's tokenizer."""
+    return math.ceil(len(text) / chars_per_token)
+
+
+def split_into_chunks(text: str, max_chars: int, min_chars: Optional[int] = None) -> List[str]:
+    """Split text on paragraph boundaries into chunks of at most ``max_chars``.
+
+    Chunk ends are content-defined: once a chunk holds ``min_chars`` it closes after
+    a paragraph whose hash marks a boundary. An edit therefore only moves the ends of
+    the chunk it falls in, and the following chunks line up with the previous run
+    again, so their cached summaries are reused.
+    """
+    min_chars = max_chars // 2 if min_chars is None else min_chars
+
+    pieces: List[str] = []
+    for paragraph in PARAGRAPH_SEPARATOR.split(text):
+        paragraph = paragraph.strip()
+        # Paragraphs larger than a chunk are cut into fixed-size pieces
+        pieces.extend(paragraph[i : i + max_chars] for i in range(0, len(paragraph), max_chars))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        if current and size + len(piece) > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+
+        current.append(piece)
+        size += len(piece) + 2
+        if size >= min_chars and _is_boundary(piece):
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+class InputReducer:
+    """Reduce oversized inputs to a context that fits next to the generation prompt.
+
+    Inputs within the token budget pass through untouched. Larger inputs are split
+    into chunks that are summarized in parallel (bounded by ``max_concurrency``) and
+    the summaries are joined, repeating if the result is still too large. Each chunk
+    summary is cached by the hash of its prompt, so re-running an edited spec only
+    summarizes the chunks that changed.
+    """
+
+    def __init__(
+        self,
+        llm_service: LMStudioService,
+        cache: Optional[GenerationCache] = None,
+        inflight: Optional[SingleFlight] = None,
+        scheduler: Optional[GenerationScheduler] = None,
+        context_window: int = 8192,
+        reserved_tokens: int = 3584,
+        chunk_tokens: int = 1536,
+        summary_tokens: int = 384,
+        chars_per_token: float = 4.0,
+        max_concurrency: int = 2,
+    ):
+        if context_window - reserved_tokens < summary_tokens:
+            raise ValueError("context_window leaves no room for the input after reserved_tokens")
+
+        self.llm_service = llm_service
+        self.cache = cache
+        self.inflight = inflight if inflight is not None else generation_flights
+        self.scheduler = scheduler
+        self.context_window = context_window
+        self.reserved_tokens = reserved_tokens
+        self.chunk_tokens = min(chunk_tokens, context_window - reserved_tokens)
+        self.summary_tokens = summary_tokens
+        self.chars_per_token = chars_per_token
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.reduced_inputs = 0
+        self.chunks_summarized = 0
+        self.chunk_cache_hits = 0
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: IngestionSettings,
+        llm_service: LMStudioService,
+        cache: Optional[GenerationCache] = None,
+        scheduler: Optional[GenerationScheduler] = None,
+    ) -> "InputReducer":
+        """Create a reducer from application settings."""
+        return cls(
+            llm_service,
+            cache=cache,
+            scheduler=scheduler,
+            context_window=settings.context_window,
+            reserved_tokens=settings.reserved_tokens,
+            chunk_tokens=settings.chunk_tokens,
+            summary_tokens=settings.summary_tokens,
+            chars_per_token=settings.chars_per_token,
+            max_concurrency=settings.max_concurrency,
+        )
+
+    @property
+    def input_budget(self) -> int:
+        """Tokens left for the project description once instructions and output are reserved."""
+        return self.context_window - self.reserved_tokens
+
+    def needs_reduction(self, input_text: str) -> bool:
+        return estimate_tokens(input_text, self.chars_per_token) > self.input_budget
+
+    async def reduce(
+        self,
+        input_text: str,
+        project_name: Optional[str] = None,
+        priority: Priority = Priority.BULK,
+        client_id: Optional[str] = None,
+    ) -> str:
+        """Return ``input_text`` or a summarized version of it that fits the input budget."""
+        text = input_text
+        rounds = 0
+
+        while self.needs_reduction(text) and rounds < MAX_REDUCE_ROUNDS:
+            chunks = split_into_chunks(text, math.floor(self.chunk_tokens * self.chars_per_token))
+            summaries = await asyncio.gather(
+                *(self._summarize(chunk, project_name, priority=priority, client_id=client_id) for chunk in chunks)
+            )
+            text = "\n\n".join(summaries)
+            rounds += 1
+
+            logger.info(
+                "Reduced project description",
+                round=rounds,
+                chunks=len(chunks),
+                estimated_tokens=estimate_tokens(text, self.chars_per_token),
+                input_budget=self.input_budget,
+            )
+
+        if rounds:
+            self.reduced_inputs += 1
+        return text
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get ingestion statistics."""
+        return {
+            "context_window": self.context_window,
+            "input_budget": self.input_budget,
+            "reduced_inputs": self.reduced_inputs,
+            "chunks_summarized": self.chunks_summarized,
+            "chunk_cache_hits": self.chunk_cache_hits,
+        }
+
+    async def _summarize(
+        self,
+        chunk: str,
+        project_name: Optional[str] = None,
+        priority: Priority = Priority.BULK,
+        client_id: Optional[str] = None,
+    ) -> str:
+        """Summarize one chunk, reusing a cached summary of identical content."""
+        prompt = self._get_summary_prompt(chunk, project_name)
+        summary_key = make_generation_key(prompt, self.llm_service.model_name, SUMMARY_TEMPERATURE, self.summary_tokens)
+
+        if self.cache is not None:
+            summary = await self.cache.get(summary_key)
+            if summary is not None:
+                self.chunk_cache_hits += 1
+                return summary
+
+        summary, _ = await self.inflight.do(
+            summary_key, lambda: self._complete_and_cache(summary_key, prompt, priority, client_id)
+        )
+        return summary
+
+    async def _complete_and_cache(
+        self, summary_key: str, prompt: str, priority: Priority, client_id: Optional[str]
+    ) -> str:
+        slot = self.scheduler.slot(priority, client_id) if self.scheduler is not None else contextlib.nullcontext()
+        async with self._semaphore, slot:
+            summary = await self.llm_service.complete(
+                prompt, max_length=self.summary_tokens, temperature=SUMMARY_TEMPERATURE, document_type="summary"
+            )
+
+        self.chunks_summarized += 1
+        if self.cache is not None:
+            await self.cache.set(summary_key, summary)
+        return summary
+
+    def _get_summary_prompt(self, chunk: str, project_name: Optional[str] = None) -> str:
+        """Generate the prompt summarizing one part of a project description."""
+        project_context = f" of project '{project_name}'" if project_name else ""
+
+        return f"""Summarize the following part of a project description{project_context}. Keep every requirement, feature, constraint, technology, name and number; drop repetition and prose.
+
+Text:
+{chunk}
+
+Write the summary as concise Markdown bullet points.
+
+Summary:"""
+
+
+def _is_boundary(paragraph: str) -> bool:
+    return hashlib.blake2b(paragraph.encode("utf-8"), digest_size=1).digest()[0] % BOUNDARY_RATIO == 0
@@ -0,0 +1,154 @@
+"""Asynchronous generation jobs executed by a background worker pool."""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import structlog
+from nanoid import generate
+
+from documcp.backend.domain.models import DocumentType, GenerationRequest, Job, JobDocument, JobStatus
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.job_store import JobStore
+from documcp.backend.services.readiness import ServiceReadiness
+
+logger = structlog.get_logger(__name__)
+
+
+class JobService:
+    """Queue generation requests as jobs and run them in the background.
+
+    Jobs are persisted before they are queued, and every document status change
+    is written back, so clients can poll partial results and a restart resumes
+    any queued or interrupted work.
+    """
+
+    def __init__(
+        self,
+        document_service: DocumentGenerationService,
+        store: JobStore,
+        workers: int = 2,
+        readiness: Optional[ServiceReadiness] = None,
+    ):
+        self.document_service = document_service
+        self.store = store
+        self.workers = workers
+        self.readiness = readiness
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Requeue unfinished jobs and start the worker pool."""
+        for job in await self.store.list_unfinished():
+            for entry in job.documents:
+                if entry.status is JobStatus.RUNNING:
+                    entry.status = JobStatus.QUEUED
+            job.status = JobStatus.QUEUED
+            await self.store.save(job)
+            self._queue.put_nowait(job.job_id)
+
+        if not self._queue.empty():
+            logger.info("Resuming unfinished jobs", count=self._queue.qsize())
+
+        self._tasks = [asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the worker pool; interrupted jobs resume on the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.store.close()
+
+    async def submit(self, request: GenerationRequest, client_id: Optional[str] = None) -> Job:
+        """Persist a new job and queue it for execution."""
+        now = time.time()
+        job = Job(
+            job_id=generate(),
+            request=request,
+            client_id=client_id,
+            documents=[JobDocument(document_type=doc_type) for doc_type in request.document_types],
+            created_at=now,
+            updated_at=now,
+        )
+        await self.store.save(job)
+        self._queue.put_nowait(job.job_id)
+
+        logger.info("Job queued", job_id=job.job_id, queue_size=self._queue.qsize())
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Get the latest persisted state of a job."""
+        return await self.store.get(job_id)
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            if self.readiness is not None:
+                # Keep jobs queued until LM Studio is reachable instead of failing them
+                await self.readiness.wait()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error("Job failed unexpectedly", job_id=job_id, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await self.store.get(job_id)
+        if job is None or job.status in (JobStatus.COMPLETED, JobStatus.FAILED):
+            return
+
+        start_time = time.time()
+        job.status = JobStatus.RUNNING
+        await self._save(job)
+
+        pending = [entry for entry in job.documents if entry.status is not JobStatus.COMPLETED]
+        await self._run_documents(job, pending)
+
+        completed = any(entry.status is JobStatus.COMPLETED for entry in job.documents)
+        job.status = JobStatus.COMPLETED if completed else JobStatus.FAILED
+        job.generation_time = time.time() - start_time
+        await self._save(job)
+
+        logger.info("Job finished", job_id=job.job_id, status=job.status.value, generation_time=job.generation_time)
+
+    async def _run_documents(self, job: Job, pending: List[JobDocument]) -> None:
+        """Generate the pending documents of a job as one request, so its mode and input reduction apply once."""
+        entries: Dict[DocumentType, List[JobDocument]] = {}
+        for entry in pending:
+            entry.status = JobStatus.RUNNING
+            entries.setdefault(entry.document_type, []).append(entry)
+        await self._save(job)
+
+        request = job.request.model_copy(update={"document_types": [entry.document_type for entry in pending]})
+        try:
+            # Jobs are already accepted, so a full scheduler queue delays them instead of failing them
+            async for document in self.document_service.iter_documents(
+                request, client_id=job.client_id, wait_for_queue=True
+            ):
+                entry = entries[document.document_type].pop(0)
+                if document.metadata.get("error"):
+                    logger.error("Job document failed", job_id=job.job_id, document_type=entry.document_type.value)
+                    entry.status = JobStatus.FAILED
+                    entry.error = document.metadata["error_message"]
+                else:
+                    entry.document = document
+                    entry.status = JobStatus.COMPLETED
+                    entry.error = None
+                await self._save(job)
+        except Exception as e:
+            logger.error("Job documents failed", job_id=job.job_id, error=str(e))
+            for entry in pending:
+                if entry.status is JobStatus.RUNNING:
+                    entry.status = JobStatus.FAILED
+                    entry.error = str(e)
+            await self._save(job)
+
+    async def _save(self, job: Job) -> None:
+        job.updated_at = time.time()
+        await self.store.save(job)
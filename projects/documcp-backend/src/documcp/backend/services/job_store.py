@@ -0,0 +1,83 @@
+"""SQLite persistence for generation jobs."""
+
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Set, Tuple, TypeVar
+
+from documcp.backend.domain.models import Job, JobStatus
+
+T = TypeVar("T")
+
+
+class JobStore:
+    """Persist jobs to a local SQLite file so queued work survives restarts."""
+
+    def __init__(self, path: str = "./data/jobs.db"):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._write_lock = asyncio.Lock()
+        # SQLite calls running in worker threads, awaited by ``close``
+        self._in_flight: Set[asyncio.Future] = set()
+
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs "
+                "(id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_created_at ON jobs (status, created_at)")
+
+    async def save(self, job: Job) -> None:
+        """Insert or update a job."""
+        # Serialize on the event loop so the snapshot is consistent while workers keep updating the job
+        row = (job.job_id, job.status.value, job.model_dump_json(), job.created_at, job.updated_at)
+        async with self._write_lock:
+            await self._in_thread(self._save, row)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Load a job by id."""
+        return await self._in_thread(self._get, job_id)
+
+    async def list_unfinished(self) -> List[Job]:
+        """Load queued and running jobs in creation order."""
+        return await self._in_thread(self._list_unfinished)
+
+    async def close(self) -> None:
+        """Close the database connection once the calls already running in threads are done."""
+        while self._in_flight:
+            await asyncio.wait(set(self._in_flight))
+        with self._lock:
+            self._db.close()
+
+    async def _in_thread(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a SQLite call in a worker thread, tracked until it finishes even if the caller is cancelled."""
+        future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        self._in_flight.add(future)
+        future.add_done_callback(self._in_flight.discard)
+        return await asyncio.shield(future)
+
+    def _save(self, row: Tuple[str, str, str, float, float]) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                row,
+            )
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.model_validate_json(row[0]) if row else None
+
+    def _list_unfinished(self) -> List[Job]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT payload FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+            ).fetchall()
+        return [Job.model_validate_json(row[0]) for row in rows]
@@ -1,57 +1,181 @@
 """LLM service for document generation using LM Studio."""
 
+import asyncio
+import contextlib
+import json
+import re
 import time
-from typing import Dict, Optional
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 import httpx
 import structlog
 
 from documcp.backend.domain.models import DocumentType
+from documcp.backend.services.backend_pool import BackendPool, LLMBackend
+from documcp.backend.services.hedging import HedgePolicy
+from documcp.backend.services.metrics import GenerationMetrics
+from documcp.backend.services.scheduler import GenerationScheduler
+from documcp.backend.settings import LMStudioSettings
+from documcp.backend.tracing import SPAN_KIND_CLIENT, tracer, upstream_headers
 
 logger = structlog.get_logger(__name__)
 
+# Errors that mean the backend is unreachable rather than slow, so another backend may serve the request
+FAILOVER_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError, httpx.ReadError)
+
+# Sent as the system message of every completion; keep it constant so it stays part of the cached prefix
+SYSTEM_PROMPT = (
+    "You are DocuMCP, an experienced product manager and technical writer. "
+    "You turn project descriptions into clear, well-structured Markdown documentation."
+)
+
+DOCUMENT_LABELS = {
+    DocumentType.PRD: "PRD",
+    DocumentType.WHAT_IS_THIS: "What is this",
+    DocumentType.README: "README",
+}
+
+# Sections each document is asked for, in order; a parenthetical only guides the model
+DOCUMENT_SECTIONS = {
+    DocumentType.PRD: [
+        "Overview",
+        "Goals & Objectives",
+        "System Context",
+        "Functional Requirements",
+        "Non-Functional Requirements",
+        "Deployment",
+        "Extensibility",
+        "Risks & Mitigation",
+    ],
+    DocumentType.WHAT_IS_THIS: [
+        "Vision (what this project aims to achieve)",
+        "Core Value (why it matters, what problems it solves)",
+        "Key Features (main capabilities)",
+        "Target Users (who will use this)",
+        "Tech Snapshot (high-level technical overview)",
+        "Roadmap (future plans)",
+        "Success Metrics",
+    ],
+    DocumentType.README: [
+        "Project title and brief description",
+        "Features",
+        "Installation instructions",
+        "Usage examples",
+        "API documentation (if applicable)",
+        "Configuration",
+        "Development setup",
+        "Contributing guidelines",
+        "License",
+    ],
+}
+
+DELIMITER_PATTERN = re.compile(r"^[ \t]*===\s*DOCUMENT:\s*(\w+)\s*===[ \t]*$", re.MULTILINE | re.IGNORECASE)
+
+
+def document_delimiter(document_type: DocumentType) -> str:
+    """Line that starts a document inside a combined completion."""
+    return f"===DOCUMENT: {document_type.value}==="
+
+
+@dataclass(kw_only=True)
+class CompletionStats:
+    """Timings and token usage of one upstream completion, filled in when it succeeds."""
+
+    backend: Optional[str] = None
+    generation_time: Optional[float] = None
+    time_to_first_token: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
 
 class LMStudioService:
     """Service for handling LLM operations with LM Studio."""
 
-    def __init__(self, base_url: str = "http://localhost:1234", model_name: str = "local-model"):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:1234",
+        model_name: str = "local-model",
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 300.0,
+        base_urls: Optional[List[str]] = None,
+        health_check_interval: float = 15.0,
+        metrics: Optional[GenerationMetrics] = None,
+        hedging: Optional[HedgePolicy] = None,
+        scheduler: Optional[GenerationScheduler] = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.model_name = model_name
-        self.client = httpx.AsyncClient(timeout=300.0)  # 5 minute timeout
+        # Prefer the container-managed client so connections are pooled and closed on shutdown
+        self._owns_client = client is None
+        self.client = client if client is not None else httpx.AsyncClient(timeout=timeout)
+        self.pool = BackendPool(base_urls or [self.base_url], self.client, health_check_interval=health_check_interval)
+        self.metrics = metrics
+        # Duplicates completions whose first token is late; completions are then always streamed upstream
+        self.hedging = hedging
+        # Hedges need a free slot of their own, so they never exceed the scheduler's concurrency cap
+        self.scheduler = scheduler
         self._model_loaded = False
 
+    @classmethod
+    def from_settings(
+        cls,
+        settings: LMStudioSettings,
+        client: Optional[httpx.AsyncClient] = None,
+        metrics: Optional[GenerationMetrics] = None,
+        scheduler: Optional[GenerationScheduler] = None,
+    ) -> "LMStudioService":
+        """Create a service from application settings; ``scheduler`` is the one its callers take slots from."""
+        return cls(
+            base_url=settings.base_url,
+            model_name=settings.model_name,
+            client=client,
+            timeout=settings.timeout,
+            base_urls=settings.base_urls,
+            health_check_interval=settings.health_check_interval,
+            metrics=metrics,
+            hedging=HedgePolicy.from_settings(settings.hedging),
+            scheduler=scheduler,
+        )
+
+    async def aclose(self) -> None:
+        """Stop health checks and close the HTTP client if this service created it."""
+        await self.pool.stop()
+        if self._owns_client:
+            await self.client.aclose()
+
     async def initialize(self) -> None:
         """Initialize connection to LM Studio."""
-        logger.info("Initializing LM Studio connection", base_url=self.base_url)
+        logger.info("Initializing LM Studio connection", base_urls=self.pool.base_urls)
 
         try:
-            # Test connection to LM Studio
-            response = await self.client.get(f"{self.base_url}/v1/models")
-
-            if response.status_code == 200:
-                models_data = response.json()
-                available_models = [model["id"] for model in models_data.get("data", [])]
+            # Test connection to every configured LM Studio backend
+            await self.pool.start()
+            available_models = self.pool.available_models()
 
-                if available_models:
-                    # Use the first available model if our default isn't found
-                    if self.model_name not in available_models:
-                        self.model_name = available_models[0]
-                        logger.info("Using available model", model_name=self.model_name)
+            if available_models:
+                # Use the first available model if our default isn't found
+                if self.model_name not in available_models:
+                    self.model_name = available_models[0]
+                    logger.info("Using available model", model_name=self.model_name)
 
-                    self._model_loaded = True
-                    logger.info("LM Studio connection established", available_models=available_models)
-                else:
-                    logger.error("No models loaded in LM Studio")
-                    raise RuntimeError("No models loaded in LM Studio")
+                self._model_loaded = True
+                logger.info(
+                    "LM Studio connection established",
+                    available_models=available_models,
+                    healthy_backends=[backend.base_url for backend in self.pool.healthy_backends()],
+                )
+            elif any(backend.last_error == "No models loaded" for backend in self.pool.backends):
+                logger.error("No models loaded in LM Studio")
+                raise RuntimeError("No models loaded in LM Studio")
             else:
-                logger.error("Failed to connect to LM Studio", status_code=response.status_code)
-                raise RuntimeError(f"Failed to connect to LM Studio: {response.status_code}")
+                urls = ", ".join(self.pool.base_urls)
+                logger.error("Cannot connect to LM Studio. Make sure LM Studio is running on", url=urls)
+                raise RuntimeError(f"Cannot connect to LM Studio at {urls}")
 
-        except httpx.ConnectError:
-            logger.error("Cannot connect to LM Studio. Make sure LM Studio is running on", url=self.base_url)
-            raise RuntimeError(f"Cannot connect to LM Studio at {self.base_url}")
         except Exception as e:
             logger.error("Failed to initialize LM Studio connection", error=str(e))
+            await self.pool.stop()
             raise
 
     @property
@@ -66,89 +190,203 @@ class LMStudioService:
             "loaded": str(self.is_loaded),
             "service": "LM Studio",
             "base_url": self.base_url,
+            "backends": ",".join(self.pool.base_urls),
         }
 
-    def _get_generation_prompt(
+    def build_prompt(self, input_text: str, document_type: DocumentType, project_name: Optional[str] = None) -> str:
+        """Generate prompt for specific document type.
+
+        The project context comes first and is identical for every document type, so
+        LM Studio can reuse the processed prefix across the documents of one request.
+        """
+        return (
+            self._get_project_context(input_text, project_name)
+            + self._get_task_prompt(document_type, project_name)
+            + f"\n\n{DOCUMENT_LABELS[document_type]}:"
+        )
+
+    def build_combined_prompt(
+        self, input_text: str, document_types: List[DocumentType], project_name: Optional[str] = None
+    ) -> str:
+        """Generate one prompt asking for several documents separated by delimiter lines."""
+        tasks = "\n\n".join(
+            f"{document_delimiter(document_type)}\n{self._get_task_prompt(document_type, project_name)}"
+            for document_type in document_types
+        )
+
+        return (
+            self._get_project_context(input_text, project_name)
+            + f"""Write the following {len(document_types)} documents, in this order. Start each document with its \
+delimiter line exactly as shown below, on a line of its own, and write nothing outside the documents.
+
+{tasks}
+
+Documents:"""
+        )
+
+    def build_outline_prompt(
         self, input_text: str, document_type: DocumentType, project_name: Optional[str] = None
     ) -> str:
-        """Generate prompt for specific document type."""
+        """Ask for a one-line plan per section, so sections written separately do not repeat each other."""
+        label = DOCUMENT_LABELS[document_type]
+        return (
+            self._get_project_context(input_text, project_name)
+            + f"""Plan the project's {label}. It has these sections:
+{self._format_sections(document_type)}
+
+For each section, write its number and one line listing the points it will cover. Give every point to a \
+single section and write nothing else.
+
+Outline:"""
+        )
+
+    def build_section_prompt(
+        self,
+        input_text: str,
+        document_type: DocumentType,
+        index: int,
+        heading: Optional[str],
+        outline: str,
+        project_name: Optional[str] = None,
+    ) -> str:
+        """Ask for one section of a document planned by ``build_outline_prompt``.
+
+        Everything before the section number is shared by the sections of a document, so
+        LM Studio reuses the processed prefix across them. Without a ``heading`` the section
+        is asked to open with the document's title.
+        """
+        label = DOCUMENT_LABELS[document_type]
+        start = f"the heading line `{heading}`" if heading else "the project name as a `#` title"
+        return (
+            self._get_project_context(input_text, project_name)
+            + f"""The project's {label} is being written one section at a time, following this outline:
+
+{outline}
+
+Write section {index + 1}, "{DOCUMENT_SECTIONS[document_type][index]}", as Markdown. Start with {start}, \
+cover only the points of this section, and stop at its end.
+
+Section {index + 1}:"""
+        )
+
+    def build_section_triage_prompt(self, diff: str, document_type: DocumentType) -> str:
+        """Ask which sections of a document a change to its project description affects.
+
+        Only the change and the section names are sent, so the call is short on both ends.
+        """
+        label = DOCUMENT_LABELS[document_type]
+        return f"""A project description changed. Removed paragraphs start with "-", added ones with "+":
+
+{diff}
+
+The project's {label} has these sections:
+{self._format_sections(document_type)}
+
+Which sections of the {label} must be revised so they match the changed description? Answer with the \
+section numbers only, separated by commas, or "none".
+
+Sections:"""
+
+    def build_section_update_prompt(
+        self,
+        input_text: str,
+        document_type: DocumentType,
+        section: str,
+        diff: str,
+        project_name: Optional[str] = None,
+    ) -> str:
+        """Ask for one section of a document to be revised after its project description changed.
+
+        Starts with the same project context as ``build_prompt``, so the processed prefix is shared.
+        """
+        heading = section.strip().partition("\n")[0]
+        return (
+            self._get_project_context(input_text, project_name)
+            + f"""The project description above was just changed. Removed paragraphs start with "-", added ones with "+":
+
+{diff}
+
+This is the current "{heading.lstrip("# ")}" section of the project's {DOCUMENT_LABELS[document_type]}:
+
+{section.strip()}
+
+Revise this section so it matches the changed project description. Keep whatever is still accurate and its \
+style, start with the heading line `{heading}`, and write only this section, as Markdown.
+
+Revised section:"""
+        )
+
+    @staticmethod
+    def split_combined_output(text: str, document_types: List[DocumentType]) -> Dict[DocumentType, str]:
+        """Split a combined completion into per-document content, skipping unrequested or empty sections."""
+        documents: Dict[DocumentType, str] = {}
+        matches = list(DELIMITER_PATTERN.finditer(text))
+
+        for i, match in enumerate(matches):
+            try:
+                document_type = DocumentType(match.group(1).lower())
+            except ValueError:
+                continue
+
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            content = text[match.end() : end].strip()
+            if document_type in document_types and content and document_type not in documents:
+                documents[document_type] = content
+
+        return documents
+
+    def _get_project_context(self, input_text: str, project_name: Optional[str] = None) -> str:
+        """Shared prompt prefix describing the project."""
+        project_line = f"Project Name: {project_name}\n\n" if project_name else ""
+        return f"{project_line}Project Description:\n{input_text}\n\n"
 
+    def _get_task_prompt(self, document_type: DocumentType, project_name: Optional[str] = None) -> str:
+        """Get the document-specific instructions that follow the shared prefix."""
         prompts = {
             DocumentType.PRD: self._get_prd_prompt,
             DocumentType.WHAT_IS_THIS: self._get_what_is_this_prompt,
             DocumentType.README: self._get_readme_prompt,
         }
 
-        return prompts[document_type](input_text, project_name)
+        return prompts[document_type](project_name)
 
-    def _get_prd_prompt(self, input_text: str, project_name: Optional[str] = None) -> str:
+    @staticmethod
+    def _format_sections(document_type: DocumentType) -> str:
+        """Numbered list of the sections of a document type."""
+        return "\n".join(f"{i}. {section}" for i, section in enumerate(DOCUMENT_SECTIONS[document_type], 1))
+
+    def _get_prd_prompt(self, project_name: Optional[str] = None) -> str:
         """Generate PRD prompt."""
         project_context = f"for project '{project_name}'" if project_name else ""
 
-        return f"""You are a senior product manager. Create a comprehensive Product Requirements Document (PRD) {project_context} based on the following description.
-
-Project Description:
-{input_text}
+        return f"""As a senior product manager, create a comprehensive Product Requirements Document (PRD) {project_context} based on the project description above.
 
 Create a well-structured PRD with the following sections:
-1. Overview
-2. Goals & Objectives
-3. System Context
-4. Functional Requirements
-5. Non-Functional Requirements
-6. Deployment
-7. Extensibility
-8. Risks & Mitigation
+{self._format_sections(DocumentType.PRD)}
 
-Use clear, professional language and include specific technical details where appropriate. Format the output as Markdown.
+Use clear, professional language and include specific technical details where appropriate. Format the output as Markdown."""
 
-PRD:"""
-
-    def _get_what_is_this_prompt(self, input_text: str, project_name: Optional[str] = None) -> str:
+    def _get_what_is_this_prompt(self, project_name: Optional[str] = None) -> str:
         """Generate What-is-this prompt."""
         project_context = f"called '{project_name}'" if project_name else ""
 
-        return f"""You are a technical writer. Create an engaging "What is this" overview document {project_context} based on the following description.
-
-Project Description:
-{input_text}
+        return f"""As a technical writer, create an engaging "What is this" overview document {project_context} based on the project description above.
 
 Create a compelling overview with the following sections:
-1. Vision (what this project aims to achieve)
-2. Core Value (why it matters, what problems it solves)
-3. Key Features (main capabilities)
-4. Target Users (who will use this)
-5. Tech Snapshot (high-level technical overview)
-6. Roadmap (future plans)
-7. Success Metrics
+{self._format_sections(DocumentType.WHAT_IS_THIS)}
 
-Use an engaging, accessible tone while maintaining technical accuracy. Format the output as Markdown.
+Use an engaging, accessible tone while maintaining technical accuracy. Format the output as Markdown."""
 
-What is this:"""
-
-    def _get_readme_prompt(self, input_text: str, project_name: Optional[str] = None) -> str:
+    def _get_readme_prompt(self, project_name: Optional[str] = None) -> str:
         """Generate README prompt."""
         project_context = f"# {project_name}\n\n" if project_name else ""
 
-        return f"""You are a developer writing documentation. Create a comprehensive README.md {project_context}based on the following description.
-
-Project Description:
-{input_text}
+        return f"""As a developer writing documentation, create a comprehensive README.md {project_context}based on the project description above.
 
 Create a helpful README with the following sections:
-1. Project title and brief description
-2. Features
-3. Installation instructions
-4. Usage examples
-5. API documentation (if applicable)
-6. Configuration
-7. Development setup
-8. Contributing guidelines
-9. License
-
-Use clear, developer-friendly language with practical examples. Format the output as Markdown.
+{self._format_sections(DocumentType.README)}
 
-README:"""
+Use clear, developer-friendly language with practical examples. Format the output as Markdown."""
 
     async def generate_document(
         self,
@@ -159,48 +397,445 @@ README:"""
         temperature: float = 0.7,
     ) -> str:
         """Generate a document using LM Studio."""
+        prompt = self.build_prompt(input_text, document_type, project_name)
+        return await self.complete(
+            prompt, max_length=max_length, temperature=temperature, document_type=document_type.value
+        )
+
+    async def stream_document(
+        self,
+        input_text: str,
+        document_type: DocumentType,
+        project_name: Optional[str] = None,
+        max_length: int = 2048,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[str]:
+        """Generate a document using LM Studio, yielding content deltas as they arrive."""
+        prompt = self.build_prompt(input_text, document_type, project_name)
+        async for delta in self.stream_completion(
+            prompt, max_length=max_length, temperature=temperature, document_type=document_type.value
+        ):
+            yield delta
+
+    async def complete(
+        self,
+        prompt: str,
+        max_length: int = 2048,
+        temperature: float = 0.7,
+        affinity_key: Optional[str] = None,
+        document_type: str = "other",
+        stats: Optional[CompletionStats] = None,
+    ) -> str:
+        """Run a rendered prompt through LM Studio and return the full completion.
+
+        Pass ``stats`` to receive the backend, timings and token usage of the call.
+        """
         if not self.is_loaded:
             raise RuntimeError("LM Studio not connected. Call initialize() first.")
+        if self.hedging is not None:
+            # Hedging is decided on the first token, which only a streamed completion reveals
+            deltas = self.stream_completion(
+                prompt,
+                max_length=max_length,
+                temperature=temperature,
+                affinity_key=affinity_key,
+                document_type=document_type,
+                stats=stats,
+            )
+            async with contextlib.aclosing(deltas):
+                return "".join([delta async for delta in deltas]).strip()
 
         start_time = time.time()
-        prompt = self._get_generation_prompt(input_text, document_type, project_name)
+        tried: List[LLMBackend] = []
 
         try:
-            # Call LM Studio API
-            response = await self.client.post(
-                f"{self.base_url}/v1/chat/completions",
-                json={
-                    "model": self.model_name,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": max_length,
-                    "temperature": temperature,
-                    "stream": False,
-                },
-                headers={"Content-Type": "application/json"},
-            )
+            with tracer.span(
+                "llm.completion", kind=SPAN_KIND_CLIENT, model=self.model_name, document_type=document_type
+            ) as span:
+                while True:
+                    backend = self.pool.select(affinity_key, exclude=tried)
+                    tried.append(backend)
+                    span.set_attribute("backend", backend.base_url)
+
+                    try:
+                        # Call LM Studio API; headers and body are read separately to time them apart
+                        async with (
+                            self.pool.lease(backend),
+                            self.client.stream(
+                                "POST",
+                                f"{backend.base_url}/v1/chat/completions",
+                                json=self._get_completion_payload(prompt, max_length, temperature, stream=False),
+                                headers={"Content-Type": "application/json", **upstream_headers()},
+                            ) as response,
+                        ):
+                            span.add_event("response_headers", status_code=response.status_code)
+                            await response.aread()
+                    except FAILOVER_ERRORS as e:
+                        if self._should_fail_over(backend, tried, e):
+                            span.add_event("failover", backend=backend.base_url, error=str(e))
+                            continue
+                        raise
+
+                    span.set_attribute("http.status_code", response.status_code)
+                    if response.status_code == 200:
+                        result_data = response.json()
+                        generated_text = result_data["choices"][0]["message"]["content"]
+
+                        generation_time = time.time() - start_time
+                        usage = result_data.get("usage") or {}
+                        span.set_attribute("prompt_tokens", usage.get("prompt_tokens"))
+                        span.set_attribute("completion_tokens", usage.get("completion_tokens"))
+                        if self.metrics is not None:
+                            self.metrics.observe_upstream(
+                                document_type, self.model_name, generation_time, usage=result_data.get("usage")
+                            )
+                        if stats is not None:
+                            self._fill_stats(stats, backend, generation_time, None, usage)
+                        logger.info(
+                            "Completion generated successfully",
+                            backend=backend.base_url,
+                            generation_time=generation_time,
+                            output_length=len(generated_text),
+                        )
+
+                        return generated_text.strip()
+                    else:
+                        error_msg = f"LM Studio API error: {response.status_code}"
+                        logger.error("Error during text generation", error=error_msg, response_text=response.text)
+                        raise RuntimeError(error_msg)
+
+        except asyncio.CancelledError:
+            # Leaving the stream context closed the connection, so LM Studio stops generating
+            self._record_cancellation(document_type, start_time)
+            raise
+        except Exception as e:
+            logger.error("Error during text generation", error=str(e))
+            self._record_error(e)
+            raise
 
-            if response.status_code == 200:
-                result_data = response.json()
-                generated_text = result_data["choices"][0]["message"]["content"]
+    async def stream_completion(
+        self,
+        prompt: str,
+        max_length: int = 2048,
+        temperature: float = 0.7,
+        affinity_key: Optional[str] = None,
+        document_type: str = "other",
+        stats: Optional[CompletionStats] = None,
+    ) -> AsyncIterator[str]:
+        """Run a rendered prompt through LM Studio, yielding content deltas as they arrive.
+
+        Pass ``stats`` to receive the backend, timings and token usage once the stream ends.
+        """
+        if not self.is_loaded:
+            raise RuntimeError("LM Studio not connected. Call initialize() first.")
 
-                generation_time = time.time() - start_time
-                logger.info(
-                    "Document generated successfully",
-                    document_type=document_type.value,
-                    generation_time=generation_time,
-                    output_length=len(generated_text),
-                )
+        start_time = time.time()
+        first_token_time: Optional[float] = None
+        output_length = 0
+        usage: Optional[Dict[str, Any]] = None
+        backend: Optional[LLMBackend] = None
 
-                return generated_text.strip()
-            else:
-                error_msg = f"LM Studio API error: {response.status_code}"
-                logger.error("Error during text generation", error=error_msg, response_text=response.text)
-                raise RuntimeError(error_msg)
+        try:
+            with tracer.span(
+                "llm.stream_completion", kind=SPAN_KIND_CLIENT, model=self.model_name, document_type=document_type
+            ) as span:
+                payload = self._get_completion_payload(prompt, max_length, temperature, stream=True)
+                if self.hedging is not None:
+                    chunks = self._hedged_chunks(payload, affinity_key, span, self.hedging)
+                else:
+                    chunks = self._stream_chunks(payload, affinity_key, span)
+                async with contextlib.aclosing(chunks):
+                    async for backend, chunk in chunks:
+                        # With include_usage the final chunk carries token counts and no choices
+                        usage = chunk.get("usage") or usage
+                        delta = self._get_delta(chunk)
+                        if delta is None:
+                            continue
+                        if first_token_time is None:
+                            first_token_time = time.time() - start_time
+                            span.add_event("first_token")
+                        output_length += len(delta)
+                        yield delta
+
+                # Prefill ends with the first token; everything after it is decode
+                generation_time = time.time() - start_time
+                span.set_attribute("time_to_first_token", first_token_time)
+                if first_token_time is not None:
+                    span.set_attribute("decode_time", generation_time - first_token_time)
+                if usage:
+                    span.set_attribute("prompt_tokens", usage.get("prompt_tokens"))
+                    span.set_attribute("completion_tokens", usage.get("completion_tokens"))
+
+            if self.metrics is not None:
+                self.metrics.observe_upstream(document_type, self.model_name, generation_time, first_token_time, usage)
+            if stats is not None:
+                self._fill_stats(stats, backend, generation_time, first_token_time, usage)
+            logger.info(
+                "Completion streamed successfully",
+                backend=backend.base_url if backend is not None else None,
+                time_to_first_token=first_token_time,
+                generation_time=generation_time,
+                output_length=output_length,
+            )
 
+        except asyncio.CancelledError:
+            self._record_cancellation(document_type, start_time, output_length)
+            raise
         except Exception as e:
-            logger.error("Error during text generation", error=str(e))
+            logger.error("Error during streamed generation", error=str(e))
+            self._record_error(e)
             raise
 
+    async def _stream_chunks(
+        self, payload: Dict[str, Any], affinity_key: Optional[str], span: Any
+    ) -> AsyncIterator[Tuple[LLMBackend, Dict[str, Any]]]:
+        """Stream the chunks of a completion, failing over to another backend before any content."""
+        tried: List[LLMBackend] = []
+        while True:
+            backend = self.pool.select(affinity_key, exclude=tried)
+            tried.append(backend)
+            span.set_attribute("backend", backend.base_url)
+            received_content = False
+
+            try:
+                async with self.pool.lease(backend), self._post_stream(backend, payload) as response:
+                    span.set_attribute("http.status_code", response.status_code)
+                    span.add_event("response_headers", status_code=response.status_code)
+                    await self._raise_for_stream_status(response)
+
+                    async for line in response.aiter_lines():
+                        chunk = self._parse_stream_line(line)
+                        if chunk is None:
+                            continue
+                        received_content = received_content or self._get_delta(chunk) is not None
+                        yield backend, chunk
+                return
+            except FAILOVER_ERRORS as e:
+                # Only fail over before any content reached the caller
+                if not received_content and self._should_fail_over(backend, tried, e):
+                    span.add_event("failover", backend=backend.base_url, error=str(e))
+                    continue
+                raise
+
+    async def _hedged_chunks(
+        self, payload: Dict[str, Any], affinity_key: Optional[str], span: Any, policy: HedgePolicy
+    ) -> AsyncIterator[Tuple[LLMBackend, Dict[str, Any]]]:
+        """Stream the chunks of a completion, duplicating the request if its first token is late.
+
+        Requests run in their own tasks and race until one produces content; the others are
+        then cancelled, which closes their connections so their backends stop generating.
+        A request failing before any content is replaced by one to another backend, unless
+        a duplicate is still running.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        attempts: Dict[asyncio.Task, LLMBackend] = {}
+        running: Set[asyncio.Task] = set()
+        tried: List[LLMBackend] = []
+
+        def launch(backend: LLMBackend) -> asyncio.Task:
+            if backend not in tried:
+                tried.append(backend)
+            task = asyncio.create_task(self._stream_attempt(backend, payload, events))
+            attempts[task] = backend
+            running.add(task)
+            return task
+
+        start_time = time.monotonic()
+        primary = launch(self.pool.select(affinity_key))
+        span.set_attribute("backend", attempts[primary].base_url)
+        delay = policy.delay()
+        hedge: Optional[asyncio.Task] = None
+        winner: Optional[asyncio.Task] = None
+
+        try:
+            while True:
+                timeout = None
+                if winner is None and delay is not None:
+                    timeout = max(0.0, start_time + delay - time.monotonic())
+                try:
+                    task, item = await asyncio.wait_for(events.get(), timeout)
+                except asyncio.TimeoutError:
+                    delay = None
+                    if self.scheduler is not None and not self.scheduler.try_acquire():
+                        # Every slot is taken, so a duplicate would exceed the concurrency cap
+                        policy.skip()
+                        if self.metrics is not None:
+                            self.metrics.record_hedge("no_slot")
+                    elif policy.try_hedge():
+                        hedge = launch(self._hedge_backend(attempts[primary]))
+                        if self.scheduler is not None:
+                            hedge.add_done_callback(lambda _: self.scheduler.release())
+                        span.add_event("hedge", backend=attempts[hedge].base_url)
+                        logger.info("Hedging slow upstream request", backend=attempts[hedge].base_url)
+                    else:
+                        if self.scheduler is not None:
+                            self.scheduler.release()
+                        if self.metrics is not None:
+                            self.metrics.record_hedge("over_budget")
+                    continue
+
+                if winner is not None and task is not winner:
+                    continue
+                if item is None or isinstance(item, Exception):
+                    running.discard(task)
+                if isinstance(item, Exception):
+                    if winner is not None:
+                        raise item
+                    if isinstance(item, FAILOVER_ERRORS):
+                        if running:
+                            self.pool.mark_failed(attempts[task], f"{item.__class__.__name__}: {item}")
+                            continue
+                        if self._should_fail_over(attempts[task], tried, item):
+                            span.add_event("failover", backend=attempts[task].base_url, error=str(item))
+                            launch(self.pool.select(affinity_key, exclude=tried))
+                            continue
+                    elif running:
+                        logger.warning("Upstream request failed, waiting for its duplicate", error=str(item))
+                        continue
+                    raise item
+
+                if winner is None and (item is None or self._get_delta(item) is not None):
+                    winner = task
+                    self._settle_race(winner, hedge, attempts, time.monotonic() - start_time, span, policy)
+                if item is None:
+                    return
+                if winner is not None:
+                    yield attempts[task], item
+        finally:
+            for task in attempts:
+                task.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+    async def _stream_attempt(self, backend: LLMBackend, payload: Dict[str, Any], events: asyncio.Queue) -> None:
+        """Stream one request into ``events`` as ``(task, chunk)`` items, ending with ``None`` or the error."""
+        task = asyncio.current_task()
+        try:
+            async with self.pool.lease(backend), self._post_stream(backend, payload) as response:
+                await self._raise_for_stream_status(response)
+                async for line in response.aiter_lines():
+                    chunk = self._parse_stream_line(line)
+                    if chunk is not None:
+                        events.put_nowait((task, chunk))
+            events.put_nowait((task, None))
+        except Exception as e:
+            events.put_nowait((task, e))
+
+    def _settle_race(
+        self,
+        winner: asyncio.Task,
+        hedge: Optional[asyncio.Task],
+        attempts: Dict[asyncio.Task, LLMBackend],
+        time_to_first_token: float,
+        span: Any,
+        policy: HedgePolicy,
+    ) -> None:
+        """Cancel the requests that lost the race to the first token and record the outcome."""
+        for task in attempts:
+            if task is not winner:
+                task.cancel()
+        span.set_attribute("backend", attempts[winner].base_url)
+        policy.observe(time_to_first_token, hedge_won=hedge is not None and winner is hedge)
+        if hedge is not None:
+            outcome = "won" if winner is hedge else "lost"
+            span.set_attribute("hedge", outcome)
+            if self.metrics is not None:
+                self.metrics.record_hedge(outcome)
+
+    def _hedge_backend(self, primary: LLMBackend) -> LLMBackend:
+        """Least-loaded other healthy backend for a duplicate request, or another slot of ``primary``."""
+        if any(backend is not primary for backend in self.pool.healthy_backends()):
+            return self.pool.select(exclude=[primary])
+        return primary
+
+    def _post_stream(self, backend: LLMBackend, payload: Dict[str, Any]) -> Any:
+        """Open a streamed chat completion request to ``backend``."""
+        return self.client.stream(
+            "POST",
+            f"{backend.base_url}/v1/chat/completions",
+            json=payload,
+            headers={"Content-Type": "application/json", "Accept": "text/event-stream", **upstream_headers()},
+        )
+
+    @staticmethod
+    async def _raise_for_stream_status(response: httpx.Response) -> None:
+        if response.status_code != 200:
+            await response.aread()
+            error_msg = f"LM Studio API error: {response.status_code}"
+            logger.error("Error during streamed generation", error=error_msg, response_text=response.text)
+            raise RuntimeError(error_msg)
+
+    def _should_fail_over(self, backend: LLMBackend, tried: List[LLMBackend], error: Exception) -> bool:
+        """Mark a backend as failed and tell whether another one is left to try."""
+        self.pool.mark_failed(backend, f"{error.__class__.__name__}: {error}")
+        if len(tried) >= len(self.pool.backends):
+            return False
+
+        logger.warning("Failing over to another LLM backend", failed_backend=backend.base_url, error=str(error))
+        return True
+
+    @staticmethod
+    def _fill_stats(
+        stats: CompletionStats,
+        backend: Optional[LLMBackend],
+        generation_time: float,
+        time_to_first_token: Optional[float],
+        usage: Optional[Dict[str, Any]],
+    ) -> None:
+        stats.backend = backend.base_url if backend is not None else None
+        stats.generation_time = generation_time
+        stats.time_to_first_token = time_to_first_token
+        stats.prompt_tokens = (usage or {}).get("prompt_tokens")
+        stats.completion_tokens = (usage or {}).get("completion_tokens")
+
+    def _record_error(self, error: BaseException) -> None:
+        if self.metrics is not None:
+            self.metrics.record_error(error)
+
+    def _record_cancellation(self, document_type: str, start_time: float, output_length: int = 0) -> None:
+        logger.info(
+            "Upstream generation cancelled",
+            document_type=document_type,
+            elapsed=time.time() - start_time,
+            output_length=output_length,
+        )
+        if self.metrics is not None:
+            self.metrics.record_cancellation("upstream")
+
+    def _get_completion_payload(self, prompt: str, max_length: int, temperature: float, stream: bool) -> Dict[str, Any]:
+        """Build the chat completion request body."""
+        payload: Dict[str, Any] = {
+            "model": self.model_name,
+            "messages": [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}],
+            "max_tokens": max_length,
+            "temperature": temperature,
+            "stream": stream,
+        }
+        if stream:
+            # Ask for token counts in the final chunk, as non-streamed responses include them
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+
+    @staticmethod
+    def _parse_stream_line(line: str) -> Optional[Dict[str, Any]]:
+        """Decode the chunk carried by a single server-sent event line."""
+        if not line.startswith("data:"):
+            return None
+
+        data = line[len("data:") :].strip()
+        if not data or data == "[DONE]":
+            return None
+
+        return json.loads(data)
+
+    @staticmethod
+    def _get_delta(chunk: Dict[str, Any]) -> Optional[str]:
+        """Extract the content delta from a streamed chunk."""
+        choices = chunk.get("choices") or []
+        if not choices:
+            return None
+
+        return choices[0].get("delta", {}).get("content") or None
+
     def get_memory_usage(self) -> Dict[str, float]:
         """Get memory usage information."""
         return {"service": "LM Studio", "local_service": True, "memory_info": "Managed by LM Studio"}
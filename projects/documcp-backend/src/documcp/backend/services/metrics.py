@@ -0,0 +1,162 @@
+"""Prometheus metrics for generation requests and upstream LLM calls."""
+
+import gzip
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+from documcp.backend.services.backend_pool import NoHealthyBackendError
+from documcp.backend.services.scheduler import QueueFullError
+from documcp.shared_kernel.infra.settings.model import PrometheusSettings
+
+# Local models answer in seconds to minutes, so buckets reach well past the HTTP defaults
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+TTFT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+
+def error_cause(error: BaseException) -> str:
+    """Classify an exception into a low-cardinality error cause label."""
+    if isinstance(error, QueueFullError):
+        return "queue_full"
+    if isinstance(error, NoHealthyBackendError):
+        return "no_backend"
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.HTTPError):
+        return "connection"
+    if isinstance(error, RuntimeError) and "API error" in str(error):
+        return "upstream_status"
+    return "internal"
+
+
+class GenerationMetrics:
+    """Prometheus collectors for the generation hot path.
+
+    Metrics live in their own registry so several service instances (tests, MCP and
+    HTTP in one process) never collide. Labelled children are cached per document
+    type and model, so recording an upstream call is a few dictionary lookups and
+    lock-protected increments.
+    """
+
+    def __init__(self, namespace: str = "documcp", subsystem: str = "", registry: Optional[CollectorRegistry] = None):
+        self.registry = registry if registry is not None else CollectorRegistry()
+        common: Dict[str, Any] = {"namespace": namespace, "subsystem": subsystem, "registry": self.registry}
+
+        self.request_latency = Histogram(
+            "request_latency_seconds",
+            "End-to-end generation request latency",
+            ["endpoint", "status"],
+            buckets=LATENCY_BUCKETS,
+            **common,
+        )
+        self.upstream_ttft = Histogram(
+            "upstream_time_to_first_token_seconds",
+            "Time until the LLM streamed its first token",
+            ["document_type", "model"],
+            buckets=TTFT_BUCKETS,
+            **common,
+        )
+        self.upstream_latency = Histogram(
+            "upstream_latency_seconds",
+            "Total duration of an upstream LLM completion",
+            ["document_type", "model"],
+            buckets=LATENCY_BUCKETS,
+            **common,
+        )
+        self.prompt_tokens = Counter(
+            "prompt_tokens", "Prompt tokens reported by the LLM", ["document_type", "model"], **common
+        )
+        self.completion_tokens = Counter(
+            "completion_tokens", "Completion tokens reported by the LLM", ["document_type", "model"], **common
+        )
+        self.tokens_per_second = Gauge(
+            "tokens_per_second", "Completion tokens per second of the latest upstream call", ["model"], **common
+        )
+        self.inflight_requests = Gauge("inflight_requests", "Upstream LLM calls in flight", **common)
+        self.queued_requests = Gauge("queued_requests", "Generation calls waiting for an upstream slot", **common)
+        self.errors = Counter("errors", "Generation errors by cause", ["cause"], **common)
+        self.cancellations = Counter(
+            "cancellations",
+            "Generation work abandoned because the client went away, by stage",
+            ["stage"],
+            **common,
+        )
+        self.hedges = Counter(
+            "upstream_hedges",
+            "Late first tokens by hedging outcome: the duplicate request won or lost, was over budget or had no slot",
+            ["outcome"],
+            **common,
+        )
+
+        self._upstream_children: Dict[Tuple[str, str], Tuple[Any, ...]] = {}
+
+    @classmethod
+    def from_settings(cls, settings: PrometheusSettings) -> "GenerationMetrics":
+        """Create metrics from application settings."""
+        return cls(namespace=settings.namespace, subsystem=settings.metric_subsystem)
+
+    def track_inflight(self, fn: Callable[[], float]) -> None:
+        """Report the in-flight gauge from ``fn`` at scrape time."""
+        self.inflight_requests.set_function(fn)
+
+    def track_queued(self, fn: Callable[[], float]) -> None:
+        """Report the queued gauge from ``fn`` at scrape time."""
+        self.queued_requests.set_function(fn)
+
+    def observe_request(self, endpoint: str, status: str, seconds: float) -> None:
+        self.request_latency.labels(endpoint, status).observe(seconds)
+
+    def observe_upstream(
+        self,
+        document_type: str,
+        model: str,
+        seconds: float,
+        time_to_first_token: Optional[float] = None,
+        usage: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Record one successful upstream completion."""
+        children = self._upstream_children.get((document_type, model))
+        if children is None:
+            children = (
+                self.upstream_ttft.labels(document_type, model),
+                self.upstream_latency.labels(document_type, model),
+                self.prompt_tokens.labels(document_type, model),
+                self.completion_tokens.labels(document_type, model),
+                self.tokens_per_second.labels(model),
+            )
+            self._upstream_children[(document_type, model)] = children
+        ttft, latency, prompt_tokens, completion_tokens, tokens_per_second = children
+
+        latency.observe(seconds)
+        if time_to_first_token is not None:
+            ttft.observe(time_to_first_token)
+
+        if usage:
+            prompt_tokens.inc(usage.get("prompt_tokens") or 0)
+            generated = usage.get("completion_tokens") or 0
+            completion_tokens.inc(generated)
+            # Decode speed: exclude the prefill time before the first token when it is known
+            decode_time = seconds - (time_to_first_token or 0.0)
+            if generated and decode_time > 0:
+                tokens_per_second.set(generated / decode_time)
+
+    def record_error(self, error: BaseException) -> None:
+        self.errors.labels(error_cause(error)).inc()
+
+    def record_cancellation(self, stage: str) -> None:
+        """Count a cancelled client request (``request``) or aborted LLM call (``upstream``)."""
+        self.cancellations.labels(stage).inc()
+
+    def record_hedge(self, outcome: str) -> None:
+        """Count a hedged completion (``won``, ``lost``) or one left unhedged (``over_budget``, ``no_slot``)."""
+        self.hedges.labels(outcome).inc()
+
+    def render(self, accept_encoding: str = "", should_gzip: bool = False) -> Tuple[bytes, Dict[str, str]]:
+        """Render the text exposition format, gzipped when allowed and accepted."""
+        body = generate_latest(self.registry)
+        headers = {"Content-Type": CONTENT_TYPE_LATEST}
+        if should_gzip and "gzip" in accept_encoding:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        return body, headers
@@ -0,0 +1,89 @@
+"""Background initialization with a readiness state."""
+
+import asyncio
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class ReadinessState(str, Enum):
+    """Lifecycle of a background initialization."""
+
+    STARTING = "starting"
+    READY = "ready"
+    FAILED = "failed"
+
+
+class ServiceReadiness:
+    """Run an initialization coroutine in the background, retrying until it succeeds.
+
+    Startup does not wait for slow or unavailable dependencies such as LM Studio:
+    callers that need them ``wait()`` with a timeout and report the last error
+    while the service is not ready. ``initialize`` is called again after each
+    failure, so it must be safe to retry.
+    """
+
+    def __init__(self, name: str, initialize: Callable[[], Awaitable[None]], retry_interval: float = 10.0):
+        self.name = name
+        self.retry_interval = retry_interval
+        self.state = ReadinessState.STARTING
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self._initialize = initialize
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state is ReadinessState.READY
+
+    def start(self) -> None:
+        """Start initializing in the background; does nothing if already started."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to ``timeout`` seconds for readiness and tell whether it was reached."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.is_ready
+
+    async def stop(self) -> None:
+        """Cancel a pending initialization."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get readiness state."""
+        return {"state": self.state.value, "attempts": self.attempts, "error": self.error}
+
+    async def _run(self) -> None:
+        while True:
+            self.attempts += 1
+            try:
+                await self._initialize()
+            except Exception as e:
+                self.state = ReadinessState.FAILED
+                self.error = str(e)
+                logger.warning(
+                    "Initialization failed, retrying",
+                    service=self.name,
+                    attempt=self.attempts,
+                    retry_in=self.retry_interval,
+                    error=self.error,
+                )
+                await asyncio.sleep(self.retry_interval)
+                continue
+
+            self.state = ReadinessState.READY
+            self.error = None
+            self._ready.set()
+            logger.info("Service ready", service=self.name, attempts=self.attempts)
+            return
@@ -0,0 +1,207 @@
+"""Admission scheduler for upstream LLM calls."""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+import structlog
+
+from documcp.backend.settings import SchedulerSettings
+from documcp.backend.tracing import tracer
+from documcp.shared_kernel.domain.exception import BaseMsgException
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_CLIENT_ID = "anonymous"
+
+
+class Priority(IntEnum):
+    """Scheduling lanes, served in ascending order."""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+class QueueFullError(BaseMsgException):
+    """Raised when the generation queue cannot admit more work."""
+
+    code = 429
+    error = "queue_full"
+    message = "Generation queue is full, please retry later"
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__()
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+
+class GenerationScheduler:
+    """Concurrency-capped scheduler with priority lanes and per-client round robin.
+
+    Each lane keeps one FIFO per client; the scheduler serves the highest-priority
+    non-empty lane and rotates between its clients, so a burst from one client
+    cannot starve the others. When the queue is full, new work is rejected
+    immediately with a ``Retry-After`` estimate instead of waiting for a timeout.
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_queue_size: int = 32):
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self._active = 0
+        self._queued = 0
+        self._lanes: Dict[Priority, OrderedDict[str, Deque[asyncio.Future]]] = {
+            priority: OrderedDict() for priority in Priority
+        }
+        self.admitted = 0
+        self.rejected = 0
+        self.last_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.avg_wait_time = 0.0
+        self.avg_service_time = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: SchedulerSettings) -> "GenerationScheduler":
+        """Create a scheduler from application settings."""
+        return cls(max_concurrency=settings.max_concurrency, max_queue_size=settings.max_queue_size)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def check_admission(self, count: int = 1) -> None:
+        """Reject early if ``count`` new calls would overflow the queue."""
+        free_slots = max(0, self.max_concurrency - self._active) if not self._queued else 0
+        would_queue = max(0, count - free_slots)
+        if would_queue and self._queued + would_queue > self.max_queue_size:
+            self._reject()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.BULK, client_id: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold one upstream slot for the duration of the block."""
+        enqueued_at = time.monotonic()
+        with tracer.span("scheduler.wait", priority=priority.name.lower(), queue_depth=self._queued):
+            await self._acquire(priority, client_id or DEFAULT_CLIENT_ID)
+        started_at = time.monotonic()
+        self._record_wait(started_at - enqueued_at)
+
+        try:
+            yield
+        finally:
+            self.avg_service_time = _ewma(self.avg_service_time, time.monotonic() - started_at)
+            self._release()
+
+    def try_acquire(self) -> bool:
+        """Take a free slot without queueing, for optional work such as hedged requests; ``release`` it after."""
+        if self._active >= self.max_concurrency or self._queued:
+            return False
+        self._active += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """Give back a slot taken with ``try_acquire``."""
+        self._release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and wait-time statistics."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue_size": self.max_queue_size,
+            "active": self._active,
+            "queue_depth": self._queued,
+            "queue_depth_by_priority": {
+                priority.name.lower(): sum(len(waiters) for waiters in lane.values())
+                for priority, lane in self._lanes.items()
+            },
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "last_wait_time": self.last_wait_time,
+            "avg_wait_time": self.avg_wait_time,
+            "max_wait_time": self.max_wait_time,
+            "avg_service_time": self.avg_service_time,
+        }
+
+    async def _acquire(self, priority: Priority, client_id: str) -> None:
+        if self._active < self.max_concurrency and not self._queued:
+            self._active += 1
+            self.admitted += 1
+            return
+
+        if self._queued >= self.max_queue_size:
+            self._reject()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._lanes[priority].setdefault(client_id, deque()).append(waiter)
+        self._queued += 1
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before cancellation; pass it on
+                self._release()
+            else:
+                self._discard(priority, client_id, waiter)
+            raise
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters: highest priority first, round robin across clients."""
+        while self._active < self.max_concurrency and self._queued:
+            for priority in Priority:
+                lane = self._lanes[priority]
+                if not lane:
+                    continue
+                client_id, waiters = next(iter(lane.items()))
+                waiter = waiters.popleft()
+                if waiters:
+                    lane.move_to_end(client_id)
+                else:
+                    del lane[client_id]
+                self._queued -= 1
+                if waiter.cancelled():
+                    # Its task is being cancelled and will not claim the slot
+                    break
+                self._active += 1
+                self.admitted += 1
+                waiter.set_result(None)
+                break
+
+    def _discard(self, priority: Priority, client_id: str, waiter: asyncio.Future) -> None:
+        waiters = self._lanes[priority].get(client_id)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        if not waiters:
+            del self._lanes[priority][client_id]
+        self._queued -= 1
+
+    def _reject(self) -> None:
+        self.rejected += 1
+        retry_after = max(1, math.ceil(self.avg_service_time * (self._queued + 1) / max(1, self.max_concurrency)))
+        logger.warning("Generation queue full", queue_depth=self._queued, retry_after=retry_after)
+        raise QueueFullError(retry_after=retry_after)
+
+    def _record_wait(self, wait_time: float) -> None:
+        self.last_wait_time = wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+        self.avg_wait_time = _ewma(self.avg_wait_time, wait_time)
+
+
+def _ewma(average: float, sample: float, alpha: float = 0.2) -> float:
+    """Exponentially weighted moving average seeded by the first sample."""
+    return sample if average == 0.0 else average + alpha * (sample - average)
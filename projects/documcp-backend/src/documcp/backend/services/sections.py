@@ -0,0 +1,147 @@
+"""Split generated documents into their sections and diff project descriptions."""
+
+import difflib
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+from documcp.backend.domain.models import DocumentType
+from documcp.backend.services.llm_service import DOCUMENT_LABELS, DOCUMENT_SECTIONS
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$", re.MULTILINE)
+# Words that do not tell sections apart
+STOP_WORDS = {"a", "an", "and", "applicable", "if", "of", "the", "to"}
+# A heading names a section when at least this share of their words match
+MIN_HEADING_SIMILARITY = 0.5
+
+
+@dataclass
+class DocumentSections:
+    """A document cut at the headings of its sections.
+
+    ``preamble`` is whatever precedes the first section, such as a title; every entry of
+    ``sections`` starts with its heading line and keeps the blank lines that follow it, so
+    joining the parts of an unchanged document gives it back verbatim.
+    """
+
+    preamble: str
+    sections: List[str]
+
+    def join(self) -> str:
+        """Reassemble the document."""
+        return "".join([self.preamble, *self.sections]).strip()
+
+
+def section_title(section: str) -> str:
+    """Heading text of a section name, without the guidance in parentheses."""
+    return section.split(" (")[0]
+
+
+def split_sections(content: str, document_type: DocumentType) -> Optional[DocumentSections]:
+    """Cut ``content`` into the sections of its document type, or ``None`` if any cannot be found.
+
+    Headings are matched to sections in order by their words, at the level of the first
+    matching heading, so subsections stay inside their section. A document that opens
+    without a heading for its first section (a README title) uses its preamble instead.
+    """
+    names = [_words(section_title(section)) for section in DOCUMENT_SECTIONS[document_type]]
+    starts: List[int] = []
+    level: Optional[int] = None
+
+    for match in HEADING_PATTERN.finditer(content):
+        depth = len(match.group(1))
+        if level is not None and depth != level:
+            continue
+        heading = _words(re.sub(r"^\d+[.)]\s*", "", match.group(2)))
+        first = len(starts)
+        candidates = [(_similarity(heading, names[i]), i) for i in range(first, len(names))]
+        if not candidates:
+            break
+        score, index = max(candidates, key=lambda candidate: (candidate[0], -candidate[1]))
+        if score < MIN_HEADING_SIMILARITY:
+            continue
+        if index != first:
+            if first == 0 and index == 1 and not starts:
+                # The preamble is the first section
+                starts.append(0)
+            else:
+                return None
+        level = depth
+        starts.append(match.start())
+
+    if len(starts) != len(names):
+        return None
+    bounds = [*starts, len(content)]
+    preamble = content[: starts[0]]
+    return DocumentSections(preamble=preamble, sections=[content[bounds[i] : bounds[i + 1]] for i in range(len(names))])
+
+
+def section_heading(document_type: DocumentType, index: int, project_name: Optional[str] = None) -> Optional[str]:
+    """Heading line of a section written on its own, or ``None`` when the model titles it.
+
+    A README opens with its title rather than a section heading; it is the project name when known.
+    """
+    if document_type is DocumentType.README and index == 0:
+        return f"# {project_name}" if project_name else None
+    return f"## {section_title(DOCUMENT_SECTIONS[document_type][index])}"
+
+
+def document_title(document_type: DocumentType, project_name: Optional[str] = None) -> str:
+    """Title preceding the sections of a document written section by section."""
+    if document_type is DocumentType.README:
+        # Its first section is the title
+        return ""
+    label = DOCUMENT_LABELS[document_type]
+    return f"# {project_name}: {label}\n\n" if project_name else f"# {label}\n\n"
+
+
+def replace_heading(section: str, heading: str) -> str:
+    """Make ``heading`` the heading line of a generated section, replacing any the model wrote."""
+    body = section.strip()
+    first_line, _, rest = body.partition("\n")
+    if HEADING_PATTERN.fullmatch(first_line):
+        body = rest.strip()
+    return f"{heading}\n\n{body}\n\n" if body else f"{heading}\n\n"
+
+
+def heading_line(section: str) -> Optional[str]:
+    """Heading line a section opens with, or ``None`` when it opens with body text (an untitled README)."""
+    first_line = section.strip().partition("\n")[0]
+    return first_line if HEADING_PATTERN.fullmatch(first_line) else None
+
+
+def diff_inputs(previous: str, current: str) -> str:
+    """Paragraphs removed from (``-``) and added to (``+``) a project description."""
+    old, new = _paragraphs(previous), _paragraphs(current)
+    lines = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+        if tag != "equal":
+            lines.extend(f"- {paragraph}" for paragraph in old[i1:i2])
+            lines.extend(f"+ {paragraph}" for paragraph in new[j1:j2])
+    return "\n".join(lines)
+
+
+def parse_section_numbers(answer: str, count: int) -> Optional[Set[int]]:
+    """Read the 1-based section numbers of a triage answer as 0-based indexes.
+
+    Returns an empty set for "none" and ``None`` when the answer cannot be understood.
+    """
+    numbers = {int(number) - 1 for number in re.findall(r"\d+", answer) if 1 <= int(number) <= count}
+    if numbers:
+        return numbers
+    return set() if re.search(r"\bnone\b", answer, re.IGNORECASE) else None
+
+
+def _paragraphs(text: str) -> List[str]:
+    return [" ".join(paragraph.split()) for paragraph in re.split(r"\n\s*\n", text) if paragraph.strip()]
+
+
+def _words(text: str) -> Set[str]:
+    words = {word.rstrip("s") for word in re.findall(r"[a-z0-9]+", text.lower())}
+    return words - STOP_WORDS
+
+
+def _similarity(heading: Set[str], name: Set[str]) -> float:
+    if not heading or not name:
+        return 0.0
+    return len(heading & name) / len(heading | name)
@@ -0,0 +1,85 @@
+"""Single-flight coalescing of identical in-flight calls."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key onto one in-flight task.
+
+    The first caller for a key starts the work; later callers with the same key
+    await the same task until it finishes. Callers are shielded from each other,
+    so one caller being cancelled does not cancel the shared work, but the work is
+    cancelled once every caller has gone away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Run ``fn`` once per in-flight ``key``.
+
+        Returns the result together with a flag telling whether it was shared
+        with an earlier caller.
+        """
+        task = self.lookup(key)
+        shared = task is not None
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self.started += 1
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+
+        return await self.wait(task), shared
+
+    async def wait(self, task: "asyncio.Task[T]") -> T:
+        """Await an in-flight task as one of its callers, cancelling it when the last caller leaves."""
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            remaining = self._waiters[task] - 1
+            if remaining:
+                self._waiters[task] = remaining
+            else:
+                del self._waiters[task]
+                # Only a cancelled caller leaves before the task is done; nobody is left to read the result
+                if not task.done():
+                    task.cancel()
+                    self.cancelled += 1
+
+    def lookup(self, key: str) -> Optional[asyncio.Task]:
+        """Return the in-flight task for ``key`` on the running loop, if any."""
+        task = self._calls.get(key)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing counters."""
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+        }
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Retrieve the exception so it is not reported as unhandled when every caller went away
+        if not task.cancelled():
+            task.exception()
+
+
+# Process-wide group shared by the HTTP router and the MCP server when they run together
+generation_flights = SingleFlight()
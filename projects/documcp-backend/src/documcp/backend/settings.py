@@ -2,21 +2,143 @@ from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from documcp.shared_kernel.domain.enum import ApplicationMode
+from documcp.shared_kernel.infra.database.sqla.settings import DatabaseSettings
 from documcp.shared_kernel.infra.settings.model import (
     CacheSettings,
     CORSSettings,
     FastAPISettings,
     GZipSettings,
+    PrometheusSettings,
     SessionSettings,
 )
 
 
+class HedgingSettings(BaseModel):
+    """Hedged upstream requests: a completion whose first token is late is duplicated to another backend."""
+
+    enable: bool = False
+    # Percentile of recent times to first token after which a duplicate is sent
+    percentile: float = 95.0
+    # Long-run share of completions that may be duplicated
+    max_fraction: float = 0.05
+    # Times to first token observed before hedging starts, and how many recent ones are kept
+    min_samples: int = 20
+    window: int = 200
+
+
 class LMStudioSettings(BaseModel):
     """LM Studio configuration."""
 
     base_url: str = "http://localhost:1234"
     model_name: str = "local-model"
     timeout: float = 300.0
+    # Several OpenAI-compatible servers to balance across; ``base_url`` is used when empty
+    base_urls: list[str] = []
+    health_check_interval: float = 15.0
+    # Startup does not wait for LM Studio: the connection is retried in the background at this interval
+    connect_retry_interval: float = 10.0
+    # How long an MCP tool call waits for the connection before reporting that DocuMCP is not ready
+    startup_wait: float = 15.0
+    hedging: HedgingSettings = HedgingSettings()
+
+
+class HttpClientSettings(BaseModel):
+    """Shared upstream HTTP client configuration.
+
+    The read timeout comes from ``LMStudioSettings.timeout``.
+    """
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 10.0
+    http2: bool = False
+    retries: int = 3
+
+
+class GenerationCacheSettings(CacheSettings):
+    """Generation cache configuration.
+
+    ``backend_url`` enables the persistent tier when it points at a SQLite file
+    (``sqlite:///./data/cache.db``); otherwise only the in-memory LRU tier is used.
+    """
+
+    expire: int = 86400
+    max_entries: int = 256
+    # Oldest rows of the persistent tier are evicted beyond this count
+    max_disk_entries: int = 10000
+    # Seconds between purges of expired rows from the persistent tier
+    purge_interval: int = 300
+
+
+class SchedulerSettings(BaseModel):
+    """Admission scheduler configuration for upstream LLM calls."""
+
+    max_concurrency: int = 2
+    max_queue_size: int = 32
+
+
+class BatchSettings(BaseModel):
+    """Batch generation (``POST /generate/batch``)."""
+
+    # Requests generated at once across all batches; documents turned away by a full scheduler
+    # queue wait for its ``Retry-After`` and are tried again
+    max_concurrency: int = 4
+    # Longest accepted NDJSON request line
+    max_line_bytes: int = 4 * 1024 * 1024
+
+
+class IngestionSettings(BaseModel):
+    """Map-reduce ingestion of long project descriptions.
+
+    Token counts are estimated as ``len(text) / chars_per_token``. Inputs larger
+    than ``context_window - reserved_tokens`` are summarized chunk by chunk.
+    """
+
+    max_input_chars: int = 200_000
+    context_window: int = 8192
+    # Room for the generation instructions and the longest document output
+    reserved_tokens: int = 3584
+    chunk_tokens: int = 1536
+    summary_tokens: int = 384
+    chars_per_token: float = 4.0
+    max_concurrency: int = 2
+
+
+class TracingSettings(BaseModel):
+    """Request tracing; finished traces are appended to ``export_path`` as OTLP/JSON lines."""
+
+    enable: bool = False
+    export_path: str = "./data/traces.jsonl"
+    service_name: str = "documcp-backend"
+
+
+class JobSettings(BaseModel):
+    """Asynchronous job worker configuration."""
+
+    workers: int = 2
+    store_path: str = "./data/jobs.db"
+
+
+class HistorySettings(BaseModel):
+    """Generation history recorded to ``Settings.database`` through a write-behind buffer."""
+
+    enable: bool = True
+    batch_size: int = 100
+    # Longest a record waits in memory before its batch is written
+    flush_interval: float = 1.0
+    # Records beyond this many unwritten ones are dropped, oldest first
+    max_pending: int = 10_000
+
+
+class DocumentStoreSettings(BaseModel):
+    """Generated documents kept for MCP clients to read back as resources."""
+
+    path: str = "./data/documents.db"
+    # Oldest documents are pruned beyond this count
+    max_documents: int = 1000
 
 
 class Settings(BaseSettings):
@@ -25,7 +147,7 @@ class Settings(BaseSettings):
     mode: ApplicationMode = ApplicationMode.DEVELOPMENT
     cors: CORSSettings = CORSSettings()
     gzip: GZipSettings = GZipSettings()
-    cache: CacheSettings = CacheSettings()
+    cache: GenerationCacheSettings = GenerationCacheSettings()
     fastapi: FastAPISettings = FastAPISettings(
         title="DocuMCP API",
         description="Document generation API using LM Studio",
@@ -35,6 +157,16 @@ class Settings(BaseSettings):
     )
     session: SessionSettings = SessionSettings()
     lm_studio: LMStudioSettings = LMStudioSettings()
+    http_client: HttpClientSettings = HttpClientSettings()
+    scheduler: SchedulerSettings = SchedulerSettings()
+    jobs: JobSettings = JobSettings()
+    batch: BatchSettings = BatchSettings()
+    documents: DocumentStoreSettings = DocumentStoreSettings()
+    database: DatabaseSettings = DatabaseSettings()
+    history: HistorySettings = HistorySettings()
+    ingestion: IngestionSettings = IngestionSettings()
+    prometheus: PrometheusSettings = PrometheusSettings()
+    tracing: TracingSettings = TracingSettings()
 
     model_config = SettingsConfigDict(
         env_prefix="DOCUMCP_", env_nested_delimiter="__", env_file_encoding="utf-8", extra="allow"
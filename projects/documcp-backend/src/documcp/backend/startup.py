@@ -0,0 +1,40 @@
+"""Startup timing for ``--profile-startup``.
+
+Kept free of third-party imports: entry points import it first, so marks are
+measured from the start of the DocuMCP imports.
+"""
+
+import sys
+import time
+from typing import List, Tuple
+
+
+class StartupProfile:
+    """Record named milestones relative to when this module was imported."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.enabled = False
+        self.marks: List[Tuple[str, float]] = []
+
+    def enable(self) -> None:
+        """Print milestones from now on, starting with those already recorded."""
+        self.enabled = True
+        for name, elapsed in self.marks:
+            self._print(name, elapsed)
+
+    def mark(self, name: str) -> None:
+        """Record the first occurrence of a milestone, printing it to stderr when profiling."""
+        if any(mark == name for mark, _ in self.marks):
+            return
+        elapsed = time.perf_counter() - self.started
+        self.marks.append((name, elapsed))
+        if self.enabled:
+            self._print(name, elapsed)
+
+    def _print(self, name: str, elapsed: float) -> None:
+        # stdout carries the MCP protocol, so the report goes to stderr
+        print(f"[startup] {name:<16}{elapsed * 1000:>9.1f} ms", file=sys.stderr, flush=True)
+
+
+startup_profile = StartupProfile()
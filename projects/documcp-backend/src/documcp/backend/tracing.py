@@ -0,0 +1,305 @@
+"""Lightweight request tracing with an OTLP-compatible JSON file exporter."""
+
+import hashlib
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+
+from documcp.backend.settings import TracingSettings
+from documcp.shared_kernel.infra.fastapi.middlewares import correlation_id_ctx, get_correlation_id
+
+logger = structlog.get_logger(__name__)
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+# Traces whose root span never ends (or ended before a detached child) are dropped beyond this
+MAX_PENDING_TRACES = 1024
+
+
+@dataclass(kw_only=True, eq=False)
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    kind: int = SPAN_KIND_INTERNAL
+    start_time_ns: int = field(default_factory=time.time_ns)
+    end_time_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Tuple[str, int, Dict[str, Any]]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append((name, time.time_ns(), attributes))
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds, up to now while the span is still open."""
+        return ((self.end_time_ns or time.time_ns()) - self.start_time_ns) / 1e9
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value pointing at this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def trace_id_for(correlation_id: str) -> str:
+    """Derive a 128-bit trace id from a correlation id, so both identify the same request."""
+    try:
+        return uuid.UUID(correlation_id).hex
+    except ValueError:
+        return hashlib.sha256(correlation_id.encode("utf-8")).hexdigest()[:32]
+
+
+class OTLPJsonFileExporter:
+    """Append finished traces to a file as OTLP/JSON ``ExportTraceServiceRequest`` lines.
+
+    Spans are buffered per trace and handed to a writer thread when the root span
+    ends, so the event loop never waits on the file; the thread appends whatever
+    traces have queued up in one write. The format matches the OpenTelemetry
+    Collector file exporter and can be replayed with its ``otlpjsonfile`` receiver.
+    """
+
+    def __init__(self, path: str, service_name: str = "documcp-backend"):
+        self.path = path
+        self.service_name = service_name
+        self._pending: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+        # Finished traces for the writer thread; ``None`` stops it
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._writer = threading.Thread(target=self._write_loop, name="otlp-file-exporter", daemon=True)
+        self._writer.start()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            spans = self._pending.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.parent_span_id is not None:
+                if len(self._pending) > MAX_PENDING_TRACES:
+                    del self._pending[next(iter(self._pending))]
+                return
+            del self._pending[span.trace_id]
+        self._queue.put(spans)
+
+    def flush(self) -> None:
+        """Block until every trace handed over so far is written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write the remaining traces and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            traces = [spans for spans in batch if spans is not None]
+            try:
+                if traces:
+                    self._write(traces)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(traces) < len(batch):
+                return
+
+    def _write(self, traces: List[List[Span]]) -> None:
+        lines = "".join(json.dumps(self._encode(spans), separators=(",", ":")) + "\n" for spans in traces)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.warning("Failed to export traces", path=self.path, traces=len(traces), error=str(e))
+
+    def _encode(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _encode_attributes({"service.name": self.service_name})},
+                    "scopeSpans": [
+                        {"scope": {"name": "documcp.backend"}, "spans": [_encode_span(span) for span in spans]}
+                    ],
+                }
+            ]
+        }
+
+
+class Tracer:
+    """Create spans that nest through contextvars and hand finished spans to an exporter.
+
+    Without an exporter, spans are still created so callers can read timings, but
+    nothing is written.
+    """
+
+    def __init__(self, exporter: Optional[OTLPJsonFileExporter] = None):
+        self.exporter = exporter
+
+    @contextmanager
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Iterator[Span]:
+        """Time a block as a child of the current span, or as a root span keyed by the correlation id."""
+        parent = _current_span.get()
+        if parent is not None:
+            trace_id = parent.trace_id
+        else:
+            correlation_id = get_correlation_id()
+            trace_id = trace_id_for(correlation_id) if correlation_id else secrets.token_hex(16)
+            attributes.setdefault("correlation_id", correlation_id)
+
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent.span_id if parent is not None else None,
+            kind=kind,
+        )
+        for key, value in attributes.items():
+            span.set_attribute(key, value)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{e.__class__.__name__}: {e}"
+            raise
+        finally:
+            span.end_time_ns = time.time_ns()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Closed from another context, e.g. an async generator finalized elsewhere
+                _current_span.set(parent)
+            if self.exporter is not None:
+                self.exporter.export(span)
+
+
+tracer = Tracer()
+
+
+def configure_tracing(settings: TracingSettings) -> None:
+    """Enable or disable the file exporter of the global tracer."""
+    shutdown_tracing()
+    tracer.exporter = OTLPJsonFileExporter(settings.export_path, settings.service_name) if settings.enable else None
+    if settings.enable:
+        logger.info("Tracing enabled", export_path=settings.export_path)
+
+
+def shutdown_tracing() -> None:
+    """Write the traces still queued and detach the file exporter of the global tracer."""
+    exporter, tracer.exporter = tracer.exporter, None
+    if exporter is not None:
+        exporter.close()
+
+
+def upstream_headers() -> Dict[str, str]:
+    """Headers that carry the correlation id and trace context to an upstream service."""
+    headers = {}
+    correlation_id = get_correlation_id()
+    if correlation_id:
+        headers["X-Correlation-ID"] = correlation_id
+    span = _current_span.get()
+    if span is not None:
+        headers["traceparent"] = span.traceparent
+    return headers
+
+
+def add_trace_context(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """structlog processor adding the correlation id and current span to every log line."""
+    correlation_id = correlation_id_ctx.get()
+    if correlation_id:
+        event_dict.setdefault("correlation_id", correlation_id)
+    span = _current_span.get()
+    if span is not None:
+        event_dict.setdefault("trace_id", span.trace_id)
+        event_dict.setdefault("span_id", span.span_id)
+    return event_dict
+
+
+class TracingMiddleware:
+    """Wrap each HTTP request, including a streamed body, in a root server span."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with tracer.span(f"{scope['method']} {scope['path']}", kind=SPAN_KIND_SERVER) as span:
+
+            async def send_wrapper(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    span.add_event("response_start")
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+def _encode_span(span: Span) -> Dict[str, Any]:
+    encoded: Dict[str, Any] = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_time_ns),
+        "endTimeUnixNano": str(span.end_time_ns or span.start_time_ns),
+        "attributes": _encode_attributes(span.attributes),
+        "events": [
+            {"timeUnixNano": str(timestamp), "name": name, "attributes": _encode_attributes(attributes)}
+            for name, timestamp, attributes in span.events
+        ],
+        "status": {"code": STATUS_CODE_ERROR, "message": span.error} if span.error else {"code": STATUS_CODE_OK},
+    }
+    if span.parent_span_id is not None:
+        encoded["parentSpanId"] = span.parent_span_id
+    return encoded
+
+
+def _encode_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        encoded.append({"key": key, "value": typed})
+    return encoded
@@ -0,0 +1,49 @@
+"""Shared test fixtures."""
+
+import json
+import re
+
+import httpx
+import pytest
+
+from documcp.backend.services.llm_service import LMStudioService
+
+
+def _completion_text(payload: dict) -> str:
+    """Return a deterministic completion for a chat completion payload."""
+    prompt = payload["messages"][-1]["content"]
+    delimiters = re.findall(r"^===DOCUMENT: \w+===$", prompt, re.MULTILINE)
+    if delimiters:
+        return "\n\n".join(f"{delimiter}\nGenerated section {i}" for i, delimiter in enumerate(delimiters))
+    return f"Generated for: {prompt.splitlines()[0][:40]}"
+
+
+def _lm_studio_handler(request: httpx.Request) -> httpx.Response:
+    """Fake LM Studio OpenAI-compatible endpoints."""
+    if request.url.path == "/v1/models":
+        return httpx.Response(200, json={"data": [{"id": "test-model"}]})
+
+    payload = json.loads(request.content)
+    text = _completion_text(payload)
+    usage = {"prompt_tokens": 10, "completion_tokens": len(text.split(" "))}
+
+    if payload.get("stream"):
+        lines = []
+        for word in text.split(" "):
+            chunk = {"choices": [{"delta": {"content": word + " "}}]}
+            lines.append(f"data: {json.dumps(chunk)}\n\n")
+        if payload.get("stream_options", {}).get("include_usage"):
+            lines.append(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n")
+        lines.append("data: [DONE]\n\n")
+        return httpx.Response(200, text="".join(lines), headers={"Content-Type": "text/event-stream"})
+
+    return httpx.Response(200, json={"choices": [{"message": {"content": text}}], "usage": usage})
+
+
+@pytest.fixture
+def llm_service() -> LMStudioService:
+    """LM Studio service backed by an in-memory fake server."""
+    service = LMStudioService(model_name="test-model")
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(_lm_studio_handler))
+    service._model_loaded = True
+    return service
@@ -30,7 +30,7 @@ async def test_generation_request_validation(client):
     assert response.status_code == 400
 
     # Test too long input
-    response = client.post("/api/v1/generate", json={"input_text": "x" * 20000, "document_types": ["prd"]})
+    response = client.post("/api/v1/generate", json={"input_text": "x" * 300_000, "document_types": ["prd"]})
     assert response.status_code == 400
 
 
@@ -0,0 +1,69 @@
+"""Test load balancing across several LLM backends."""
+
+import httpx
+import pytest
+
+from documcp.backend.services.backend_pool import BackendPool
+from documcp.backend.services.llm_service import LMStudioService
+
+URLS = ["http://lm-a:1234", "http://lm-b:1234", "http://lm-c:1234"]
+
+
+def _pool(handler=None) -> BackendPool:
+    transport = httpx.MockTransport(handler or (lambda request: httpx.Response(200, json={"data": []})))
+    return BackendPool(URLS, httpx.AsyncClient(transport=transport), health_check_interval=0)
+
+
+def test_affinity_key_is_stable():
+    """Test that the same project is always routed to the same backend."""
+    pool = _pool()
+
+    assert len({pool.select("project-x").base_url for _ in range(10)}) == 1
+    assert len({pool.select(f"project-{i}").base_url for i in range(50)}) == len(URLS)
+
+
+def test_overloaded_preferred_backend_is_skipped():
+    """Test that least outstanding requests wins when the preferred backend is overloaded."""
+    pool = _pool()
+    preferred = pool.select("project-x")
+    preferred.outstanding = pool.affinity_slack + 1
+
+    assert pool.select("project-x") is not preferred
+
+
+@pytest.mark.asyncio
+async def test_health_probe_takes_backends_out_of_rotation():
+    """Test that failed probes mark backends unhealthy and successful ones recover them."""
+    down = {"lm-b"}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host in down:
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200, json={"data": [{"id": "test-model"}]})
+
+    pool = _pool(handler)
+    await pool.check_health()
+    assert [backend.base_url for backend in pool.healthy_backends()] == ["http://lm-a:1234", "http://lm-c:1234"]
+
+    down.clear()
+    await pool.check_health()
+    assert len(pool.healthy_backends()) == len(URLS)
+
+
+@pytest.mark.asyncio
+async def test_completion_fails_over_to_healthy_backend():
+    """Test that a connection failure is retried on another backend."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "lm-a":
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200, json={"choices": [{"message": {"content": request.url.host}}]})
+
+    service = LMStudioService(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), base_urls=URLS)
+    service._model_loaded = True
+    affinity_key = next(f"p{i}" for i in range(100) if service.pool.select(f"p{i}").base_url == URLS[0])
+
+    content = await service.complete("prompt", affinity_key=affinity_key)
+
+    assert content in {"lm-b", "lm-c"}
+    assert not service.pool.backends[0].healthy
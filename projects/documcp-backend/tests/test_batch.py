@@ -0,0 +1,174 @@
+"""Test batch generation."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from documcp.backend.domain.models import DocumentType, GeneratedDocument, GenerationRequest
+from documcp.backend.main import create_app
+from documcp.backend.services.batch import BatchGenerator
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.llm_service import LMStudioService
+from documcp.backend.services.scheduler import GenerationScheduler
+
+
+class SlowDocumentService:
+    """Document service stand-in that records how many requests run at once."""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def iter_documents(self, request, priority=None, client_id=None, wait_for_queue=False):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            for doc_type in request.document_types:
+                await asyncio.sleep(0.01)
+                yield GeneratedDocument(document_type=doc_type, content=request.input_text)
+        finally:
+            self.running -= 1
+
+
+@pytest.mark.asyncio
+async def test_batch_bounds_concurrency_and_reads_lazily():
+    """Test that requests run at most max_concurrency at a time and are read only when a slot frees up."""
+    service = SlowDocumentService()
+    batch = BatchGenerator(service, max_concurrency=2)
+    read = 0
+
+    async def requests():
+        nonlocal read
+        for i in range(6):
+            read += 1
+            # Never more than the running requests plus the one waiting for a slot
+            assert read - batch.completed <= 3
+            yield GenerationRequest(input_text=f"project {i}", document_types=[DocumentType.PRD, DocumentType.README])
+
+    results = [(index, document.content) async for index, document in batch.generate(requests())]
+
+    assert service.peak == 2
+    assert len(results) == 12
+    assert {content for _, content in results} == {f"project {i}" for i in range(6)}
+    assert all(content == f"project {index}" for index, content in results)
+    assert batch.get_stats() == {"max_concurrency": 2, "active": 0, "completed": 6, "failed": 0}
+
+
+@pytest.mark.asyncio
+async def test_batch_close_cancels_requests_and_frees_slots():
+    """Test that closing a batch early cancels its requests and gives their slots back."""
+    service = SlowDocumentService()
+    batch = BatchGenerator(service, max_concurrency=2)
+
+    async def requests():
+        for i in range(10):
+            yield GenerationRequest(input_text=f"project {i}", document_types=[DocumentType.PRD] * 5)
+
+    results = batch.generate(requests())
+    await anext(results)
+    await results.aclose()
+
+    assert service.running == 0
+    assert batch.active == 0
+    assert [index async for index, _ in batch.generate(requests())][:1] == [0]
+
+
+@pytest.mark.asyncio
+async def test_batch_waits_for_a_full_scheduler_queue():
+    """Test that documents turned away by a full scheduler queue are retried instead of failing."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "README"}}]})
+
+    llm_service = LMStudioService(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    llm_service._model_loaded = True
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue_size=0)
+    batch = BatchGenerator(DocumentGenerationService(llm_service, scheduler=scheduler), max_concurrency=3)
+
+    async def requests():
+        for i in range(3):
+            yield GenerationRequest(input_text=f"project {i}", document_types=[DocumentType.README])
+
+    results = [result async for _, result in batch.generate(requests())]
+
+    assert scheduler.rejected > 0
+    assert len(results) == 3
+    assert not any(result.metadata.get("error") for result in results)
+
+
+def test_batch_endpoint_streams_ndjson(llm_service):
+    """Test that every document and every invalid line is answered on its own NDJSON line."""
+    body = "\n".join(
+        [
+            json.dumps({"input_text": "A todo app", "document_types": ["prd", "readme"]}),
+            "{not json",
+            json.dumps({"input_text": "   ", "document_types": ["prd"]}),
+            json.dumps({"input_text": "A chat app", "document_types": ["what_is_this"]}),
+        ]
+    )
+    service = DocumentGenerationService(llm_service)
+
+    with (
+        patch("documcp.backend.api.generation.document_service", service),
+        patch("documcp.backend.api.generation.batch_generator", BatchGenerator(service)),
+    ):
+        response = TestClient(create_app()).post(
+            "/api/v1/generate/batch", content=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    documents = {(record["request_index"], record["document_type"]) for record in records if "document_type" in record}
+    errors = {record["request_index"]: record["error_message"] for record in records if record.get("error")}
+    assert documents == {(0, "prd"), (0, "readme"), (3, "what_is_this")}
+    assert errors[1].startswith("Invalid request")
+    assert errors[2] == "Input text cannot be empty"
+
+
+@pytest.mark.asyncio
+async def test_batch_body_is_read_while_streaming(llm_service):
+    """Test that a body arriving in chunks is not consumed by the disconnect watcher."""
+    lines = [json.dumps({"input_text": f"Project {i}", "document_types": ["prd"]}).encode() + b"\n" for i in range(3)]
+    # Split every line across messages, as a streamed upload would
+    chunks = [part for line in lines for part in (line[:10], line[10:])]
+    service = DocumentGenerationService(llm_service)
+    sent = []
+
+    async def receive():
+        if chunks:
+            await asyncio.sleep(0.01)
+            return {"type": "http.request", "body": chunks.pop(0), "more_body": bool(chunks)}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/v1/generate/batch",
+        "raw_path": b"/api/v1/generate/batch",
+        "query_string": b"",
+        "headers": [(b"host", b"test"), (b"content-type", b"application/x-ndjson")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+    with (
+        patch("documcp.backend.api.generation.document_service", service),
+        patch("documcp.backend.api.generation.batch_generator", BatchGenerator(service)),
+    ):
+        await asyncio.wait_for(create_app()(scope, receive, send), timeout=5)
+
+    body = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+    records = [json.loads(line) for line in body.splitlines()]
+    assert not any(record.get("error") for record in records)
+    assert sorted(record["request_index"] for record in records) == [0, 1, 2]
@@ -0,0 +1,36 @@
+"""Test the benchmark helpers and mock LLM server."""
+
+import httpx
+import pytest
+
+from benchmarks.mock_llm import MockLLMConfig, MockLLMServer
+from benchmarks.runner import Sample, percentile, summarize
+
+
+def test_percentiles_and_overhead():
+    """Test nearest-rank percentiles and the overhead estimate."""
+    samples = [Sample(latency=value / 10, ok=True) for value in range(1, 11)] + [Sample(latency=9.0, ok=False)]
+
+    summary = summarize(samples, duration=2.0, upstream_times=[0.2, 0.4])
+
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert summary["errors"] == 1
+    assert summary["throughput_rps"] == 5.0
+    assert summary["p95"] == 1.0
+    assert summary["overhead_p50"] == pytest.approx(0.3)
+
+
+@pytest.mark.asyncio
+async def test_mock_llm_serves_and_injects_errors():
+    """Test that the mock server completes requests and fails the configured share."""
+    mock = MockLLMServer(MockLLMConfig(ttft=0, tokens_per_second=1e6, completion_tokens=3, error_rate=0.5, seed=1))
+    payload = {"messages": [{"role": "user", "content": "hi"}], "max_tokens": 10}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=mock.app), base_url="http://mock") as client:
+        models = await client.get("/v1/models")
+        statuses = [(await client.post("/v1/chat/completions", json=payload)).status_code for _ in range(20)]
+
+    assert models.json()["data"][0]["id"] == "mock-model"
+    assert set(statuses) == {200, 500}
+    assert mock.errors == statuses.count(500)
+    assert len(mock.service_times) == statuses.count(200)
@@ -0,0 +1,159 @@
+"""Test the generation cache."""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from documcp.backend.domain.models import DocumentType, GenerationRequest
+from documcp.backend.services.cache import GenerationCache, make_generation_key
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.settings import GenerationCacheSettings
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = GenerationCache(max_entries=2)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    await cache.get("a")
+    await cache.set("c", "3")
+
+    assert await cache.get("a") == "1"
+    assert await cache.get("b") is None
+    assert cache.get_stats()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_misses():
+    """Test that entries past their TTL are not returned."""
+    cache = GenerationCache(expire=-1)
+    await cache.set("a", "1")
+
+    assert await cache.get("a") is None
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    """Test that the SQLite tier serves entries to a fresh instance."""
+    settings = GenerationCacheSettings(backend_url=f"sqlite:///{tmp_path / 'cache.db'}")
+    cache = GenerationCache.from_settings(settings)
+    key = make_generation_key("prompt", "model", 0.3, 100)
+    await cache.set(key, "content")
+    await cache.close()
+
+    restarted = GenerationCache.from_settings(settings)
+    assert await restarted.get(key) == "content"
+    assert restarted.disk_hits == 1
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_evicts_oldest_beyond_cap(tmp_path):
+    """Test that the SQLite tier keeps only the newest ``max_disk_entries`` rows."""
+    cache = GenerationCache(max_entries=1, max_disk_entries=2, path=str(tmp_path / "cache.db"))
+    for key in ["a", "b", "c"]:
+        await cache.set(key, key)
+        time.sleep(0.001)
+
+    (rows,) = cache._db.execute("SELECT COUNT(*) FROM generation_cache").fetchone()
+    assert rows == 2
+    assert await cache.get("a") is None
+    assert await cache.get("b") == "b"
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_prunes_in_batches_only_over_cap(tmp_path):
+    """Test that the SQLite tier is pruned a batch below the cap, and only once a write goes over it."""
+    cache = GenerationCache(max_entries=1, max_disk_entries=10, path=str(tmp_path / "cache.db"))
+    for i in range(11):
+        await cache.set(str(i), str(i))
+        time.sleep(0.001)
+
+    (rows,) = cache._db.execute("SELECT COUNT(*) FROM generation_cache").fetchone()
+    assert rows == cache._disk_rows == 9
+    assert await cache.get("1") is None
+    assert await cache.get("2") == "2"
+
+    # Rewriting a key overcounts the rows; the exact count before pruning keeps the rows in place
+    await cache.set("10", "10")
+    await cache.set("10", "10")
+    (rows,) = cache._db.execute("SELECT COUNT(*) FROM generation_cache").fetchone()
+    assert rows == 9
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_purges_expired_rows_while_running(tmp_path):
+    """Test that writes periodically delete expired rows without a restart."""
+    cache = GenerationCache(expire=-1, purge_interval=0, path=str(tmp_path / "cache.db"))
+    await cache.set("a", "1")
+    cache.expire = 60
+    await cache.set("b", "2")
+
+    keys = [key for (key,) in cache._db.execute("SELECT key FROM generation_cache")]
+    assert keys == ["b"]
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_disk_tier_is_a_miss(tmp_path, mocker):
+    """Test that a database error while reading counts as a miss instead of failing the request."""
+    cache = GenerationCache.from_settings(GenerationCacheSettings(backend_url=f"sqlite:///{tmp_path / 'cache.db'}"))
+    mocker.patch.object(cache, "_db_get", side_effect=sqlite3.OperationalError("database is locked"))
+
+    assert await cache.get("key") is None
+    assert cache.misses == 1
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_writes_in_threads(tmp_path, mocker):
+    """Test that closing the cache lets a write already running in a thread finish and persist."""
+    settings = GenerationCacheSettings(backend_url=f"sqlite:///{tmp_path / 'cache.db'}")
+    cache = GenerationCache.from_settings(settings)
+    db_set = cache._db_set
+    started = threading.Event()
+
+    def slow_set(*args):
+        started.set()
+        time.sleep(0.05)
+        db_set(*args)
+
+    mocker.patch.object(cache, "_db_set", slow_set)
+    write = asyncio.create_task(cache.set("key", "content"))
+    await asyncio.to_thread(started.wait)
+    write.cancel()
+    await cache.close()
+
+    restarted = GenerationCache.from_settings(settings)
+    assert await restarted.get("key") == "content"
+    await restarted.close()
+
+
+def test_key_depends_on_sampling_parameters():
+    """Test that keys differ when sampling parameters differ."""
+    key = make_generation_key("prompt", "model", 0.3, 100)
+
+    assert key != make_generation_key("prompt", "model", 0.5, 100)
+    assert key != make_generation_key("prompt", "model", 0.3, 200)
+
+
+@pytest.mark.asyncio
+async def test_service_serves_repeated_request_from_cache(llm_service, mocker):
+    """Test that an identical request does not call LM Studio again."""
+    complete = mocker.spy(llm_service, "complete")
+    service = DocumentGenerationService(llm_service, cache=GenerationCache())
+    request = GenerationRequest(input_text="A todo app", document_types=[DocumentType.README])
+
+    first = await service.generate_documents(request)
+    second = await service.generate_documents(request)
+
+    assert complete.call_count == 1
+    assert first.documents[0].content == second.documents[0].content
+    assert second.documents[0].metadata["cached"] is True
@@ -0,0 +1,155 @@
+"""Test cancellation when clients go away."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from documcp.backend import mcp_server
+from documcp.backend.domain.models import DocumentType, GenerationRequest
+from documcp.backend.main import create_app
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.llm_service import LMStudioService
+from documcp.backend.services.metrics import GenerationMetrics
+from documcp.backend.services.single_flight import SingleFlight
+
+
+def _value(metrics: GenerationMetrics, stage: str) -> float:
+    return metrics.registry.get_sample_value("documcp_cancellations_total", {"stage": stage}) or 0.0
+
+
+def _hanging_llm_service(metrics: GenerationMetrics, requests: list) -> LMStudioService:
+    """LM Studio service whose completions never finish."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(3600)
+        return httpx.Response(500)
+
+    service = LMStudioService(model_name="test-model", metrics=metrics)
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service._model_loaded = True
+    return service
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_upstream_generation():
+    """Test that a client disconnect on /generate aborts the upstream call and is counted."""
+    metrics = GenerationMetrics()
+    upstream_requests: list = []
+    service = DocumentGenerationService(_hanging_llm_service(metrics, upstream_requests), inflight=SingleFlight())
+    disconnected = asyncio.Event()
+    body = json.dumps({"input_text": "A todo app", "document_types": ["prd", "readme"]}).encode()
+    messages = []
+
+    async def receive():
+        if not messages:
+            messages.append(body)
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/v1/generate",
+        "raw_path": b"/api/v1/generate",
+        "query_string": b"",
+        "headers": [(b"host", b"test"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+
+    with (
+        patch("documcp.backend.api.generation.document_service", service),
+        patch("documcp.backend.api.generation.generation_metrics", metrics),
+    ):
+        call = asyncio.create_task(create_app()(scope, receive, send))
+        while len(upstream_requests) < 2:
+            await asyncio.sleep(0.01)
+        disconnected.set()
+        await asyncio.wait_for(call, timeout=5)
+
+    assert messages[1]["status"] == 499
+    assert _value(metrics, "request") == 1
+    assert _value(metrics, "upstream") == 2
+    assert service.inflight.get_stats()["cancelled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancellation_keeps_finished_documents_cached(llm_service):
+    """Test that documents finished before a cancellation are cached for the next request."""
+    cache = MagicMock(get=AsyncMock(return_value=None), set=AsyncMock())
+    service = DocumentGenerationService(llm_service, cache=cache, inflight=SingleFlight())
+    original_complete = llm_service.complete
+
+    async def complete(prompt, *args, **kwargs):
+        if kwargs.get("document_type") == DocumentType.PRD.value:
+            await asyncio.sleep(3600)
+        return await original_complete(prompt, *args, **kwargs)
+
+    request = GenerationRequest(input_text="A todo app", document_types=[DocumentType.PRD, DocumentType.README])
+    with patch.object(llm_service, "complete", complete):
+        call = asyncio.create_task(service.generate_documents(request))
+        while not cache.set.called:
+            await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    assert cache.set.call_count == 1
+    assert service.inflight.get_stats() == {"in_flight": 0, "started": 2, "coalesced": 0, "cancelled": 1}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_mcp_tool_call_is_counted():
+    """Test that cancelling an MCP tool call aborts the upstream call and records both cancellations."""
+    metrics = GenerationMetrics()
+    upstream_requests: list = []
+    llm_service = _hanging_llm_service(metrics, upstream_requests)
+
+    with (
+        patch.object(mcp_server, "llm_service", llm_service),
+        patch.object(mcp_server, "document_service", DocumentGenerationService(llm_service)),
+        patch.object(mcp_server, "generation_metrics", metrics),
+    ):
+        call = asyncio.create_task(
+            mcp_server.handle_call_tool("generate_readme", {"input_text": "A todo app", "inline": True})
+        )
+        while not upstream_requests:
+            await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        # The shared upstream task is cancelled once its last caller has gone
+        for _ in range(100):
+            if _value(metrics, "upstream"):
+                break
+            await asyncio.sleep(0.01)
+
+    assert _value(metrics, "request") == 1
+    assert _value(metrics, "upstream") == 1
+
+
+@pytest.mark.asyncio
+async def test_closing_a_stream_early_finishes_its_document_tasks():
+    """Test that a consumer leaving a stream early leaves no document task pending."""
+    metrics = GenerationMetrics()
+    upstream_requests: list = []
+    service = DocumentGenerationService(_hanging_llm_service(metrics, upstream_requests), inflight=SingleFlight())
+    request = GenerationRequest(input_text="A todo app", document_types=[DocumentType.PRD, DocumentType.README])
+
+    stream = service.stream_documents(request)
+    await anext(stream)
+    await stream.aclose()
+
+    pending = [task for task in asyncio.all_tasks() if "produce" in task.get_coro().__qualname__]
+    assert pending == []
@@ -0,0 +1,184 @@
+"""Test response compression."""
+
+import asyncio
+import zlib
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from documcp.shared_kernel.infra.fastapi.middlewares import compression
+from documcp.shared_kernel.infra.fastapi.middlewares.compression import (
+    CompressionMiddleware,
+    PrecompressedCache,
+    available_encodings,
+    negotiate_encoding,
+)
+
+DOCUMENT = "# README\n\n" + "DocuMCP turns project descriptions into documentation.\n" * 200
+
+
+async def _document(request):
+    return PlainTextResponse(DOCUMENT, headers={"ETag": 'W/"doc-1"'})
+
+
+async def _page(request):
+    # Every page carries the same weak ETag, as generated by a version counter
+    page = request.query_params.get("page", "0")
+    return PlainTextResponse(f"Page {page}\n" + DOCUMENT, headers={"ETag": 'W/"v1"'})
+
+
+async def _record(request):
+    # A stored document as the history API returns it: same body and ETag on every fetch
+    return JSONResponse({"id": 1, "content": DOCUMENT}, headers={"ETag": 'W/"history-1"'})
+
+
+async def _report(request):
+    # A one-off body without an ETag, e.g. a fresh generation
+    return PlainTextResponse(f"Report {request.query_params.get('n', '0')}\n" + DOCUMENT)
+
+
+async def _small(request):
+    return PlainTextResponse("ok")
+
+
+async def _events(request):
+    async def events():
+        for i in range(3):
+            yield f"event: chunk\ndata: {i}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def _app() -> Starlette:
+    return Starlette(
+        routes=[
+            Route("/document", _document),
+            Route("/page", _page),
+            Route("/record", _record),
+            Route("/report", _report),
+            Route("/small", _small),
+            Route("/events", _events),
+        ],
+        middleware=[Middleware(CompressionMiddleware, minimum_size=100, compress_level=6)],
+    )
+
+
+def test_negotiation_honours_q_values():
+    """Test that the preferred available encoding with a positive q-value wins."""
+    encodings = available_encodings()
+
+    assert negotiate_encoding("gzip, deflate", encodings) == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity", encodings) is None
+    assert negotiate_encoding("*", encodings) == next(iter(encodings))
+    assert negotiate_encoding("", encodings) is None
+
+
+def test_complete_bodies_are_compressed_once():
+    """Test that a repeated fetch of the same body is served from the precompressed cache."""
+    app = _app()
+    client = TestClient(app)
+
+    first = client.get("/document", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/document", headers={"Accept-Encoding": "gzip"})
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in first.headers["Vary"]
+    assert first.text == second.text == DOCUMENT
+    assert "Content-Encoding" not in small.headers
+
+    cache = app.middleware_stack.app.cache
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_repeated_document_fetch_skips_compression(mocker):
+    """Test that a stored document fetched again is served from the precompressed cache."""
+    encodings = available_encodings()
+    created = []
+
+    def counting(name):
+        def create(level):
+            created.append(name)
+            return encodings[name](level)
+
+        return create
+
+    mocker.patch.object(compression, "available_encodings", return_value={name: counting(name) for name in encodings})
+    app = _app()
+    client = TestClient(app)
+    accept = {"Accept-Encoding": ", ".join(encodings)}
+
+    first = client.get("/record", headers=accept)
+    second = client.get("/record", headers=accept)
+
+    assert first.headers["Content-Encoding"] == second.headers["Content-Encoding"] == created[0]
+    assert first.json() == second.json()
+    assert len(created) == 1
+    assert app.middleware_stack.app.cache.get_stats()["hits"] == 1
+
+
+def test_precompressed_bodies_are_keyed_by_content():
+    """Test that responses sharing an ETag on different paths or queries are not served each other's body."""
+    client = TestClient(_app())
+
+    first = client.get("/page?page=1", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/page?page=2", headers={"Accept-Encoding": "gzip"})
+    document = client.get("/document", headers={"Accept-Encoding": "gzip"})
+    other = client.get("/document?page=1", headers={"Accept-Encoding": "gzip"})
+
+    assert first.text.startswith("Page 1\n")
+    assert second.text.startswith("Page 2\n")
+    assert document.text == other.text == DOCUMENT
+
+
+def test_bodies_without_etag_skip_the_cache():
+    """Test that bodies unlikely to repeat are compressed without entering the precompressed cache."""
+    app = _app()
+    client = TestClient(app)
+
+    responses = [client.get("/report", params={"n": n}, headers={"Accept-Encoding": "gzip"}) for n in range(3)]
+
+    assert [response.headers["Content-Encoding"] for response in responses] == ["gzip"] * 3
+    assert responses[2].text.startswith("Report 2\n")
+    assert app.middleware_stack.app.cache.get_stats() == {"entries": 0, "bytes": 0, "hits": 0, "misses": 0}
+
+
+@pytest.mark.asyncio
+async def test_streamed_bodies_are_flushed_per_chunk():
+    """Test that every streamed chunk can be decompressed as soon as it is sent."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    messages = []
+    scope = {"type": "http", "method": "GET", "path": "/events", "headers": [(b"accept-encoding", b"gzip")]}
+
+    async def receive():
+        # The body is empty; afterwards the client just never disconnects
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        messages.append(message)
+
+    await _app()(scope, receive, send)
+
+    headers = dict(messages[0]["headers"])
+    chunks = [decompressor.decompress(message["body"]) for message in messages[1:]]
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    assert chunks[:3] == [f"event: chunk\ndata: {i}\n\n".encode() for i in range(3)]
+    assert messages[-1]["more_body"] is False
+
+
+def test_precompressed_cache_is_bounded_by_size():
+    """Test that the least recently used bodies are evicted beyond the byte budget."""
+    cache = PrecompressedCache(max_bytes=10)
+    cache.put(b"a", "gzip", b"12345")
+    cache.put(b"b", "gzip", b"12345")
+    cache.get(b"a", "gzip")
+    cache.put(b"c", "gzip", b"12345")
+
+    assert cache.get(b"b", "gzip") is None
+    assert cache.get(b"a", "gzip") == b"12345"
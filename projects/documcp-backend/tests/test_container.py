@@ -0,0 +1,39 @@
+"""Test the container-managed upstream HTTP client."""
+
+import pytest
+
+from documcp.backend.container import ApplicationContainer
+from documcp.backend.services.llm_service import LMStudioService
+from documcp.backend.settings import LMStudioSettings
+
+
+@pytest.mark.asyncio
+async def test_shared_client_uses_settings_and_closes_on_shutdown():
+    """Test that the pooled client honors settings and is closed with the container."""
+    container = ApplicationContainer()
+    await container.init_resources()
+    settings = container.settings()
+    client = await container.async_http_client()
+
+    assert client.timeout.read == settings.lm_studio.timeout
+    assert client.timeout.connect == settings.http_client.connect_timeout
+    assert await container.async_http_client() is client
+
+    await container.shutdown_resources()
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_service_from_settings_does_not_close_shared_client():
+    """Test that the LLM service honors its settings and leaves a shared client open."""
+    container = ApplicationContainer()
+    await container.init_resources()
+    client = await container.async_http_client()
+
+    service = LMStudioService.from_settings(LMStudioSettings(base_url="http://lm-studio:1234/"), client=client)
+    await service.aclose()
+
+    assert service.base_url == "http://lm-studio:1234"
+    assert service.client is client
+    assert not client.is_closed
+    await container.shutdown_resources()
@@ -0,0 +1,79 @@
+"""Test the content-addressed document store."""
+
+import pytest
+
+from documcp.backend.domain.models import DocumentType, GeneratedDocument
+from documcp.backend.services.document_store import DocumentStore, content_digest, digest_from_uri, summarize
+
+README = "# Todo App\n\nA small app for tracking todos.\nIt syncs across devices.\n\n## Install\n\nRun it."
+
+
+@pytest.fixture
+def store():
+    """In-memory document store."""
+    store = DocumentStore(path=":memory:", max_documents=2)
+    yield store
+    store.close()
+
+
+def _document(content: str, doc_type: DocumentType = DocumentType.README) -> GeneratedDocument:
+    return GeneratedDocument(document_type=doc_type, content=content, metadata={"project_name": "todo"})
+
+
+def test_summarize_takes_first_heading_and_paragraph():
+    """Test that the summary is the first heading and the paragraph after it."""
+    assert summarize(README) == ("Todo App", "A small app for tracking todos. It syncs across devices.")
+    title, summary = summarize("word " * 100, limit=40)
+    assert title == ""
+    assert len(summary) <= 40 and summary.endswith("…")
+
+
+@pytest.mark.asyncio
+async def test_documents_are_addressed_by_content(store):
+    """Test that a stored document is found by the hash of its content."""
+    stored = await store.put(_document(README))
+
+    assert stored.digest == content_digest(README)
+    assert digest_from_uri(stored.uri) == stored.digest
+    assert stored.title == "Todo App"
+    assert stored.project_name == "todo"
+    assert await store.get_content(stored.digest) == README
+    assert await store.get(stored.digest) == stored
+
+
+@pytest.mark.asyncio
+async def test_identical_content_is_stored_once(store):
+    """Test that storing the same content again refreshes it instead of duplicating it."""
+    first = await store.put(_document(README))
+    await store.put(_document("# PRD\n\nRequirements.", DocumentType.PRD))
+    again = await store.put(_document(README))
+
+    assert again.digest == first.digest
+    assert [stored.digest for stored in await store.list()] == [first.digest, content_digest("# PRD\n\nRequirements.")]
+
+
+@pytest.mark.asyncio
+async def test_oldest_documents_are_pruned(store):
+    """Test that the store keeps at most ``max_documents`` documents."""
+    for i in range(3):
+        await store.put(_document(f"# Doc {i}"))
+
+    assert [stored.title for stored in await store.list()] == ["Doc 2", "Doc 1"]
+    assert await store.get_content(content_digest("# Doc 0")) is None
+    assert store.get_stats() == {"documents": 2, "max_documents": 2}
+
+
+@pytest.mark.asyncio
+async def test_storing_again_at_the_cap_prunes_nothing(store):
+    """Test that refreshing a stored document at ``max_documents`` keeps every document."""
+    for content in ["# Doc 0", "# Doc 1", "# Doc 0"]:
+        await store.put(_document(content))
+
+    assert [stored.title for stored in await store.list()] == ["Doc 0", "Doc 1"]
+    assert store._documents == 2
+
+
+def test_digest_from_uri_rejects_other_uris():
+    """Test that only document URIs with a full digest are accepted."""
+    assert digest_from_uri("documcp://documents/abc") is None
+    assert digest_from_uri("file:///etc/passwd") is None
@@ -0,0 +1,136 @@
+"""Test hedged upstream requests."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from documcp.backend.services.hedging import HedgePolicy
+from documcp.backend.services.llm_service import LMStudioService
+from documcp.backend.services.metrics import GenerationMetrics
+from documcp.backend.services.scheduler import GenerationScheduler
+
+URLS = ["http://lm-a:1234", "http://lm-b:1234"]
+
+
+def _stream(text: str) -> httpx.Response:
+    chunk = {"choices": [{"delta": {"content": text}}]}
+    body = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n"
+    return httpx.Response(200, text=body, headers={"Content-Type": "text/event-stream"})
+
+
+def _service(handler, policy: HedgePolicy) -> LMStudioService:
+    service = LMStudioService(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        base_urls=URLS,
+        metrics=GenerationMetrics(),
+        hedging=policy,
+    )
+    service._model_loaded = True
+    return service
+
+
+def _hedges(service: LMStudioService, outcome: str) -> float:
+    return service.metrics.registry.get_sample_value("documcp_upstream_hedges_total", {"outcome": outcome}) or 0.0
+
+
+def _policy(max_fraction: float) -> HedgePolicy:
+    policy = HedgePolicy(percentile=90.0, max_fraction=max_fraction, min_samples=5)
+    for _ in range(10):
+        policy.observe(0.02)
+    return policy
+
+
+def test_policy_delay_and_budget():
+    """Test that the delay is the TTFT percentile and hedges stay within the budgeted fraction."""
+    policy = HedgePolicy(percentile=90.0, max_fraction=0.25, min_samples=5)
+    assert policy.delay() is None
+
+    for i in range(1, 11):
+        policy.observe(i / 10)
+    hedges = sum(policy.delay() == 1.0 and policy.try_hedge() for _ in range(40))
+
+    assert hedges == 10
+    assert policy.get_stats()["over_budget"] == 30
+    assert policy.get_stats()["requests"] == 41
+
+
+@pytest.mark.asyncio
+async def test_slow_first_token_is_hedged_and_loser_cancelled():
+    """Test that a late first token sends a duplicate to the other backend and cancels the slow request."""
+    cancelled = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "lm-a":
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return _stream(request.url.host)
+
+    policy = _policy(max_fraction=1.0)
+    service = _service(handler, policy)
+    affinity_key = next(f"p{i}" for i in range(100) if service.pool.select(f"p{i}").base_url == URLS[0])
+
+    content = await asyncio.wait_for(service.complete("prompt", affinity_key=affinity_key), timeout=1.0)
+
+    assert content == "lm-b"
+    await asyncio.wait_for(cancelled.wait(), timeout=1.0)
+    assert policy.get_stats()["hedges_won"] == 1
+    assert _hedges(service, "won") == 1
+    assert all(backend.outstanding == 0 for backend in service.pool.backends)
+
+
+@pytest.mark.asyncio
+async def test_hedging_respects_budget():
+    """Test that a late first token is left alone once the hedging budget is spent."""
+    hosts = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        hosts.append(request.url.host)
+        await asyncio.sleep(0.1)
+        return _stream(request.url.host)
+
+    policy = _policy(max_fraction=0.0)
+    service = _service(handler, policy)
+
+    content = await service.complete("prompt")
+
+    assert len(hosts) == 1
+    assert content == hosts[0]
+    assert policy.get_stats()["hedged"] == 0
+    assert _hedges(service, "over_budget") == 1
+
+
+@pytest.mark.asyncio
+async def test_hedging_needs_a_free_scheduler_slot():
+    """Test that no duplicate is sent while every scheduler slot is taken, and a hedge gives its slot back."""
+    hosts = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        hosts.append(request.url.host)
+        await asyncio.sleep(0.1)
+        return _stream(request.url.host)
+
+    policy = _policy(max_fraction=1.0)
+    service = _service(handler, policy)
+    service.scheduler = GenerationScheduler(max_concurrency=1, max_queue_size=0)
+
+    async with service.scheduler.slot():
+        await service.complete("prompt")
+
+    assert len(hosts) == 1
+    assert policy.get_stats()["no_slot"] == 1
+    assert policy.get_stats()["hedged"] == 0
+    assert _hedges(service, "no_slot") == 1
+
+    service.scheduler.max_concurrency = 2
+    async with service.scheduler.slot():
+        await service.complete("prompt")
+        await asyncio.sleep(0)
+
+    assert len(hosts) == 3
+    assert policy.get_stats()["hedged"] == 1
+    assert service.scheduler.active == 0
@@ -0,0 +1,256 @@
+"""Test the generation history and its write-behind buffer."""
+
+import asyncio
+import time
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+from documcp.backend.domain.models import DocumentType, GenerationRecord, GenerationRequest
+from documcp.backend.main import create_app
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.history import GenerationHistoryRepository, GenerationRecorder
+from documcp.backend.services.ingestion import InputReducer
+from documcp.shared_kernel.infra.database.sqla.container.di import SqlaContainer
+from documcp.shared_kernel.infra.database.sqla.settings import DatabaseSettings
+from documcp.shared_kernel.infra.database.sqla.write_behind import WriteBehindBuffer
+from documcp.shared_kernel.infra.fastapi.dtos.request import CursorPageable
+
+
+@pytest_asyncio.fixture
+async def repository(tmp_path):
+    """History repository on a temporary SQLite database."""
+    database = SqlaContainer(settings=DatabaseSettings(url=f"sqlite+aiosqlite:///{tmp_path}/history.db"))
+    await database.init_resources()
+    repository = GenerationHistoryRepository(await database.session_factory())
+    await repository.create_schema()
+    yield repository
+    await database.shutdown_resources()
+
+
+def _record(
+    input_hash: str, doc_type: DocumentType = DocumentType.README, generated_at: float = 0.0, content: str = ""
+):
+    return GenerationRecord(
+        document_type=doc_type,
+        content=content or f"{doc_type.value} at {generated_at}",
+        input_hash=input_hash,
+        model="test-model",
+        input_length=10,
+        output_length=20,
+        generated_at=generated_at,
+    )
+
+
+@pytest.mark.asyncio
+async def test_buffer_writes_full_batches_without_waiting():
+    """Test that a full batch is written right away and the rest after the flush interval."""
+    batches = []
+
+    async def write(batch):
+        batches.append(batch)
+
+    buffer = WriteBehindBuffer(write, batch_size=3, flush_interval=0.05)
+    buffer.start()
+    for i in range(4):
+        buffer.offer(i)
+    await asyncio.sleep(0.01)
+    assert batches == [[0, 1, 2]]
+
+    await asyncio.sleep(0.1)
+    assert batches == [[0, 1, 2], [3]]
+    await buffer.stop()
+    assert buffer.get_stats() == {"pending": 0, "written": 4, "dropped": 0, "failed_flushes": 0}
+
+
+@pytest.mark.asyncio
+async def test_buffer_keeps_failed_batches_and_bounds_memory():
+    """Test that failed batches are retried and only the oldest items are dropped when full."""
+    batches = []
+    failing = True
+
+    async def write(batch):
+        if failing:
+            raise ConnectionError("database unavailable")
+        batches.append(batch)
+
+    buffer = WriteBehindBuffer(write, batch_size=10, max_pending=3)
+    for i in range(4):
+        buffer.offer(i)
+    assert not await buffer.flush()
+
+    failing = False
+    await buffer.stop()
+    assert batches == [[1, 2, 3]]
+    assert buffer.get_stats() == {"pending": 0, "written": 3, "dropped": 1, "failed_flushes": 1}
+
+
+@pytest.mark.asyncio
+async def test_buffer_stop_finishes_the_write_in_progress():
+    """Test that stopping during a slow write lets it finish instead of losing its batch."""
+    batches = []
+    writing = asyncio.Event()
+
+    async def write(batch):
+        writing.set()
+        await asyncio.sleep(0.05)
+        batches.append(batch)
+
+    buffer = WriteBehindBuffer(write, batch_size=2, flush_interval=0.01)
+    buffer.start()
+    for i in range(3):
+        buffer.offer(i)
+    await writing.wait()
+    await buffer.stop()
+
+    assert batches == [[0, 1], [2]]
+    assert buffer.get_stats() == {"pending": 0, "written": 3, "dropped": 0, "failed_flushes": 0}
+
+
+@pytest.mark.asyncio
+async def test_latest_for_input(repository):
+    """Test that the most recent record for an input is found, optionally by document type."""
+    await repository.add_many(
+        [
+            _record("a", DocumentType.README, 1.0),
+            _record("a", DocumentType.PRD, 2.0),
+            _record("a", DocumentType.README, 3.0),
+            _record("b", DocumentType.README, 4.0),
+        ]
+    )
+
+    latest = await repository.latest_for_input("a")
+    assert latest.generated_at == 3.0
+    assert latest.id is not None
+    prd = await repository.latest_for_input("a", DocumentType.PRD)
+    assert prd.content == "prd at 2.0"
+    assert await repository.latest_for_input("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_latest_for_input_uses_index(repository):
+    """Test that the lookup is an index search rather than a table scan."""
+    async with repository.session_factory() as session:
+        plan = await session.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT * FROM generation_records WHERE input_hash = 'a' "
+                "AND document_type = 'readme' ORDER BY generated_at DESC LIMIT 1"
+            )
+        )
+        details = " ".join(row[-1] for row in plan)
+
+    assert "USING INDEX ix_generation_records_input_hash_document_type_generated_at" in details
+    assert "TEMP B-TREE" not in details
+
+
+@pytest.mark.asyncio
+async def test_generation_is_recorded(llm_service, repository):
+    """Test that generated documents are written to the history with upstream timings."""
+    recorder = GenerationRecorder(repository, flush_interval=0.01)
+    recorder.start()
+    service = DocumentGenerationService(llm_service, recorder=recorder)
+
+    started = time.time()
+    response = await service.generate_documents(
+        GenerationRequest(input_text="A todo app", document_types=[DocumentType.README], project_name="todo")
+    )
+    await recorder.stop()
+
+    document = response.documents[0]
+    record = await repository.latest_for_input(document.metadata["input_hash"], DocumentType.README)
+    assert record.content == document.content
+    assert record.project_name == "todo"
+    assert record.model == "test-model"
+    assert record.prompt_tokens == 10
+    assert record.upstream_time is not None
+    assert record.generated_at >= started
+    assert recorder.get_stats()["written"] == 1
+
+
+@pytest.mark.asyncio
+async def test_update_finds_previous_document_for_reduced_input(llm_service, repository):
+    """Test that a long input recorded under its own hash is found again by a later update."""
+    recorder = GenerationRecorder(repository, flush_interval=0.01)
+    recorder.start()
+    reducer = InputReducer(llm_service, context_window=2048, reserved_tokens=1024, chunk_tokens=512, summary_tokens=64)
+    service = DocumentGenerationService(llm_service, recorder=recorder, reducer=reducer)
+    long_input = "\n\n".join(f"Requirement {i}: " + " ".join(["detail"] * 20) for i in range(60))
+
+    response = await service.generate_documents(
+        GenerationRequest(input_text=long_input, document_types=[DocumentType.README])
+    )
+    await recorder.stop()
+
+    assert await service._find_previous(long_input, DocumentType.README) == response.documents[0].content
+
+
+@pytest.mark.asyncio
+async def test_list_pages_with_cursor(repository):
+    """Test that keyset pages cover every record once, newest first, including ties."""
+    await repository.add_many([_record("a", generated_at=float(i // 2)) for i in range(5)])
+
+    seen = []
+    pageable = CursorPageable(size=2)
+    while True:
+        items, next_cursor = await repository.list(pageable)
+        seen.extend((item.generated_at, item.id) for item in items)
+        if next_cursor is None:
+            break
+        pageable = CursorPageable(size=2, cursor=next_cursor)
+
+    assert seen == sorted(seen, reverse=True)
+    assert [item_id for _, item_id in seen] == [5, 4, 3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_search_matches_new_records_and_returns_snippets(repository):
+    """Test that records are searchable right after insert and results carry a highlighted snippet."""
+    filler = "Requirements and goals. " * 40
+    await repository.add_many(
+        [
+            _record("a", DocumentType.PRD, 1.0, filler + "Events are published to Kafka topics. " + filler),
+            _record("b", DocumentType.README, 2.0, "Consumes from kafka."),
+            _record("c", DocumentType.PRD, 3.0, "No message broker here."),
+        ]
+    )
+
+    items, next_cursor = await repository.search("Kafka", CursorPageable(), document_type=DocumentType.PRD)
+
+    assert [item.id for item in items] == [1]
+    assert "**Kafka**" in items[0].snippet
+    assert len(items[0].snippet) < len(filler)
+    assert next_cursor is None
+    # Stemmed, case-insensitive, and FTS5 syntax in the query is treated as plain words
+    items, _ = await repository.search('"PUBLISH*', CursorPageable())
+    assert [item.id for item in items] == [1]
+
+
+@pytest.mark.asyncio
+async def test_history_api(repository):
+    """Test listing, searching and reading the history over HTTP."""
+    await repository.add_many([_record("a", DocumentType.PRD, 1.0, "Built on Kafka."), _record("b", generated_at=2.0)])
+
+    transport = httpx.ASGITransport(app=create_app())
+    with patch("documcp.backend.api.history.history_repository", repository):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as client:
+            listed = (await client.get("/history", params={"size": 1})).json()
+            page_two = (await client.get("/history", params={"size": 1, "cursor": listed["next_cursor"]})).json()
+            found = (await client.get("/history/search", params={"q": "kafka", "document_type": "prd"})).json()
+            fetched = await client.get(f"/history/{found['items'][0]['id']}")
+            record = fetched.json()
+            revalidated = await client.get(
+                f"/history/{record['id']}", headers={"If-None-Match": fetched.headers["ETag"]}
+            )
+            bad_cursor = await client.get("/history", params={"cursor": "not-a-cursor"})
+
+    assert [item["id"] for item in listed["items"] + page_two["items"]] == [2, 1]
+    assert page_two["next_cursor"] is None
+    assert "content" not in listed["items"][0]
+    assert found["items"][0]["snippet"] == "Built on **Kafka**."
+    assert record["content"] == "Built on Kafka."
+    assert revalidated.status_code == 304
+    assert bad_cursor.status_code == 400
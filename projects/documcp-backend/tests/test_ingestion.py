@@ -0,0 +1,89 @@
+"""Test map-reduce ingestion of long project descriptions."""
+
+import hashlib
+
+import pytest
+
+from documcp.backend.domain.models import DocumentType, GenerationRequest
+from documcp.backend.services.cache import GenerationCache
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.ingestion import InputReducer, estimate_tokens, split_into_chunks
+from documcp.backend.services.single_flight import SingleFlight
+
+
+def _spec(paragraphs: int, edited: int = -1) -> str:
+    return "\n\n".join(
+        f"Requirement {i}: the system {'MUST' if i == edited else 'shall'} handle case {i} " + " ".join(["detail"] * 20)
+        for i in range(paragraphs)
+    )
+
+
+def _reducer(llm_service, cache=None) -> InputReducer:
+    return InputReducer(
+        llm_service,
+        cache=cache,
+        inflight=SingleFlight(),
+        context_window=2048,
+        reserved_tokens=1024,
+        chunk_tokens=512,
+        summary_tokens=64,
+    )
+
+
+def test_chunks_respect_size_and_keep_content():
+    """Test that chunks stay under the size limit and preserve every paragraph."""
+    text = _spec(60)
+
+    chunks = split_into_chunks(text, 2000)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 2000 for chunk in chunks)
+    assert "\n\n".join(chunks) == text
+
+
+@pytest.mark.asyncio
+async def test_small_input_passes_through(llm_service):
+    """Test that inputs within the budget are not summarized."""
+    reducer = _reducer(llm_service)
+
+    assert await reducer.reduce("A todo app") == "A todo app"
+    assert reducer.chunks_summarized == 0
+
+
+@pytest.mark.asyncio
+async def test_edited_spec_only_resummarizes_changed_chunks(llm_service):
+    """Test that chunk summaries are cached so an edit only redoes nearby chunks."""
+    cache = GenerationCache()
+    reducer = _reducer(llm_service, cache)
+
+    reduced = await reducer.reduce(_spec(60))
+    first_run = reducer.chunks_summarized
+    await reducer.reduce(_spec(60, edited=30))
+
+    assert estimate_tokens(reduced) <= reducer.input_budget
+    assert first_run > 1
+    assert reducer.chunks_summarized - first_run <= 2
+    assert reducer.chunk_cache_hits >= first_run - 2
+
+
+@pytest.mark.asyncio
+async def test_generation_uses_reduced_input(llm_service):
+    """Test that documents are generated from the summarized description."""
+    prompts = []
+    complete = llm_service.complete
+
+    async def recording_complete(prompt, **kwargs):
+        prompts.append(prompt)
+        return await complete(prompt, **kwargs)
+
+    llm_service.complete = recording_complete
+    service = DocumentGenerationService(llm_service, inflight=SingleFlight(), reducer=_reducer(llm_service))
+    request = GenerationRequest(input_text=_spec(60), document_types=[DocumentType.README])
+
+    response = await service.generate_documents(request)
+
+    assert response.documents[0].metadata.get("error") is None
+    assert "Requirement 59" not in prompts[-1]
+    # The document describes the client's input, not its summary
+    assert response.documents[0].metadata["input_length"] == len(request.input_text)
+    assert response.documents[0].metadata["input_hash"] == hashlib.sha256(request.input_text.encode()).hexdigest()
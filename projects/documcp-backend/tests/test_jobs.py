@@ -0,0 +1,163 @@
+"""Test asynchronous generation jobs."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from documcp.backend.domain.models import DocumentType, GenerationMode, GenerationRequest, JobStatus
+from documcp.backend.main import create_app
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.job_service import JobService
+from documcp.backend.services.job_store import JobStore
+from documcp.backend.services.scheduler import QueueFullError
+
+
+async def _wait_for(jobs: JobService, job_id: str):
+    for _ in range(100):
+        job = await jobs.get(job_id)
+        if job.status in (JobStatus.COMPLETED, JobStatus.FAILED):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("Job did not finish")
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_background(llm_service, tmp_path):
+    """Test that a submitted job completes with per-document results."""
+    jobs = JobService(DocumentGenerationService(llm_service), JobStore(str(tmp_path / "jobs.db")))
+    await jobs.start()
+    request = GenerationRequest(input_text="A todo app", document_types=[DocumentType.PRD, DocumentType.README])
+
+    job = await jobs.submit(request)
+    assert job.status is JobStatus.QUEUED
+
+    finished = await _wait_for(jobs, job.job_id)
+    await jobs.stop()
+
+    assert finished.status is JobStatus.COMPLETED
+    assert [entry.status for entry in finished.documents] == [JobStatus.COMPLETED, JobStatus.COMPLETED]
+    assert finished.documents[0].document.content.startswith("Generated for:")
+
+
+@pytest.mark.asyncio
+async def test_job_waits_for_full_queue(llm_service, tmp_path, mocker):
+    """Test that a job document turned away by a full scheduler queue is retried instead of failing."""
+    service = DocumentGenerationService(llm_service)
+    generate = service._generate_single_document
+    attempts = []
+
+    async def full_once(*args, **kwargs):
+        attempts.append(args)
+        if len(attempts) == 1:
+            raise QueueFullError(retry_after=0)
+        return await generate(*args, **kwargs)
+
+    mocker.patch.object(service, "_generate_single_document", full_once)
+    jobs = JobService(service, JobStore(str(tmp_path / "jobs.db")))
+    await jobs.start()
+
+    job = await jobs.submit(GenerationRequest(input_text="A todo app", document_types=[DocumentType.README]))
+    finished = await _wait_for(jobs, job.job_id)
+    await jobs.stop()
+
+    assert finished.status is JobStatus.COMPLETED
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_combined_job_uses_one_completion(llm_service, tmp_path, mocker):
+    """Test that a combined-mode job generates all of its documents from a single completion."""
+    complete = mocker.spy(llm_service, "complete")
+    jobs = JobService(DocumentGenerationService(llm_service), JobStore(str(tmp_path / "jobs.db")))
+    await jobs.start()
+    request = GenerationRequest(
+        input_text="A todo app", document_types=[DocumentType.PRD, DocumentType.README], mode=GenerationMode.COMBINED
+    )
+
+    job = await jobs.submit(request)
+    finished = await _wait_for(jobs, job.job_id)
+    await jobs.stop()
+
+    assert complete.call_count == 1
+    assert [entry.status for entry in finished.documents] == [JobStatus.COMPLETED, JobStatus.COMPLETED]
+    assert [entry.document.content for entry in finished.documents] == ["Generated section 0", "Generated section 1"]
+
+
+@pytest.mark.asyncio
+async def test_queued_job_survives_restart(llm_service, tmp_path):
+    """Test that a job queued before shutdown runs after the next start."""
+    path = str(tmp_path / "jobs.db")
+    request = GenerationRequest(input_text="A todo app", document_types=[DocumentType.README])
+
+    before_restart = JobService(DocumentGenerationService(llm_service), JobStore(path))
+    job = await before_restart.submit(request)
+    await before_restart.stop()
+
+    after_restart = JobService(DocumentGenerationService(llm_service), JobStore(path))
+    await after_restart.start()
+    finished = await _wait_for(after_restart, job.job_id)
+    await after_restart.stop()
+
+    assert finished.status is JobStatus.COMPLETED
+
+
+def test_job_endpoints(llm_service, tmp_path):
+    """Test creating a job and polling an unknown job id."""
+    client = TestClient(create_app())
+    jobs = JobService(DocumentGenerationService(llm_service), JobStore(str(tmp_path / "jobs.db")))
+
+    with patch("documcp.backend.api.jobs.job_service", jobs):
+        created = client.post("/api/v1/jobs", json={"input_text": "A todo app", "document_types": ["prd"]})
+        missing = client.get("/api/v1/jobs/unknown")
+
+    assert created.status_code == 202
+    assert created.json()["status"] == "queued"
+    assert created.json()["documents"][0]["document_type"] == "prd"
+    assert missing.status_code == 404
+
+
+def test_job_polling_revalidates_with_etag(llm_service, tmp_path):
+    """Test that polling an unchanged job with If-None-Match returns 304."""
+    client = TestClient(create_app())
+    jobs = JobService(DocumentGenerationService(llm_service), JobStore(str(tmp_path / "jobs.db")))
+
+    with patch("documcp.backend.api.jobs.job_service", jobs):
+        created = client.post("/api/v1/jobs", json={"input_text": "A todo app", "document_types": ["prd"]})
+        first = client.get(f"/api/v1/jobs/{created.json()['job_id']}")
+        second = client.get(
+            f"/api/v1/jobs/{created.json()['job_id']}", headers={"If-None-Match": first.headers["ETag"]}
+        )
+
+    assert first.status_code == 200
+    assert first.headers["ETag"].startswith('W/"')
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_saves_in_threads(llm_service, tmp_path, mocker):
+    """Test that stopping lets a save already running in a thread finish before the store closes."""
+    path = str(tmp_path / "jobs.db")
+    store = JobStore(path)
+    jobs = JobService(DocumentGenerationService(llm_service), store)
+    save = store._save
+    started = threading.Event()
+
+    def slow_save(row):
+        started.set()
+        time.sleep(0.05)
+        save(row)
+
+    mocker.patch.object(store, "_save", slow_save)
+    submit = asyncio.create_task(jobs.submit(GenerationRequest(input_text="A todo app")))
+    await asyncio.to_thread(started.wait)
+    submit.cancel()
+    await jobs.stop()
+
+    restarted = JobStore(path)
+    assert len(await restarted.list_unfinished()) == 1
+    await restarted.close()
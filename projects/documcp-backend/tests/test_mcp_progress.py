@@ -0,0 +1,150 @@
+"""Test MCP progress notifications for tool calls."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+from mcp.types import RequestParams
+
+from documcp.backend import mcp_server
+from documcp.backend.domain.models import StreamEventType
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.document_store import DocumentStore
+
+
+@pytest.fixture
+def session():
+    """MCP session recording notifications."""
+    session = MagicMock()
+    session.send_progress_notification = AsyncMock()
+    session.send_log_message = AsyncMock()
+    return session
+
+
+@pytest.fixture
+def progress_request(session):
+    """Run the test inside an MCP request that asked for progress."""
+    meta = RequestParams.Meta(progressToken="call-1")
+    token = request_ctx.set(RequestContext(request_id=7, meta=meta, session=session, lifespan_context=None))
+    yield
+    request_ctx.reset(token)
+
+
+def _document(doc_type: str, content: str) -> dict:
+    return {"document_type": doc_type, "content": content, "metadata": {}}
+
+
+@pytest.mark.asyncio
+async def test_generate_documents_reports_progress(llm_service, session, progress_request):
+    """Test that progress increases with every notification and ends at the document count."""
+    with (
+        patch.object(mcp_server, "llm_service", llm_service),
+        patch.object(mcp_server, "document_service", DocumentGenerationService(llm_service)),
+        patch.object(mcp_server, "PROGRESS_INTERVAL", 0.0),
+    ):
+        contents = await mcp_server.handle_call_tool(
+            "generate_documents", {"input_text": "A todo app", "document_types": ["prd", "readme"]}
+        )
+
+    assert contents[0].text.startswith("# Document Generation Complete")
+    calls = session.send_progress_notification.await_args_list
+    progress = [call.args[1] for call in calls]
+    assert progress == sorted(set(progress))
+    assert progress[-1] == 2.0
+    assert {call.kwargs["total"] for call in calls} == {2.0}
+    assert calls[0].kwargs["message"] == "prd queued, readme queued"
+    assert all(call.args[0] == "call-1" and call.kwargs["related_request_id"] == "7" for call in calls)
+
+
+@pytest.mark.asyncio
+async def test_combined_mode_tool_call_uses_one_completion(llm_service, session, progress_request, mocker):
+    """Test that a combined-mode tool call makes one completion and still reports every document."""
+    complete = mocker.spy(llm_service, "complete")
+    with (
+        patch.object(mcp_server, "llm_service", llm_service),
+        patch.object(mcp_server, "document_service", DocumentGenerationService(llm_service)),
+    ):
+        contents = await mcp_server.handle_call_tool(
+            "generate_documents",
+            {"input_text": "A todo app", "document_types": ["prd", "readme"], "mode": "combined", "inline": True},
+        )
+
+    assert complete.call_count == 1
+    assert [content.text for content in contents[1:]] == [
+        "## Prd\n\nGenerated section 0\n\n---\n",
+        "## Readme\n\nGenerated section 1\n\n---\n",
+    ]
+    assert session.send_progress_notification.await_args_list[-1].args[1] == 2.0
+
+
+@pytest.mark.asyncio
+async def test_finished_documents_are_sent_before_the_slowest(session, progress_request):
+    """Test that a document is sent to the client as soon as it is done."""
+    events = [
+        (StreamEventType.STARTED, {"document_type": "prd"}),
+        (StreamEventType.STARTED, {"document_type": "readme"}),
+        (StreamEventType.CHUNK, {"document_type": "prd", "content": "# PRD"}),
+        (StreamEventType.CHUNK, {"document_type": "readme", "content": "# README"}),
+        (StreamEventType.DOCUMENT, _document("readme", "# README")),
+        (StreamEventType.CHUNK, {"document_type": "prd", "content": " more"}),
+        (StreamEventType.DOCUMENT, _document("prd", "# PRD more")),
+        (StreamEventType.DONE, {"generation_time": 1.0, "model_info": {}}),
+    ]
+
+    async def stream_documents(*args, **kwargs):
+        for event in events:
+            yield event
+
+    service = MagicMock(stream_documents=stream_documents)
+    with (
+        patch.object(mcp_server, "llm_service", MagicMock(is_loaded=True)),
+        patch.object(mcp_server, "document_service", service),
+    ):
+        contents = await mcp_server.handle_call_tool(
+            "generate_documents", {"input_text": "A todo app", "document_types": ["prd", "readme"]}
+        )
+
+    logs = session.send_log_message.await_args_list
+    assert [call.args[1]["document_type"] for call in logs] == ["readme", "prd"]
+    messages = [call.kwargs["message"] for call in session.send_progress_notification.await_args_list]
+    assert "prd generating (5 chars), readme done (8 chars)" in messages
+    # The final result keeps the requested order
+    assert [content.text.split("\n")[0] for content in contents[1:]] == ["## Prd", "## Readme"]
+
+
+@pytest.mark.asyncio
+async def test_stored_documents_are_sent_as_links(llm_service, session, progress_request):
+    """Test that finished documents stored as resources are announced by URI, without their content."""
+    store = DocumentStore(path=":memory:")
+    try:
+        with (
+            patch.object(mcp_server, "llm_service", llm_service),
+            patch.object(mcp_server, "document_service", DocumentGenerationService(llm_service)),
+            patch.object(mcp_server, "document_store", store),
+        ):
+            await mcp_server.handle_call_tool("generate_readme", {"input_text": "A todo app"})
+    finally:
+        store.close()
+
+    (log,) = session.send_log_message.await_args_list
+    assert set(log.args[1]) == {"document_type", "uri", "summary", "size"}
+    assert log.args[1]["uri"].startswith("documcp://documents/")
+
+
+@pytest.mark.asyncio
+async def test_no_notifications_without_progress_token(llm_service, session):
+    """Test that nothing is sent when the client did not ask for progress."""
+    token = request_ctx.set(RequestContext(request_id=1, meta=None, session=session, lifespan_context=None))
+    try:
+        with (
+            patch.object(mcp_server, "llm_service", llm_service),
+            patch.object(mcp_server, "document_service", DocumentGenerationService(llm_service)),
+        ):
+            contents = await mcp_server.handle_call_tool("generate_readme", {"input_text": "A todo app"})
+    finally:
+        request_ctx.reset(token)
+
+    assert contents[0].text.startswith("Generated for:")
+    session.send_progress_notification.assert_not_awaited()
+    session.send_log_message.assert_not_awaited()
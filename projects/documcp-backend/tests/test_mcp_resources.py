@@ -0,0 +1,60 @@
+"""Test generated documents exposed as MCP resources."""
+
+from unittest.mock import patch
+
+import pytest
+from mcp.types import ResourceLink
+
+from documcp.backend import mcp_server
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.document_store import DocumentStore
+
+
+@pytest.fixture
+def services(llm_service):
+    """MCP server globals with an in-memory document store."""
+    store = DocumentStore(path=":memory:")
+    with (
+        patch.object(mcp_server, "llm_service", llm_service),
+        patch.object(mcp_server, "document_service", DocumentGenerationService(llm_service)),
+        patch.object(mcp_server, "document_store", store),
+    ):
+        yield store
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_tool_returns_resource_links(services):
+    """Test that tool results link to stored documents instead of inlining them."""
+    contents = await mcp_server.handle_call_tool(
+        "generate_documents", {"input_text": "A todo app", "document_types": ["prd", "readme"]}
+    )
+
+    links = [content for content in contents if isinstance(content, ResourceLink)]
+    assert [link.name.split("-")[0] for link in links] == ["prd", "readme"]
+    assert all(link.mimeType == "text/markdown" for link in links)
+    assert all(str(link.uri) in contents[1 + 2 * i].text for i, link in enumerate(links))
+
+    resources = await mcp_server.handle_list_resources()
+    assert {str(resource.uri) for resource in resources} == {str(link.uri) for link in links}
+
+    read = await mcp_server.handle_read_resource(links[1].uri)
+    assert read[0].content.startswith("Generated for:")
+    assert read[0].mime_type == "text/markdown"
+
+
+@pytest.mark.asyncio
+async def test_inline_returns_full_document(services):
+    """Test that ``inline`` keeps returning the full document text."""
+    contents = await mcp_server.handle_call_tool("generate_readme", {"input_text": "A todo app", "inline": True})
+
+    assert len(contents) == 1
+    assert contents[0].text.startswith("Generated for:")
+    assert len(await services.list()) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_unknown_resource_fails(services):
+    """Test that unknown resource URIs are rejected."""
+    with pytest.raises(ValueError, match="Unknown resource"):
+        await mcp_server.handle_read_resource("documcp://documents/" + "0" * 64)
@@ -0,0 +1,55 @@
+"""Test Prometheus metrics."""
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from documcp.backend.main import create_app
+from documcp.backend.services.metrics import GenerationMetrics, error_cause
+from documcp.backend.services.scheduler import QueueFullError
+
+
+def _value(metrics: GenerationMetrics, name: str, **labels) -> float:
+    return metrics.registry.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_upstream_calls_record_latency_and_tokens(llm_service):
+    """Test that completions record latency, TTFT and token usage per document type."""
+    metrics = GenerationMetrics()
+    llm_service.metrics = metrics
+    labels = {"document_type": "readme", "model": "test-model"}
+
+    await llm_service.complete("prompt", document_type="readme")
+    async for _ in llm_service.stream_completion("prompt", document_type="readme"):
+        pass
+
+    assert _value(metrics, "documcp_upstream_latency_seconds_count", **labels) == 2
+    assert _value(metrics, "documcp_upstream_time_to_first_token_seconds_count", **labels) == 1
+    assert _value(metrics, "documcp_prompt_tokens_total", **labels) == 20
+    assert _value(metrics, "documcp_completion_tokens_total", **labels) > 0
+
+
+def test_error_causes():
+    """Test that errors are grouped into a few causes."""
+    assert error_cause(QueueFullError(retry_after=1)) == "queue_full"
+    assert error_cause(httpx.ReadTimeout("slow")) == "timeout"
+    assert error_cause(httpx.ConnectError("refused")) == "connection"
+    assert error_cause(RuntimeError("LM Studio API error: 500")) == "upstream_status"
+    assert error_cause(ValueError("bug")) == "internal"
+
+
+def test_exposition_endpoint():
+    """Test that the exposition endpoint serves the text format."""
+    metrics = GenerationMetrics()
+    metrics.record_error(RuntimeError("LM Studio API error: 500"))
+    client = TestClient(create_app())
+
+    with patch("documcp.backend.api.generation.generation_metrics", metrics):
+        response = client.get("/metrics", headers={"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'documcp_errors_total{cause="upstream_status"} 1.0' in response.text
@@ -0,0 +1,77 @@
+"""Test the shared-kernel middlewares."""
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from documcp.shared_kernel.infra.fastapi.middlewares import (
+    CorrelationIdMiddleware,
+    SessionMiddleware,
+    get_correlation_id,
+)
+
+
+async def _echo(request):
+    return JSONResponse(
+        {
+            "state": request.state.correlation_id,
+            "context": get_correlation_id(),
+            "session": "session" in request.scope,
+        }
+    )
+
+
+async def _login(request):
+    request.session["user"] = "alice"
+    return JSONResponse({"ok": True})
+
+
+async def _stream(request):
+    async def chunks():
+        yield b"one\n"
+        yield get_correlation_id().encode() + b"\n"
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+def _client() -> TestClient:
+    app = Starlette(
+        routes=[Route("/api/echo", _echo), Route("/auth/login", _login), Route("/api/stream", _stream)],
+        middleware=[
+            Middleware(CorrelationIdMiddleware),
+            Middleware(SessionMiddleware, secret_key="test", include_paths=["/auth"]),
+        ],
+    )
+    return TestClient(app)
+
+
+def test_correlation_id_is_propagated():
+    """Test that an incoming correlation id reaches the request, the context and the response."""
+    response = _client().get("/api/echo", headers={"X-Correlation-ID": "abc-123"})
+
+    assert response.headers["X-Correlation-ID"] == "abc-123"
+    assert response.json()["state"] == "abc-123"
+    assert response.json()["context"] == "abc-123"
+
+
+def test_correlation_id_is_generated_and_kept_while_streaming():
+    """Test that a generated id stays set for the whole streamed body."""
+    response = _client().get("/api/stream")
+
+    correlation_id = response.headers["X-Correlation-ID"]
+    assert correlation_id
+    assert response.text == f"one\n{correlation_id}\n"
+
+
+def test_sessions_only_on_included_paths():
+    """Test that routes outside the included paths get no session and no cookie."""
+    client = _client()
+
+    login = client.get("/auth/login")
+    echo = client.get("/api/echo")
+
+    assert "session" in login.cookies
+    assert echo.json()["session"] is False
+    assert "set-cookie" not in echo.headers
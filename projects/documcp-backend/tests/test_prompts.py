@@ -0,0 +1,79 @@
+"""Test prompt layout and combined multi-document generation."""
+
+import os
+
+import pytest
+
+from documcp.backend.domain.models import DocumentType, GenerationMode, GenerationRequest
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.llm_service import LMStudioService, document_delimiter
+
+
+def test_prompts_share_project_prefix():
+    """Test that every document type starts with the same project context."""
+    service = LMStudioService()
+    prompts = [service.build_prompt("A todo app", doc_type, "Todo") for doc_type in DocumentType]
+
+    prefix = os.path.commonprefix(prompts)
+
+    assert prefix.startswith("Project Name: Todo\n\nProject Description:\nA todo app\n\n")
+
+
+def test_split_combined_output():
+    """Test that a combined completion is split on delimiter lines."""
+    text = (
+        f"{document_delimiter(DocumentType.PRD)}\n# PRD\n\n"
+        f"{document_delimiter(DocumentType.README)}\n# README\n\n"
+        "===DOCUMENT: unknown===\nignored"
+    )
+
+    documents = LMStudioService.split_combined_output(text, [DocumentType.PRD, DocumentType.README])
+
+    assert documents == {DocumentType.PRD: "# PRD", DocumentType.README: "# README"}
+
+
+@pytest.mark.asyncio
+async def test_combined_mode_uses_one_completion(llm_service):
+    """Test that combined mode serves every document from a single completion."""
+    calls = []
+    complete = llm_service.complete
+
+    async def counting_complete(prompt, **kwargs):
+        calls.append(prompt)
+        return await complete(prompt, **kwargs)
+
+    llm_service.complete = counting_complete
+    request = GenerationRequest(
+        input_text="A todo app",
+        document_types=[DocumentType.PRD, DocumentType.README],
+        mode=GenerationMode.COMBINED,
+    )
+
+    response = await DocumentGenerationService(llm_service).generate_documents(request)
+
+    assert len(calls) == 1
+    assert [doc.document_type for doc in response.documents] == [DocumentType.PRD, DocumentType.README]
+    assert [doc.content for doc in response.documents] == ["Generated section 0", "Generated section 1"]
+    assert all(doc.metadata["combined"] for doc in response.documents)
+
+
+@pytest.mark.asyncio
+async def test_combined_mode_falls_back_for_missing_documents(llm_service):
+    """Test that documents missing from the combined completion are generated individually."""
+
+    async def partial_complete(prompt, **kwargs):
+        if "Documents:" in prompt:
+            return f"{document_delimiter(DocumentType.PRD)}\n# PRD"
+        return "# README"
+
+    llm_service.complete = partial_complete
+    request = GenerationRequest(
+        input_text="A todo app",
+        document_types=[DocumentType.PRD, DocumentType.README],
+        mode=GenerationMode.COMBINED,
+    )
+
+    response = await DocumentGenerationService(llm_service).generate_documents(request)
+
+    assert [doc.content for doc in response.documents] == ["# PRD", "# README"]
+    assert [doc.metadata["combined"] for doc in response.documents] == [True, False]
@@ -0,0 +1,96 @@
+"""Test background initialization and readiness."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from documcp.backend import mcp_server
+from documcp.backend.main import create_app
+from documcp.backend.services.readiness import ReadinessState, ServiceReadiness
+
+
+@pytest.mark.asyncio
+async def test_readiness_retries_until_initialized():
+    """Test that failed initializations are retried until one succeeds."""
+    calls = 0
+
+    async def initialize():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise ConnectionError("LM Studio unreachable")
+
+    readiness = ServiceReadiness("test", initialize, retry_interval=0.01)
+    readiness.start()
+
+    assert await readiness.wait(timeout=1.0)
+    assert readiness.state is ReadinessState.READY
+    assert readiness.get_stats() == {"state": "ready", "attempts": 3, "error": None}
+
+
+@pytest.mark.asyncio
+async def test_readiness_wait_times_out_with_last_error():
+    """Test that waiting reports not ready and keeps the last error."""
+
+    async def initialize():
+        raise ConnectionError("LM Studio unreachable")
+
+    readiness = ServiceReadiness("test", initialize, retry_interval=0.01)
+    readiness.start()
+    try:
+        assert not await readiness.wait(timeout=0.05)
+        assert readiness.state is ReadinessState.FAILED
+        assert readiness.error == "LM Studio unreachable"
+    finally:
+        await readiness.stop()
+
+
+def test_generation_unavailable_while_starting():
+    """Test that generation answers 503 with Retry-After until LM Studio is connected."""
+    readiness = ServiceReadiness("lm_studio", MagicMock(), retry_interval=10.0)
+    readiness.error = "connection refused"
+
+    with (
+        patch("documcp.backend.api.generation.document_service", MagicMock()),
+        patch("documcp.backend.api.generation.readiness", readiness),
+    ):
+        response = TestClient(create_app()).post(
+            "/api/v1/generate", json={"input_text": "A project", "document_types": ["prd"]}
+        )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "10"
+    assert "connection refused" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_mcp_lists_tools_before_services_start():
+    """Test that MCP tools are listed without initialized services."""
+    with patch.object(mcp_server, "document_service", None):
+        tools = await mcp_server.handle_list_tools()
+
+    assert "generate_documents" in [tool.name for tool in tools]
+
+
+@pytest.mark.asyncio
+async def test_mcp_tool_call_reports_not_ready():
+    """Test that tool calls wait for readiness and then report why the service is unavailable."""
+
+    async def initialize():
+        raise ConnectionError("LM Studio unreachable")
+
+    readiness = ServiceReadiness("documcp", initialize, retry_interval=0.01)
+    readiness.start()
+    try:
+        with (
+            patch.object(mcp_server, "readiness", readiness),
+            patch.object(mcp_server, "settings", None),
+            patch.object(mcp_server, "DEFAULT_STARTUP_WAIT", 0.05),
+        ):
+            contents = await mcp_server.handle_call_tool("generate_prd", {"input_text": "A project"})
+    finally:
+        await readiness.stop()
+
+    assert "not ready yet" in contents[0].text
+    assert "LM Studio unreachable" in contents[0].text
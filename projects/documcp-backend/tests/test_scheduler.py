@@ -0,0 +1,122 @@
+"""Test the upstream admission scheduler."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from documcp.backend.main import create_app
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.scheduler import GenerationScheduler, Priority, QueueFullError
+
+
+async def _run(scheduler: GenerationScheduler, order: list, name: str, priority: Priority, client_id: str):
+    async with scheduler.slot(priority, client_id):
+        order.append(name)
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_interactive_lane_and_round_robin():
+    """Test that interactive work goes first and clients alternate within a lane."""
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue_size=10)
+    order: list = []
+
+    async with scheduler.slot():
+        tasks = [
+            asyncio.create_task(_run(scheduler, order, "a1", Priority.BULK, "a")),
+            asyncio.create_task(_run(scheduler, order, "a2", Priority.BULK, "a")),
+            asyncio.create_task(_run(scheduler, order, "b1", Priority.BULK, "b")),
+            asyncio.create_task(_run(scheduler, order, "mcp", Priority.INTERACTIVE, "mcp")),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 4
+
+    await asyncio.gather(*tasks)
+
+    assert order == ["mcp", "a1", "b1", "a2"]
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_full():
+    """Test that work beyond the queue limit is rejected immediately."""
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue_size=1)
+
+    async with scheduler.slot():
+        waiter = asyncio.create_task(_run(scheduler, [], "queued", Priority.BULK, "a"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(QueueFullError) as exc_info:
+            async with scheduler.slot():
+                pass
+
+        assert exc_info.value.code == 429
+        assert scheduler.get_stats()["rejected"] == 1
+
+    await waiter
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    """Test that a cancelled waiter frees its queue position."""
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue_size=1)
+
+    async with scheduler.slot():
+        waiter = asyncio.create_task(_run(scheduler, [], "queued", Priority.BULK, "a"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        assert scheduler.queue_depth == 0
+
+    assert scheduler.active == 0
+
+
+def test_generate_returns_429_with_retry_after(llm_service):
+    """Test that an overloaded queue is reported as 429 with Retry-After."""
+    client = TestClient(create_app())
+    scheduler = GenerationScheduler(max_concurrency=0, max_queue_size=0)
+    service = DocumentGenerationService(llm_service, scheduler=scheduler)
+
+    with patch("documcp.backend.api.generation.document_service", service):
+        response = client.post("/api/v1/generate", json={"input_text": "A todo app", "document_types": ["prd"]})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+
+def test_update_returns_429_before_any_work(llm_service, mocker):
+    """Test that an update is rejected up front, like a generation, when the queue is full."""
+    client = TestClient(create_app())
+    service = DocumentGenerationService(llm_service, scheduler=GenerationScheduler(max_concurrency=0, max_queue_size=0))
+    update = mocker.spy(service, "_update_document")
+
+    with patch("documcp.backend.api.generation.document_service", service):
+        response = client.post(
+            "/api/v1/generate/update",
+            json={"input_text": "A todo app", "previous_input_text": "A list app", "document_types": ["prd"]},
+        )
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert update.call_count == 0
+
+
+def test_http_priority_header_does_not_jump_the_bulk_queue(llm_service, mocker):
+    """Test that an HTTP request asking for the interactive lane is still scheduled as bulk."""
+    client = TestClient(create_app())
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue_size=10)
+    slot = mocker.spy(scheduler, "slot")
+    service = DocumentGenerationService(llm_service, scheduler=scheduler)
+
+    with patch("documcp.backend.api.generation.document_service", service):
+        response = client.post(
+            "/api/v1/generate",
+            json={"input_text": "A todo app", "document_types": ["prd"]},
+            headers={"X-Priority": "interactive"},
+        )
+
+    assert response.status_code == 200
+    assert [call.args[0] for call in slot.call_args_list] == [Priority.BULK]
@@ -0,0 +1,277 @@
+"""Test section splitting, section-level document updates and sectioned generation."""
+
+import asyncio
+import json
+import re
+
+import httpx
+import pytest
+
+from documcp.backend.domain.models import (
+    DocumentType,
+    DocumentUpdateRequest,
+    GenerationMode,
+    GenerationRequest,
+    StreamEventType,
+)
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.llm_service import LMStudioService
+from documcp.backend.services.sections import diff_inputs, parse_section_numbers, split_sections
+
+WHAT_IS_THIS = """# What is Acme?
+
+## Vision
+Make widgets easy.
+
+## Core Value
+Saves time.
+
+## Key Features
+- Widgets
+- Gadgets
+
+### Widgets
+Details.
+
+## Target Users
+Developers.
+
+## Tech Snapshot
+Python.
+
+## Roadmap
+More widgets.
+
+## Success Metrics
+Happy users.
+"""
+
+
+def test_split_sections_roundtrip():
+    """Test that a document is cut at its section headings, keeping subsections and the title."""
+    parts = split_sections(WHAT_IS_THIS, DocumentType.WHAT_IS_THIS)
+
+    assert parts is not None
+    assert parts.preamble == "# What is Acme?\n\n"
+    assert len(parts.sections) == 7
+    assert parts.sections[2].startswith("## Key Features") and "### Widgets" in parts.sections[2]
+    assert parts.join() == WHAT_IS_THIS.strip()
+
+
+def test_split_sections_readme_title_is_first_section():
+    """Test that a README opening with its title uses it as the title section."""
+    readme = "# Acme\n\nWidgets.\n\n" + "".join(
+        f"## {name}\n\nText.\n\n"
+        for name in ["Features", "Installation", "Usage", "API", "Configuration", "Development", "Contributing"]
+    )
+    readme += "## License\n\nMIT"
+
+    parts = split_sections(readme, DocumentType.README)
+
+    assert parts is not None
+    assert parts.preamble == ""
+    assert parts.sections[0] == "# Acme\n\nWidgets.\n\n"
+    assert parts.sections[-1] == "## License\n\nMIT"
+
+
+def test_split_sections_missing_section():
+    """Test that a document lacking a section cannot be split."""
+    assert split_sections(WHAT_IS_THIS.replace("## Roadmap", "Roadmap:"), DocumentType.WHAT_IS_THIS) is None
+
+
+def test_diff_inputs_and_parse_section_numbers():
+    """Test paragraph diffs and triage answer parsing."""
+    assert diff_inputs("A tool.\n\nFor cats.", "A tool.\n\nFor  cats.") == ""
+    assert diff_inputs("A tool.\n\nFor cats.", "A tool.\n\nFor dogs.") == "- For cats.\n+ For dogs."
+
+    assert parse_section_numbers("2, 4", 7) == {1, 3}
+    assert parse_section_numbers("Sections 3 and 12", 7) == {2}
+    assert parse_section_numbers("None", 7) == set()
+    assert parse_section_numbers("I am not sure", 7) is None
+
+
+def _updating_llm_service(
+    prompts: list, triage: str = "4", revision: str = "## Target users\n\nDevelopers and designers."
+) -> LMStudioService:
+    """LM Studio fake that answers triage prompts with ``triage`` and revises sections to ``revision``."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/v1/models":
+            return httpx.Response(200, json={"data": [{"id": "test-model"}]})
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        prompts.append(prompt)
+        if prompt.endswith("Sections:"):
+            text = triage
+        elif prompt.endswith("Revised section:"):
+            text = revision
+        else:
+            text = "Generated in full"
+        return httpx.Response(200, json={"choices": [{"message": {"content": text}}], "usage": {"prompt_tokens": 10}})
+
+    service = LMStudioService(model_name="test-model")
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service._model_loaded = True
+    return service
+
+
+@pytest.mark.asyncio
+async def test_update_regenerates_only_affected_sections():
+    """Test that only the sections named by the triage are regenerated and the rest reused verbatim."""
+    prompts = []
+    service = DocumentGenerationService(_updating_llm_service(prompts))
+    request = DocumentUpdateRequest(
+        input_text="Acme makes widgets.\n\nFor developers and designers.",
+        previous_input_text="Acme makes widgets.\n\nFor developers.",
+        previous_documents={DocumentType.WHAT_IS_THIS: WHAT_IS_THIS},
+        document_types=[DocumentType.WHAT_IS_THIS, DocumentType.PRD],
+    )
+
+    response = await service.update_documents(request)
+
+    updated, prd = response.documents
+    # The model's heading is replaced by the previous one
+    expected = WHAT_IS_THIS.replace("## Target Users\nDevelopers.", "## Target Users\n\nDevelopers and designers.")
+    assert updated.content == expected.strip()
+    assert updated.metadata["update"] == "sections"
+    assert updated.metadata["sections_regenerated"] == ["Target Users"]
+    assert "Vision" in updated.metadata["sections_reused"]
+    # One triage and one section call for the known document, a full generation for the other
+    assert len(prompts) == 3
+    triage = next(prompt for prompt in prompts if prompt.endswith("Sections:"))
+    assert "- For developers.\n+ For developers and designers." in triage
+    assert prd.content == "Generated in full"
+    assert prd.metadata["update"] == "full"
+
+
+@pytest.mark.asyncio
+async def test_update_untitled_readme_intro_keeps_model_title():
+    """Test that updating a README intro without a heading keeps the model's title instead of the old first line."""
+    readme = "Todo is a small task tracker.\n\n" + "".join(
+        f"## {name}\n\nText.\n\n"
+        for name in ["Features", "Installation", "Usage", "API", "Configuration", "Development", "Contributing"]
+    )
+    readme += "## License\n\nMIT"
+    prompts = []
+    service = DocumentGenerationService(
+        _updating_llm_service(prompts, triage="1", revision="# Todo\n\nTodo is a new intro.")
+    )
+    request = DocumentUpdateRequest(
+        input_text="Todo is a new tracker.",
+        previous_input_text="Todo is a small tracker.",
+        previous_documents={DocumentType.README: readme},
+        document_types=[DocumentType.README],
+    )
+
+    response = await service.update_documents(request)
+
+    content = response.documents[0].content
+    assert content.startswith("# Todo\n\nTodo is a new intro.\n\n## Features")
+    assert "small task tracker" not in content
+    assert response.documents[0].metadata["sections_regenerated"] == ["Project title and brief description"]
+
+
+@pytest.mark.asyncio
+async def test_update_with_unchanged_input_reuses_document():
+    """Test that an unchanged description reuses the previous document without any LLM call."""
+    prompts = []
+    service = DocumentGenerationService(_updating_llm_service(prompts))
+    request = DocumentUpdateRequest(
+        input_text="Acme makes widgets.",
+        previous_input_text="Acme  makes widgets.\n",
+        previous_documents={DocumentType.WHAT_IS_THIS: WHAT_IS_THIS},
+        document_types=[DocumentType.WHAT_IS_THIS],
+    )
+
+    response = await service.update_documents(request)
+
+    assert response.documents[0].content == WHAT_IS_THIS.strip()
+    assert response.documents[0].metadata["sections_regenerated"] == []
+    assert prompts == []
+
+
+@pytest.mark.asyncio
+async def test_sectioned_generation_runs_sections_concurrently():
+    """Test that sections are written concurrently from one outline and stitched in order under their headings."""
+    prompts = []
+    running = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal running, peak
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        prompts.append(prompt)
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if prompt.endswith("Outline:"):
+            text = "1. Plan"
+        else:
+            number = re.search(r"Section (\d+):$", prompt).group(1)
+            text = f"### Heading the model chose\n\nBody {number}."
+        return httpx.Response(200, json={"choices": [{"message": {"content": text}}], "usage": {"prompt_tokens": 10}})
+
+    llm_service = LMStudioService(model_name="test-model")
+    llm_service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    llm_service._model_loaded = True
+    service = DocumentGenerationService(llm_service)
+    request = GenerationRequest(
+        input_text="Acme makes widgets.",
+        project_name="Acme",
+        document_types=[DocumentType.WHAT_IS_THIS, DocumentType.README],
+        mode=GenerationMode.SECTIONED,
+    )
+
+    response = await service.generate_documents(request)
+
+    what_is_this, readme = response.documents
+    assert what_is_this.content.startswith("# Acme: What is this\n\n## Vision\n\nBody 1.\n\n## Core Value\n\nBody 2.")
+    assert what_is_this.content.endswith("## Success Metrics\n\nBody 7.")
+    assert readme.content.startswith("# Acme\n\nBody 1.\n\n## Features\n\nBody 2.")
+    assert what_is_this.metadata["sections"] == 7
+    assert what_is_this.metadata["max_tokens"] == service._get_section_max_length(DocumentType.WHAT_IS_THIS)
+    # Every section follows the outline, and the documents can be updated section by section
+    assert all("1. Plan" in prompt for prompt in prompts if not prompt.endswith("Outline:"))
+    assert len(prompts) == 2 + 7 + 9
+    assert peak > 7
+    assert split_sections(what_is_this.content, DocumentType.WHAT_IS_THIS) is not None
+    assert split_sections(readme.content, DocumentType.README) is not None
+
+
+@pytest.mark.asyncio
+async def test_sectioned_stream_sends_each_document_whole(mocker):
+    """Test that a sectioned stream writes sections as sectioned generation does and sends the stitched document."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        if prompt.endswith("Outline:"):
+            text = "1. Plan"
+        else:
+            text = f"Body {re.search(r'Section (\d+):$', prompt).group(1)}."
+        return httpx.Response(200, json={"choices": [{"message": {"content": text}}], "usage": {"prompt_tokens": 10}})
+
+    llm_service = LMStudioService(model_name="test-model")
+    llm_service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    llm_service._model_loaded = True
+    stream_completion = mocker.spy(llm_service, "stream_completion")
+    service = DocumentGenerationService(llm_service)
+    request = GenerationRequest(
+        input_text="Acme makes widgets.",
+        project_name="Acme",
+        document_types=[DocumentType.WHAT_IS_THIS],
+        mode=GenerationMode.SECTIONED,
+    )
+
+    events = [event async for event in service.stream_documents(request)]
+
+    assert stream_completion.call_count == 0
+    assert [event for event, _ in events] == [
+        StreamEventType.STARTED,
+        StreamEventType.CHUNK,
+        StreamEventType.DOCUMENT,
+        StreamEventType.DONE,
+    ]
+    document = events[2][1]
+    assert events[1][1]["content"] == document["content"]
+    assert document["content"].startswith("# Acme: What is this\n\n## Vision\n\nBody 1.")
+    assert document["metadata"]["sections"] == 7
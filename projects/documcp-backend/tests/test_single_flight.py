@@ -0,0 +1,105 @@
+"""Test single-flight coalescing of identical generation requests."""
+
+import asyncio
+
+import pytest
+
+from documcp.backend.domain.models import DocumentType, GenerationRequest, StreamEventType
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_task():
+    """Test that concurrent calls with the same key run the work once."""
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "done"
+
+    results = await asyncio.gather(*(flights.do("key", work) for _ in range(3)))
+
+    assert calls == 1
+    assert [shared for _, shared in results] == [False, True, True]
+    assert flights.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_work():
+    """Test that a waiter going away leaves the other waiters unaffected."""
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    first = asyncio.create_task(flights.do("key", work))
+    second = asyncio.create_task(flights.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == ("done", True)
+
+
+@pytest.mark.asyncio
+async def test_shared_work_is_cancelled_when_every_caller_leaves():
+    """Test that the work stops once no caller is waiting for it."""
+    flights = SingleFlight()
+    started = asyncio.Event()
+
+    async def work():
+        started.set()
+        await asyncio.sleep(3600)
+
+    callers = [asyncio.create_task(flights.do("key", work)) for _ in range(2)]
+    await started.wait()
+    task = flights.lookup("key")
+
+    callers[0].cancel()
+    await asyncio.sleep(0)
+    assert not task.cancelled()
+
+    callers[1].cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert task.cancelled()
+    assert flights.get_stats()["cancelled"] == 1
+    assert flights.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_coalesced(llm_service, mocker):
+    """Test that identical concurrent requests produce one upstream call and separate documents."""
+    complete = mocker.spy(llm_service, "complete")
+    service = DocumentGenerationService(llm_service, inflight=SingleFlight())
+    request = GenerationRequest(input_text="A todo app", document_types=[DocumentType.README])
+
+    first, second = await asyncio.gather(service.generate_documents(request), service.generate_documents(request))
+
+    assert complete.call_count == 1
+    assert first.documents[0].content == second.documents[0].content
+    assert first.documents[0] is not second.documents[0]
+    assert second.documents[0].metadata["coalesced"] is True
+
+
+@pytest.mark.asyncio
+async def test_identical_streams_share_one_upstream_stream(llm_service, mocker):
+    """Test that a stream joining an identical in-flight stream receives its content without another upstream call."""
+    stream = mocker.spy(llm_service, "stream_completion")
+    service = DocumentGenerationService(llm_service, inflight=SingleFlight())
+    request = GenerationRequest(input_text="A todo app", document_types=[DocumentType.README])
+
+    async def document(stream_request):
+        events = [event async for event in service.stream_documents(stream_request)]
+        return next(payload for event, payload in events if event is StreamEventType.DOCUMENT)
+
+    first, second = await asyncio.gather(document(request), document(request))
+
+    assert stream.call_count == 1
+    assert first["content"] == second["content"]
+    assert first["metadata"]["coalesced"] is False
+    assert second["metadata"]["coalesced"] is True
@@ -0,0 +1,84 @@
+"""Test token-streaming generation."""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from documcp.backend.domain.models import DocumentType, GenerationMode, GenerationRequest, StreamEventType
+from documcp.backend.main import create_app
+from documcp.backend.services.document_service import DocumentGenerationService
+
+
+@pytest.mark.asyncio
+async def test_stream_document_yields_deltas(llm_service):
+    """Test that content deltas are relayed from the upstream event stream."""
+    deltas = [delta async for delta in llm_service.stream_document("A todo app", DocumentType.README)]
+
+    assert len(deltas) > 1
+    assert "".join(deltas).startswith("Generated for:")
+
+
+@pytest.mark.asyncio
+async def test_stream_documents_emits_completion_per_document(llm_service):
+    """Test that every document type emits tagged chunks and its own completion event."""
+    service = DocumentGenerationService(llm_service)
+    request = GenerationRequest(input_text="A todo app", document_types=[DocumentType.PRD, DocumentType.README])
+
+    events = [event async for event in service.stream_documents(request)]
+
+    chunk_types = {payload["document_type"] for event, payload in events if event is StreamEventType.CHUNK}
+    documents = [payload for event, payload in events if event is StreamEventType.DOCUMENT]
+    assert chunk_types == {"prd", "readme"}
+    assert {doc["document_type"] for doc in documents} == {"prd", "readme"}
+    assert events[-1][0] is StreamEventType.DONE
+
+
+def test_stream_endpoint_returns_server_sent_events(llm_service):
+    """Test the SSE endpoint wire format."""
+    client = TestClient(create_app())
+
+    with patch("documcp.backend.api.generation.document_service", DocumentGenerationService(llm_service)):
+        response = client.post("/api/v1/generate/stream", json={"input_text": "A todo app", "document_types": ["prd"]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: chunk" in response.text
+    assert "event: document" in response.text
+    assert response.text.rstrip().split("\n\n")[-1].startswith("event: done")
+
+
+@pytest.mark.asyncio
+async def test_stream_documents_emits_start_before_chunks(llm_service):
+    """Test that each document reports its start before its first content delta."""
+    service = DocumentGenerationService(llm_service)
+    request = GenerationRequest(input_text="A todo app", document_types=[DocumentType.PRD, DocumentType.README])
+
+    events = [(event, payload.get("document_type")) async for event, payload in service.stream_documents(request)]
+
+    for doc_type in ("prd", "readme"):
+        started = events.index((StreamEventType.STARTED, doc_type))
+        assert started < events.index((StreamEventType.CHUNK, doc_type))
+
+
+@pytest.mark.asyncio
+async def test_stream_documents_combined_uses_one_completion(llm_service, mocker):
+    """Test that a combined stream makes one completion and sends each document whole."""
+    complete = mocker.spy(llm_service, "complete")
+    stream_completion = mocker.spy(llm_service, "stream_completion")
+    service = DocumentGenerationService(llm_service)
+    request = GenerationRequest(
+        input_text="A todo app", document_types=[DocumentType.PRD, DocumentType.README], mode=GenerationMode.COMBINED
+    )
+
+    events = [event async for event in service.stream_documents(request)]
+
+    assert complete.call_count == 1
+    assert stream_completion.call_count == 0
+    chunks = {
+        payload["document_type"]: payload["content"] for event, payload in events if event is StreamEventType.CHUNK
+    }
+    assert chunks == {"prd": "Generated section 0", "readme": "Generated section 1"}
+    documents = [payload for event, payload in events if event is StreamEventType.DOCUMENT]
+    assert all(doc["metadata"]["combined"] for doc in documents)
+    assert events[-1][0] is StreamEventType.DONE
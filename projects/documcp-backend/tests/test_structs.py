@@ -0,0 +1,68 @@
+"""Test the msgspec counterparts of the domain models."""
+
+import msgspec
+from fastapi.testclient import TestClient
+
+from documcp.backend.domain.models import (
+    DocumentUpdateRequest,
+    GeneratedDocument,
+    GenerationRequest,
+    GenerationResponse,
+)
+from documcp.backend.domain.structs import (
+    DocumentUpdateRequestStruct,
+    GenerationRequestStruct,
+    GenerationResponseStruct,
+)
+from documcp.backend.main import create_app
+
+
+def test_structs_mirror_the_pydantic_models():
+    """Test that structs and models decode and encode the same JSON."""
+    body = b'{"input_text": "A todo app", "document_types": ["readme"], "mode": "combined"}'
+    response = GenerationResponse(
+        documents=[GeneratedDocument(document_type="readme", content="# Todo", metadata={"cached": True})],
+        generation_time=1.0,
+        model_info={"model_name": "test-model"},
+    )
+
+    assert msgspec.json.decode(body, type=GenerationRequestStruct).to_model() == GenerationRequest.model_validate_json(
+        body
+    )
+    assert msgspec.json.decode(msgspec.json.encode(GenerationResponseStruct.from_model(response))) == (
+        response.model_dump(mode="json")
+    )
+    assert {field.name for field in msgspec.structs.fields(GenerationRequestStruct)} == set(
+        GenerationRequest.model_fields
+    )
+
+
+def test_update_struct_mirrors_the_pydantic_model():
+    """Test that the update body decodes to the same request as the pydantic model."""
+    body = (
+        b'{"input_text": "A todo app", "previous_input_text": "A list app",'
+        b' "previous_documents": {"readme": "# List"}, "document_types": ["readme"]}'
+    )
+
+    assert msgspec.json.decode(body, type=DocumentUpdateRequestStruct).to_model() == (
+        DocumentUpdateRequest.model_validate_json(body)
+    )
+    assert {field.name for field in msgspec.structs.fields(DocumentUpdateRequestStruct)} == set(
+        DocumentUpdateRequest.model_fields
+    )
+
+
+def test_invalid_body_and_openapi_schema():
+    """Test that msgspec-decoded routes reject bad bodies with 422 and still document the body."""
+    client = TestClient(create_app())
+
+    invalid = client.post("/api/v1/generate", json={"input_text": "A todo app", "document_types": ["slides"]})
+    invalid_update = client.post("/api/v1/generate/update", json={"input_text": "A todo app"})
+    paths = client.get("/openapi.json").json()["paths"]
+    schema = paths["/api/v1/generate"]["post"]["requestBody"]
+    update_schema = paths["/api/v1/generate/update"]["post"]["requestBody"]
+
+    assert invalid.status_code == 422
+    assert invalid_update.status_code == 422
+    assert "input_text" in schema["content"]["application/json"]["schema"]["properties"]
+    assert "previous_input_text" in update_schema["content"]["application/json"]["schema"]["properties"]
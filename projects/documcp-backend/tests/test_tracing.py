@@ -0,0 +1,96 @@
+"""Test request tracing."""
+
+import json
+import threading
+
+import httpx
+import pytest
+
+from documcp.backend.domain.models import DocumentType, GenerationRequest
+from documcp.backend.services.document_service import DocumentGenerationService
+from documcp.backend.services.scheduler import GenerationScheduler
+from documcp.backend.tracing import OTLPJsonFileExporter, tracer, trace_id_for
+from documcp.shared_kernel.infra.fastapi.middlewares import correlation_id_ctx
+
+CORRELATION_ID = "0b1e7d2c-54b6-4c1a-9f6e-3d1a2b3c4d5e"
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    """Export spans of the global tracer to a temporary file."""
+    exporter = OTLPJsonFileExporter(str(tmp_path / "traces.jsonl"))
+    tracer.exporter = exporter
+    token = correlation_id_ctx.set(CORRELATION_ID)
+    yield exporter
+    correlation_id_ctx.reset(token)
+    tracer.exporter = None
+    exporter.close()
+
+
+def _read_spans(exporter: OTLPJsonFileExporter) -> tuple:
+    exporter.flush()
+    with open(exporter.path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    return lines, [span for line in lines for span in line["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+
+
+@pytest.mark.asyncio
+async def test_generation_is_exported_as_one_trace(exporter, llm_service):
+    """Test that a request's spans nest from the root down to the upstream call."""
+    service = DocumentGenerationService(llm_service, scheduler=GenerationScheduler(max_concurrency=1))
+    request = GenerationRequest(input_text="A tracing test", document_types=[DocumentType.README])
+
+    with tracer.span("request"):
+        await service.generate_documents(request)
+
+    lines, spans = _read_spans(exporter)
+    assert len(lines) == 1
+    by_name = {span["name"]: span for span in spans}
+    assert {"request", "generate_document", "prompt.build", "scheduler.wait", "llm.completion"} <= set(by_name)
+    assert all(span["traceId"] == trace_id_for(CORRELATION_ID) for span in spans)
+    assert by_name["generate_document"]["parentSpanId"] == by_name["request"]["spanId"]
+    assert by_name["llm.completion"]["parentSpanId"] == by_name["generate_document"]["spanId"]
+    assert [event["name"] for event in by_name["llm.completion"]["events"]] == ["response_headers"]
+
+
+@pytest.mark.asyncio
+async def test_upstream_request_carries_trace_context(exporter, llm_service):
+    """Test that the correlation id and traceparent reach LM Studio."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers)
+        chunk = {"choices": [{"delta": {"content": "hello"}}]}
+        return httpx.Response(200, text=f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n")
+
+    llm_service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with tracer.span("request"):
+        async for _ in llm_service.stream_completion("prompt"):
+            pass
+
+    _, spans = _read_spans(exporter)
+    upstream = next(span for span in spans if span["name"] == "llm.stream_completion")
+    assert seen[0]["X-Correlation-ID"] == CORRELATION_ID
+    assert seen[0]["traceparent"] == f"00-{upstream['traceId']}-{upstream['spanId']}-01"
+    assert "first_token" in [event["name"] for event in upstream["events"]]
+    assert "decode_time" in [attribute["key"] for attribute in upstream["attributes"]]
+
+
+def test_traces_are_written_off_the_calling_thread(exporter, mocker):
+    """Test that finished traces are appended by the writer thread and all of them survive close."""
+    writers = set()
+    write = exporter._write
+
+    def recording_write(traces):
+        writers.add(threading.current_thread().name)
+        write(traces)
+
+    mocker.patch.object(exporter, "_write", recording_write)
+    for i in range(20):
+        with tracer.span(f"request-{i}"):
+            pass
+    exporter.close()
+
+    lines, _ = _read_spans(exporter)
+    assert len(lines) == 20
+    assert writers == {"otlp-file-exporter"}